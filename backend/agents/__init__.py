@@ -3,6 +3,6 @@
 Agent 模块：BaseAgent 抽象类及各专业 Agent
 """
 
-from .base import BaseAgent
+from .base import BaseAgent, run_agents_concurrently
 
-__all__ = ["BaseAgent"]
+__all__ = ["BaseAgent", "run_agents_concurrently"]
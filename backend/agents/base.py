@@ -5,19 +5,93 @@ BaseAgent 抽象类
 """
 
 from abc import ABC, abstractmethod
-from typing import Generator, Optional, Any, Callable
+from typing import AsyncGenerator, Generator, Iterable, Optional, Any, Callable, NamedTuple, Union
 from dataclasses import dataclass, field
 from enum import Enum
+import asyncio
 import logging
 import time
 import uuid
 
-from core.ark_client import ArkClientWrapper, get_ark_client
-from core.config import settings
+from core.ark_client import ArkClientWrapper, StreamEvent, StreamEventType, get_ark_client
+from core.config import (
+    settings,
+    ThinkingMode,
+    AGENT_MODEL_MAPPING,
+    AGENT_THINKING_MODE,
+    AGENT_WEBSEARCH_CONFIG,
+)
 
 logger = logging.getLogger(__name__)
 
 
+class AgentConfig(NamedTuple):
+    """Agent 静态配置（模型 / 搜索 / Thinking），导入时一次性展开"""
+    model: str
+    use_websearch: bool
+    websearch_limit: int
+    thinking_mode: Optional[ThinkingMode]
+
+
+def _build_agent_config(agent_name: str) -> AgentConfig:
+    websearch = AGENT_WEBSEARCH_CONFIG.get(agent_name, {})
+    return AgentConfig(
+        model=AGENT_MODEL_MAPPING.get(agent_name, settings.default_model),
+        use_websearch=bool(websearch.get("enabled", True)),
+        websearch_limit=int(websearch.get("limit", 15)),
+        thinking_mode=AGENT_THINKING_MODE.get(agent_name),
+    )
+
+
+_AGENT_CONFIG_CACHE: dict[str, AgentConfig] = {
+    agent_name: _build_agent_config(agent_name) for agent_name in AGENT_MODEL_MAPPING
+}
+
+
+def get_agent_config(agent_name: str) -> AgentConfig:
+    """获取 Agent 静态配置（未登记的 Agent 按默认值构建）"""
+    config = _AGENT_CONFIG_CACHE.get(agent_name)
+    if config is None:
+        config = _build_agent_config(agent_name)
+    return config
+
+
+# 系统提示词：纯文本，或 Responses API 的多段 content（静态段在前，便于服务端前缀缓存命中）
+SystemPrompt = Union[str, list[dict[str, Any]]]
+
+
+def build_system_content(
+    static_text: str, dynamic_text: Optional[str] = None
+) -> list[dict[str, Any]]:
+    """
+    构建分段的系统提示词 content
+
+    静态段（角色/框架/格式）始终放在最前，保证跨轮次、跨实例的请求前缀逐字节一致；
+    动态段（模式、目标等元信息）追加在后，不破坏静态前缀。
+
+    Args:
+        static_text: 静态提示词
+        dynamic_text: 动态提示词，可为空
+
+    Returns:
+        list: [{"type": "input_text", "text": ...}, ...]
+    """
+    parts = [{"type": "input_text", "text": static_text}]
+    if dynamic_text:
+        parts.append({"type": "input_text", "text": dynamic_text})
+    return parts
+
+
+# 参考信息中引用其他 Agent 输出的截断长度
+CONTENT_DIGEST_CHARS = 500
+
+# run_agents_concurrently 默认并发上限，与图引擎 Ark 并发默认上限一致
+DEFAULT_AGENT_CONCURRENCY = 4
+
+# 非流式执行且无 stream_writer 时，输出增量合并到该字符数再下发（无人逐 token 消费）
+EXECUTE_COALESCE_CHARS = 4096
+
+
 class AgentStatus(str, Enum):
     """Agent 执行状态"""
     PENDING = "pending"
@@ -27,7 +101,7 @@ class AgentStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
-@dataclass
+@dataclass(slots=True)
 class AgentOutput:
     """Agent 输出结构"""
     agent_name: str
@@ -39,6 +113,12 @@ class AgentOutput:
     duration_ms: int = 0
     status: AgentStatus = AgentStatus.COMPLETED
     error_message: Optional[str] = None
+    # 内容摘要（前 CONTENT_DIGEST_CHARS 字符），构建时截取一次，供辩论提示词复用
+    content_digest: str = ""
+    
+    def __post_init__(self):
+        if not self.content_digest and self.content:
+            self.content_digest = self.content[:CONTENT_DIGEST_CHARS]
     
     def to_dict(self) -> dict[str, Any]:
         return {
@@ -54,21 +134,84 @@ class AgentOutput:
         }
 
 
-@dataclass
+@dataclass(slots=True)
+class Profile:
+    """
+    用户画像（类型化视图）
+
+    请求入口处由 dict 构建一次，提示词构建时按属性访问。
+    缺省值与原先 ``profile.get(key, default)`` 的默认值保持一致。
+    """
+    target_market: str = "未指定市场"
+    supply_chain: str = "未指定品类"
+    seller_type: str = "未指定卖家类型"
+    min_price: Optional[float] = None
+    max_price: Optional[float] = None
+    known_competitors: list[str] = field(default_factory=list)
+    brand_name: str = ""
+    target_audience: str = "未指定"
+    # slots 数据类不支持 cached_property，构建时计算一次
+    price_range: str = field(default="未指定", init=False)
+
+    def __post_init__(self):
+        if self.min_price is not None and self.max_price is not None:
+            self.price_range = f"${self.min_price}-${self.max_price}"
+
+    @classmethod
+    def from_dict(cls, data: Optional[dict[str, Any]]) -> "Profile":
+        """从画像 dict 构建；仅取已知字段，缺失字段使用默认值"""
+        if not data:
+            return cls()
+        return cls(**{k: data[k] for k in _PROFILE_FIELDS if k in data})
+
+
+_PROFILE_FIELDS: tuple[str, ...] = (
+    "target_market",
+    "supply_chain",
+    "seller_type",
+    "min_price",
+    "max_price",
+    "known_competitors",
+    "brand_name",
+    "target_audience",
+)
+
+
+@dataclass(slots=True)
 class AgentContext:
     """Agent 执行上下文"""
     session_id: str
-    profile: dict[str, Any]
+    # 调用方可传入画像 dict，构建时统一转换为 Profile
+    profile: Profile
     shared_memory: dict[str, Any] = field(default_factory=dict)
     other_agent_outputs: list[AgentOutput] = field(default_factory=list)
     debate_round: int = 0
+    _outputs_by_name: dict[str, AgentOutput] = field(
+        default_factory=dict, init=False, repr=False
+    )
+    
+    def __post_init__(self):
+        if not isinstance(self.profile, Profile):
+            self.profile = Profile.from_dict(self.profile)
+        # 按名称建立索引；同名输出保留首个，与原线性查找语义一致
+        for output in self.other_agent_outputs:
+            self._outputs_by_name.setdefault(output.agent_name, output)
+    
+    def add_output(self, output: AgentOutput) -> None:
+        """追加其他 Agent 的输出，同时维护名称索引"""
+        self.other_agent_outputs.append(output)
+        self._outputs_by_name.setdefault(output.agent_name, output)
     
     def get_agent_output(self, agent_name: str) -> Optional[AgentOutput]:
         """获取指定 Agent 的输出"""
-        for output in self.other_agent_outputs:
-            if output.agent_name == agent_name:
-                return output
-        return None
+        return self._outputs_by_name.get(agent_name)
+    
+    def get_peer_outputs(self, exclude_agent: str) -> list[AgentOutput]:
+        """获取除指定 Agent 外的其他输出，按名称排序保证提示词顺序稳定"""
+        return sorted(
+            (o for o in self.other_agent_outputs if o.agent_name != exclude_agent),
+            key=lambda o: o.agent_name,
+        )
 
 
 class BaseAgent(ABC):
@@ -125,7 +268,7 @@ class BaseAgent(ABC):
             })
     
     @abstractmethod
-    def get_system_prompt(self, context: AgentContext) -> str:
+    def get_system_prompt(self, context: AgentContext) -> SystemPrompt:
         """
         获取系统提示词
         
@@ -133,7 +276,7 @@ class BaseAgent(ABC):
             context: Agent 执行上下文
         
         Returns:
-            str: 系统提示词
+            SystemPrompt: 系统提示词，str 或 build_system_content() 构建的分段 content
         """
         pass
     
@@ -163,12 +306,107 @@ class BaseAgent(ABC):
         """
         return content
     
-    def execute_stream(self, context: AgentContext) -> Generator[str, None, AgentOutput]:
+    def _build_messages(self, context: AgentContext) -> list[dict[str, Any]]:
+        """构建消息列表（分段 content 原样透传，由 ArkClientWrapper 直接作为 input content 发送）"""
+        return [
+            {"role": "system", "content": self.get_system_prompt(context)},
+            {"role": "user", "content": self.get_user_prompt(context)},
+        ]
+    
+    def _consume_stream_event(
+        self,
+        event: StreamEvent,
+        content_parts: list[str],
+        thinking_parts: list[str],
+        sources: list[str],
+    ) -> Optional[str]:
+        """
+        按结构化事件类型归类思考/输出片段
+        
+        Returns:
+            Optional[str]: 需要向调用方产出的文本片段
+        """
+        if event.type is StreamEventType.OUTPUT_DELTA and event.content:
+            if not content_parts:
+                self._emit_event("agent_output")
+            content_parts.append(event.content)
+            if self.stream_writer is not None:
+                self._emit_event("agent_chunk", content=event.content)
+            return event.content
+        
+        if event.type is StreamEventType.THINKING_DELTA and event.content:
+            thinking_parts.append(event.content)
+            if self.stream_writer is not None:
+                self._emit_event("agent_thinking_chunk", content=event.content)
+            return event.content
+        
+        if event.type is StreamEventType.RESPONSE_COMPLETE:
+            sources.extend((event.metadata or {}).get("sources") or [])
+        
+        return None
+    
+    def _complete_output(
+        self,
+        context: AgentContext,
+        content_parts: list[str],
+        thinking_parts: list[str],
+        sources: list[str],
+        start_time: float,
+    ) -> AgentOutput:
+        """后处理并构建成功输出，发送结束事件"""
+        full_content = "".join(content_parts)
+        full_content = self.post_process(full_content, context)
+        
+        duration_ms = int((time.monotonic() - start_time) * 1000)
+        
+        output = AgentOutput(
+            agent_name=self.name,
+            content=full_content,
+            sources=sources,
+            thinking="".join(thinking_parts) if thinking_parts else None,
+            duration_ms=duration_ms,
+            status=AgentStatus.COMPLETED
+        )
+        
+        # 发送结束事件
+        self._emit_event(
+            "agent_end",
+            status="completed",
+            duration_ms=duration_ms
+        )
+        
+        logger.info(f"Agent {self.name} 执行完成，耗时 {duration_ms}ms")
+        return output
+    
+    def _failed_output(self, error: Exception, start_time: float) -> AgentOutput:
+        """构建失败输出，发送错误事件"""
+        duration_ms = int((time.monotonic() - start_time) * 1000)
+        
+        self._emit_event(
+            "agent_error",
+            error=str(error),
+            duration_ms=duration_ms
+        )
+        
+        logger.error(f"Agent {self.name} 执行失败: {error}")
+        
+        return AgentOutput(
+            agent_name=self.name,
+            content="",
+            duration_ms=duration_ms,
+            status=AgentStatus.FAILED,
+            error_message=str(error)
+        )
+    
+    def execute_stream(
+        self, context: AgentContext, coalesce_chars: int = 0
+    ) -> Generator[str, None, AgentOutput]:
         """
         流式执行 Agent
         
         Args:
             context: Agent 执行上下文
+            coalesce_chars: > 0 时合并模型输出增量到至少该字符数（仅非流式调用使用）
         
         Yields:
             str: 流式输出的内容片段
@@ -177,97 +415,94 @@ class BaseAgent(ABC):
             AgentOutput: 最终输出结果
         """
         self._execution_id = str(uuid.uuid4())
-        start_time = time.time()
+        start_time = time.monotonic()
         
         # 发送开始事件
         self._emit_event("agent_start", execution_id=self._execution_id)
         
         try:
-            system_prompt = self.get_system_prompt(context)
-            user_prompt = self.get_user_prompt(context)
+            messages = self._build_messages(context)
             
-            messages = [
-                {"role": "system", "content": system_prompt},
-                {"role": "user", "content": user_prompt}
-            ]
-            
-            content_parts = []
-            thinking_parts = []
-            is_thinking = True
+            content_parts: list[str] = []
+            thinking_parts: list[str] = []
+            sources: list[str] = []
             
             # 发送 thinking 开始
             self._emit_event("agent_thinking")
             
-            for chunk in self.ark_client.create_response_stream(
+            for event in self.ark_client.create_response_stream_v2(
                 messages=messages,
                 model=self.model,
                 use_websearch=self.use_websearch,
-                websearch_limit=self.websearch_limit
+                websearch_limit=self.websearch_limit,
+                thinking_mode=getattr(self, "thinking_mode", None),
+                coalesce_chars=coalesce_chars,
             ):
-                # 检测思考结束标记
-                if "<<<THINKING_ENDS>>>" in chunk or "<<<<THINKING_ENDS>>>>" in chunk:
-                    is_thinking = False
-                    self._emit_event("agent_output")
-                    continue
-                
-                # 跳过报告开始标记
-                if "<<<REPORT_STARTS>>>" in chunk or "<<<<REPORT_STARTS>>>>" in chunk:
-                    continue
-                
-                if is_thinking:
-                    thinking_parts.append(chunk)
-                else:
-                    content_parts.append(chunk)
-                
-                # 发送流式内容
-                self._emit_event(
-                    "agent_chunk" if not is_thinking else "agent_thinking_chunk",
-                    content=chunk
+                chunk = self._consume_stream_event(
+                    event, content_parts, thinking_parts, sources
                 )
-                yield chunk
-            
-            # 后处理
-            full_content = "".join(content_parts)
-            full_content = self.post_process(full_content, context)
-            
-            duration_ms = int((time.time() - start_time) * 1000)
-            
-            output = AgentOutput(
-                agent_name=self.name,
-                content=full_content,
-                thinking="".join(thinking_parts) if thinking_parts else None,
-                duration_ms=duration_ms,
-                status=AgentStatus.COMPLETED
-            )
+                if chunk is not None:
+                    yield chunk
             
-            # 发送结束事件
-            self._emit_event(
-                "agent_end",
-                status="completed",
-                duration_ms=duration_ms
+            return self._complete_output(
+                context, content_parts, thinking_parts, sources, start_time
             )
             
-            logger.info(f"Agent {self.name} 执行完成，耗时 {duration_ms}ms")
-            return output
-            
         except Exception as e:
-            duration_ms = int((time.time() - start_time) * 1000)
+            return self._failed_output(e, start_time)
+    
+    async def aexecute_stream(
+        self, context: AgentContext, coalesce_chars: int = 0
+    ) -> AsyncGenerator[Union[str, AgentOutput], None]:
+        """
+        异步流式执行 Agent（基于 ArkClientWrapper.acreate_response_stream_v2）
+        
+        Args:
+            context: Agent 执行上下文
+            coalesce_chars: > 0 时合并模型输出增量到至少该字符数（仅非流式调用使用）
+        
+        Yields:
+            str: 流式输出的内容片段；
+            AgentOutput: 最后一项为最终输出结果（异步生成器不支持 return 值）
+        """
+        self._execution_id = str(uuid.uuid4())
+        start_time = time.monotonic()
+        
+        # 发送开始事件
+        self._emit_event("agent_start", execution_id=self._execution_id)
+        
+        try:
+            messages = self._build_messages(context)
             
-            self._emit_event(
-                "agent_error",
-                error=str(e),
-                duration_ms=duration_ms
-            )
+            content_parts: list[str] = []
+            thinking_parts: list[str] = []
+            sources: list[str] = []
             
-            logger.error(f"Agent {self.name} 执行失败: {e}")
+            # 发送 thinking 开始
+            self._emit_event("agent_thinking")
+            
+            async for event in self.ark_client.acreate_response_stream_v2(
+                messages=messages,
+                model=self.model,
+                use_websearch=self.use_websearch,
+                websearch_limit=self.websearch_limit,
+                thinking_mode=getattr(self, "thinking_mode", None),
+                coalesce_chars=coalesce_chars,
+            ):
+                chunk = self._consume_stream_event(
+                    event, content_parts, thinking_parts, sources
+                )
+                if chunk is not None:
+                    yield chunk
             
-            return AgentOutput(
-                agent_name=self.name,
-                content="",
-                duration_ms=duration_ms,
-                status=AgentStatus.FAILED,
-                error_message=str(e)
+            output = self._complete_output(
+                context, content_parts, thinking_parts, sources, start_time
             )
+            
+        except Exception as e:
+            output = self._failed_output(e, start_time)
+        
+        yield output
     
     def execute(self, context: AgentContext) -> AgentOutput:
         """
@@ -280,14 +515,66 @@ class BaseAgent(ABC):
             AgentOutput: 输出结果
         """
         output = None
-        for _ in self.execute_stream(context):
-            pass  # 消费所有流式输出
-        # execute_stream 是生成器，需要处理返回值
-        # 由于 Python 生成器的特性，需要通过 StopIteration 获取返回值
-        gen = self.execute_stream(context)
+        # execute_stream 是生成器，只驱动一次；返回值通过 StopIteration 获取
+        gen = self.execute_stream(
+            context, coalesce_chars=self._non_streaming_coalesce_chars()
+        )
         try:
             while True:
                 next(gen)
         except StopIteration as e:
             output = e.value
         return output
+    
+    async def aexecute(self, context: AgentContext) -> AgentOutput:
+        """
+        异步非流式执行 Agent
+        
+        Args:
+            context: Agent 执行上下文
+        
+        Returns:
+            AgentOutput: 输出结果
+        """
+        output = None
+        async for item in self.aexecute_stream(
+            context, coalesce_chars=self._non_streaming_coalesce_chars()
+        ):
+            if isinstance(item, AgentOutput):
+                output = item
+        return output
+
+    def _non_streaming_coalesce_chars(self) -> int:
+        """无 stream_writer 时没有逐 token 的观察者，可合并输出增量"""
+        return EXECUTE_COALESCE_CHARS if self.stream_writer is None else 0
+
+
+async def run_agents_concurrently(
+    runs: Iterable[tuple[BaseAgent, AgentContext]],
+    max_concurrency: Optional[int] = DEFAULT_AGENT_CONCURRENCY,
+) -> list[AgentOutput]:
+    """
+    并发执行多个 Agent（asyncio.gather 扇出）
+
+    各 Agent 之间无依赖（如同一轮内的多组同行评审），可同时发起，
+    整体耗时由最慢的一次调用决定。单个 Agent 失败以 FAILED 输出返回，不影响其余。
+
+    Args:
+        runs: (Agent, 上下文) 序列
+        max_concurrency: 同时在途的调用上限（信号量），None 或 <= 0 表示不限制
+
+    Returns:
+        list[AgentOutput]: 与输入顺序一致的输出列表
+    """
+    if not max_concurrency or max_concurrency <= 0:
+        return list(
+            await asyncio.gather(*(agent.aexecute(context) for agent, context in runs))
+        )
+
+    semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _run(agent: BaseAgent, context: AgentContext) -> AgentOutput:
+        async with semaphore:
+            return await agent.aexecute(context)
+
+    return list(await asyncio.gather(*(_run(agent, context) for agent, context in runs)))
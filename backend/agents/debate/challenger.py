@@ -4,96 +4,28 @@
 对分析报告进行批判性审查和质疑
 """
 
-from typing import Optional, Callable, Literal
-
-from core.config import (
-    settings, 
-    AGENT_DEBATE_CHALLENGER,
-    AGENT_MODEL_MAPPING,
-    AGENT_WEBSEARCH_CONFIG,
-    AGENT_THINKING_MODE,
-)
+import hashlib
+import sys
+import uuid
+from typing import AsyncGenerator, Final, Generator, Optional, Callable, Literal, Union
+
+from core.config import settings, AGENT_DEBATE_CHALLENGER
 from core.ark_client import ArkClientWrapper
-from agents.base import BaseAgent, AgentContext, AgentOutput
+from tools.cache import ToolCache
+from agents.factory import get_agent_display_name
+from agents.base import (
+    BaseAgent,
+    AgentContext,
+    AgentOutput,
+    AgentStatus,
+    SystemPrompt,
+    build_system_content,
+    get_agent_config,
+)
 
 
-class ChallengerAgent(BaseAgent):
-    """
-    红队审查官 Agent
-    
-    核心职责：
-    - 对分析报告进行批判性审查
-    - 质疑数据可靠性和逻辑严密性
-    - 检测覆盖完整性和潜在偏见
-    - 提出改进建议
-    
-    使用模型：deepseek-v3-2-251201
-    - 批判性思维能力强
-    - 逻辑反驳能力强
-    - 适合结构化质疑
-    """
-    
-    name = AGENT_DEBATE_CHALLENGER
-    description = "红队审查官 - 批判性审查和质疑"
-    
-    # 辩论质疑不需要联网搜索
-    model = AGENT_MODEL_MAPPING.get(AGENT_DEBATE_CHALLENGER, settings.default_model)
-    use_websearch = False
-    websearch_limit = 0
-    
-    def __init__(
-        self,
-        ark_client: Optional[ArkClientWrapper] = None,
-        stream_writer: Optional[Callable[[dict], None]] = None,
-        challenge_mode: Literal["peer", "redteam"] = "redteam"
-    ):
-        """
-        初始化红队审查官
-        
-        Args:
-            ark_client: Ark 客户端
-            stream_writer: 流式写入器
-            challenge_mode: 质疑模式
-                - "peer": 同行评审 (Worker 之间互相质疑)
-                - "redteam": 红队审查 (DeepSeek 审查所有 Worker)
-        """
-        super().__init__(ark_client, stream_writer)
-        self.thinking_mode = AGENT_THINKING_MODE.get(AGENT_DEBATE_CHALLENGER)
-        self.challenge_mode = challenge_mode
-        
-        # 动态设置的目标 Agent
-        self._target_agent: Optional[str] = None
-        self._target_content: Optional[str] = None
-        self._challenger_agent: Optional[str] = None
-    
-    def set_challenge_context(
-        self,
-        target_agent: str,
-        target_content: str,
-        challenger_agent: Optional[str] = None
-    ):
-        """
-        设置质疑上下文
-        
-        Args:
-            target_agent: 被质疑的 Agent 名称
-            target_content: 被质疑的内容
-            challenger_agent: 质疑方 Agent 名称 (peer 模式下使用)
-        """
-        self._target_agent = target_agent
-        self._target_content = target_content
-        self._challenger_agent = challenger_agent
-    
-    def get_system_prompt(self, context: AgentContext) -> str:
-        """获取系统提示词"""
-        if self.challenge_mode == "peer":
-            return self._get_peer_system_prompt()
-        else:
-            return self._get_redteam_system_prompt()
-    
-    def _get_peer_system_prompt(self) -> str:
-        """同行评审系统提示词"""
-        return """你是一位【同行评审员】，正在对另一位分析师的报告进行专业审查。
+# 静态提示词（框架/格式/原则），模块级常量只构建一次，跨轮次逐字节一致
+_STATIC_PEER_PROMPT: Final[str] = sys.intern("""你是一位【同行评审员】，正在对另一位分析师的报告进行专业审查。
 
 ## 审查原则
 1. **建设性批评**：指出问题的同时给出改进建议
@@ -123,11 +55,9 @@ class ChallengerAgent(BaseAgent):
 - 保持专业和尊重的态度
 - 优先关注高影响力的问题
 - 给出 2-4 个最关键的质疑点
-- 如果认同某些观点，也可以表示支持"""
+- 如果认同某些观点，也可以表示支持""")
 
-    def _get_redteam_system_prompt(self) -> str:
-        """红队审查系统提示词"""
-        return """你是【红队审查官】，职责是对分析报告进行严格的批判性审查。
+_STATIC_REDTEAM_PROMPT: Final[str] = sys.intern("""你是【红队审查官】，职责是对分析报告进行严格的批判性审查。
 
 ## 核心职责
 作为"魔鬼代言人"，你的任务是：
@@ -183,34 +113,23 @@ class ChallengerAgent(BaseAgent):
 - 🎯 精准：针对具体观点，避免泛泛而谈
 - 📊 有据：基于逻辑和事实进行质疑
 - 🔨 有力：指出真正的问题，不是吹毛求疵
-- 💡 建设：每个质疑都要有改进建议"""
+- 💡 建设：每个质疑都要有改进建议""")
 
-    def get_user_prompt(self, context: AgentContext) -> str:
-        """获取用户提示词"""
-        target_agent = self._target_agent or "未知分析师"
-        target_content = self._target_content or "无内容"
-        
-        agent_display_names = {
-            "trend_scout": "趋势侦察员",
-            "competitor_analyst": "竞争分析师", 
-            "regulation_checker": "法规检查员",
-            "social_sentinel": "社媒哨兵",
-        }
-        
-        target_display = agent_display_names.get(target_agent, target_agent)
-        
-        if self.challenge_mode == "peer":
-            challenger_display = agent_display_names.get(
-                self._challenger_agent, self._challenger_agent or "同行评审员"
-            )
-            
-            prompt = f"""## 同行评审任务
+# 被审查内容少于该长度（去除空白后）时不发起审查
+_MIN_REVIEWABLE_CHARS: Final[int] = 200
 
-你是 **{challenger_display}**，现在需要对 **{target_display}** 的分析报告进行专业审查。
+# Worker / 审查官 post_process 返回的降级占位文案特征
+_FALLBACK_MARKERS: Final[tuple[str, ...]] = ("暂无足够数据", "暂无法完成审查")
 
-### 被审查报告
+_SKIPPED_REVIEW_CONTENT: Final[str] = "## 审查报告\n\n被审查内容不足，已跳过本次审查。"
 
-{target_content}
+_FAILED_REVIEW_CONTENT: Final[str] = "## 审查报告\n\n暂无法完成审查，请稍后重试。"
+
+# 用户提示词模板：静态段为模块级常量，固定指令在前、动态内容（目标名称与报告正文）
+# 在后，使不同目标的请求共享尽可能长的前缀，便于服务端前缀缓存复用
+_PEER_USER_TPL: Final[str] = """## 同行评审任务
+
+你需要以自己的专业视角，对另一位分析师的报告进行专业审查。
 
 ### 审查要求
 1. 从你的专业视角出发，审查这份报告
@@ -218,31 +137,326 @@ class ChallengerAgent(BaseAgent):
 3. 指出可能与你的分析存在矛盾的地方
 4. 给出具体的改进建议
 
-请开始审查并提出你的质疑："""
-        
-        else:  # redteam mode
-            prompt = f"""## 红队审查任务
-
-请对以下 **{target_display}** 的分析报告进行严格的批判性审查。
+### 审查角色
+你是 **{challenger_display}**，被审查方为 **{target_display}**。
 
 ### 被审查报告
 
 {target_content}
 
+请开始审查并提出你的质疑："""
+
+_REDTEAM_USER_TPL: Final[str] = """## 红队审查任务
+
+请对下方分析报告进行严格的批判性审查。
+
 ### 审查要求
 1. 从数据可靠性、逻辑严密性、覆盖完整性、偏见检测四个维度进行审查
 2. 找出 3-5 个最关键的问题
 3. 对每个问题评估风险等级
 4. 给出具体的改进建议
 
+### 被审查报告（{target_display}）
+
+{target_content}
+
 请开始红队审查："""
+
+
+def _is_reviewable(content: Optional[str]) -> bool:
+    """目标内容是否值得审查（过短或为降级占位文案时跳过）"""
+    content = (content or "").strip()
+    if len(content) < _MIN_REVIEWABLE_CHARS:
+        return False
+    head = content[:120]
+    return not any(marker in head for marker in _FALLBACK_MARKERS)
+
+
+_CONFIG = get_agent_config(AGENT_DEBATE_CHALLENGER)
+
+# 质疑结果缓存：相同 (模式, 目标, 目标内容) 的审查直接复用，进程内 TTL + LRU
+_CHALLENGE_CACHE = ToolCache(
+    ttl_seconds=settings.challenge_cache_ttl_seconds,
+    max_size=settings.challenge_cache_max_size,
+)
+
+
+class ChallengerAgent(BaseAgent):
+    """
+    红队审查官 Agent
+    
+    核心职责：
+    - 对分析报告进行批判性审查
+    - 质疑数据可靠性和逻辑严密性
+    - 检测覆盖完整性和潜在偏见
+    - 提出改进建议
+    
+    使用模型：deepseek-v3-2-251201
+    - 批判性思维能力强
+    - 逻辑反驳能力强
+    - 适合结构化质疑
+    """
+    
+    name = AGENT_DEBATE_CHALLENGER
+    description = "红队审查官 - 批判性审查和质疑"
+    
+    # 辩论质疑不需要联网搜索
+    model = _CONFIG.model
+    use_websearch = False
+    websearch_limit = 0
+    
+    # 目标内容不足时的占位审查结果
+    SKIPPED_REVIEW_CONTENT: Final[str] = _SKIPPED_REVIEW_CONTENT
+    
+    def __init__(
+        self,
+        ark_client: Optional[ArkClientWrapper] = None,
+        stream_writer: Optional[Callable[[dict], None]] = None,
+        challenge_mode: Literal["peer", "redteam"] = "redteam"
+    ):
+        """
+        初始化红队审查官
+        
+        Args:
+            ark_client: Ark 客户端
+            stream_writer: 流式写入器
+            challenge_mode: 质疑模式
+                - "peer": 同行评审 (Worker 之间互相质疑)
+                - "redteam": 红队审查 (DeepSeek 审查所有 Worker)
+        """
+        super().__init__(ark_client, stream_writer)
+        self.thinking_mode = _CONFIG.thinking_mode
+        self.challenge_mode = challenge_mode
+        
+        # 动态设置的目标 Agent
+        self._target_agent: Optional[str] = None
+        self._target_content: Optional[str] = None
+        self._challenger_agent: Optional[str] = None
+    
+    def set_challenge_context(
+        self,
+        target_agent: str,
+        target_content: str,
+        challenger_agent: Optional[str] = None
+    ):
+        """
+        设置质疑上下文
+        
+        Args:
+            target_agent: 被质疑的 Agent 名称
+            target_content: 被质疑的内容
+            challenger_agent: 质疑方 Agent 名称 (peer 模式下使用)
+        """
+        self._target_agent = target_agent
+        self._target_content = target_content
+        self._challenger_agent = challenger_agent
+    
+    def get_system_prompt(self, context: AgentContext) -> SystemPrompt:
+        """获取系统提示词（静态段 + 模式/目标元信息动态段）"""
+        if self.challenge_mode == "peer":
+            return build_system_content(
+                self._get_peer_system_prompt(), self._get_dynamic_system_prompt()
+            )
+        else:
+            return build_system_content(
+                self._get_redteam_system_prompt(), self._get_dynamic_system_prompt()
+            )
+    
+    def _get_peer_system_prompt(self) -> str:
+        """同行评审系统提示词"""
+        return _STATIC_PEER_PROMPT
+
+    def _get_redteam_system_prompt(self) -> str:
+        """红队审查系统提示词"""
+        return _STATIC_REDTEAM_PROMPT
+
+    def _get_dynamic_system_prompt(self) -> Optional[str]:
+        """动态段：仅包含质疑模式与目标元信息"""
+        if not self._target_agent:
+            return None
+
+        target_display = get_agent_display_name(self._target_agent)
+        if self.challenge_mode == "peer":
+            challenger_display = (
+                get_agent_display_name(self._challenger_agent)
+                if self._challenger_agent
+                else "同行评审员"
+            )
+            return (
+                "## 本轮审查\n"
+                "- 审查模式：同行评审\n"
+                f"- 评审方：{challenger_display}\n"
+                f"- 被审查对象：{target_display}"
+            )
+        return (
+            "## 本轮审查\n"
+            "- 审查模式：红队审查\n"
+            f"- 被审查对象：{target_display}"
+        )
+
+    def get_user_prompt(self, context: AgentContext) -> str:
+        """获取用户提示词"""
+        target_agent = self._target_agent or "未知分析师"
+        target_content = self._target_content or "无内容"
+        
+        target_display = get_agent_display_name(target_agent)
+        
+        if self.challenge_mode == "peer":
+            challenger_display = (
+                get_agent_display_name(self._challenger_agent)
+                if self._challenger_agent
+                else "同行评审员"
+            )
+            
+            prompt = _PEER_USER_TPL.format_map(
+                {
+                    "challenger_display": challenger_display,
+                    "target_display": target_display,
+                    "target_content": target_content,
+                }
+            )
+        
+        else:  # redteam mode
+            prompt = _REDTEAM_USER_TPL.format_map(
+                {
+                    "target_display": target_display,
+                    "target_content": target_content,
+                }
+            )
         
         return prompt
     
+    def has_reviewable_target(self) -> bool:
+        """当前是否存在值得审查的目标内容"""
+        return _is_reviewable(self._target_content)
+
+    def _skipped_output(self) -> AgentOutput:
+        """跳过审查时的占位输出（不发起 LLM 调用）"""
+        self._execution_id = str(uuid.uuid4())
+        self._emit_event("agent_start", execution_id=self._execution_id, skipped=True)
+        self._emit_event("agent_end", status="completed", duration_ms=0)
+        return AgentOutput(
+            agent_name=self.name,
+            content=_SKIPPED_REVIEW_CONTENT,
+            artifacts={"skipped": True},
+            duration_ms=0,
+            status=AgentStatus.COMPLETED,
+        )
+
+    def _challenge_cache_key(self) -> Optional[str]:
+        """质疑结果缓存 key；未设置目标内容时不缓存"""
+        if not self._target_content:
+            return None
+        content_hash = hashlib.sha256(self._target_content.encode("utf-8")).hexdigest()
+        return ToolCache.hash_prompt(
+            self.name,
+            self.model,
+            settings.prompt_template_version,
+            self.challenge_mode,
+            self._target_agent or "",
+            self._challenger_agent or "",
+            content_hash,
+        )
+
+    @staticmethod
+    def _lookup_cache(cache_key: Optional[str]) -> Optional[dict]:
+        if not cache_key:
+            return None
+        cached = _CHALLENGE_CACHE.get(cache_key)
+        if not cached or not cached.get("content"):
+            return None
+        return cached
+
+    @staticmethod
+    def _save_cache(
+        cache_key: Optional[str], content: Optional[str], thinking: Optional[str]
+    ) -> None:
+        # 空内容与失败占位文案不缓存
+        if cache_key and content and content.strip() and content != _FAILED_REVIEW_CONTENT:
+            _CHALLENGE_CACHE.set(cache_key, {"content": content, "thinking": thinking})
+
+    def get_cached_challenge(self) -> Optional[str]:
+        """
+        当前审查目标的缓存质疑结果（供图引擎直接调用模型的路径使用）
+
+        不下发生命周期事件；未命中返回 None
+        """
+        cached = self._lookup_cache(self._challenge_cache_key())
+        return cached["content"] if cached else None
+
+    def store_challenge(self, content: Optional[str], thinking: Optional[str] = None) -> None:
+        """缓存当前审查目标的质疑结果（供图引擎直接调用模型的路径使用）"""
+        self._save_cache(self._challenge_cache_key(), content, thinking)
+
+    def _cached_output(self, cache_key: Optional[str]) -> Optional[AgentOutput]:
+        """命中缓存时构建输出并补发生命周期事件"""
+        cached = self._lookup_cache(cache_key)
+        if cached is None:
+            return None
+
+        self._execution_id = str(uuid.uuid4())
+        self._emit_event(
+            "agent_start", execution_id=self._execution_id, cache_hit=True
+        )
+        self._emit_event("agent_end", status="completed", duration_ms=0)
+        return AgentOutput(
+            agent_name=self.name,
+            content=cached["content"],
+            thinking=cached.get("thinking"),
+            artifacts={"cache_hit": True},
+            duration_ms=0,
+            status=AgentStatus.COMPLETED,
+        )
+
+    def _store_output(self, cache_key: Optional[str], output: AgentOutput) -> None:
+        if output.status == AgentStatus.COMPLETED:
+            self._save_cache(cache_key, output.content, output.thinking)
+
+    def execute_stream(
+        self, context: AgentContext, coalesce_chars: int = 0
+    ) -> Generator[str, None, AgentOutput]:
+        """流式执行质疑，目标内容不足或命中结果缓存时跳过 LLM 调用"""
+        if not self.has_reviewable_target():
+            output = self._skipped_output()
+            yield output.content
+            return output
+
+        cache_key = self._challenge_cache_key()
+        output = self._cached_output(cache_key)
+        if output is not None:
+            yield output.content
+            return output
+
+        output = yield from super().execute_stream(context, coalesce_chars)
+        self._store_output(cache_key, output)
+        return output
+
+    async def aexecute_stream(
+        self, context: AgentContext, coalesce_chars: int = 0
+    ) -> AsyncGenerator[Union[str, AgentOutput], None]:
+        """异步流式执行质疑，目标内容不足或命中结果缓存时跳过 LLM 调用"""
+        if not self.has_reviewable_target():
+            output = self._skipped_output()
+            yield output.content
+            yield output
+            return
+
+        cache_key = self._challenge_cache_key()
+        output = self._cached_output(cache_key)
+        if output is not None:
+            yield output.content
+            yield output
+            return
+
+        async for item in super().aexecute_stream(context, coalesce_chars):
+            if isinstance(item, AgentOutput):
+                self._store_output(cache_key, item)
+            yield item
+
     def post_process(self, content: str, context: AgentContext) -> str:
         """后处理"""
         if not content or not content.strip():
-            return "## 审查报告\n\n暂无法完成审查，请稍后重试。"
+            return _FAILED_REVIEW_CONTENT
         
         return content
 
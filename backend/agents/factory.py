@@ -5,7 +5,9 @@ Agent 工厂模块
 提供统一的 Agent 创建和获取接口
 """
 
-from typing import Optional, Callable, Type, Dict
+import threading
+from types import MappingProxyType
+from typing import Final, Mapping, Optional, Callable, Type
 
 from core.config import (
     AGENT_TREND_SCOUT,
@@ -24,37 +26,43 @@ from agents.base import BaseAgent
 # ============================================
 
 # 延迟导入，避免循环依赖
-_agent_registry: Dict[str, Type[BaseAgent]] = {}
+_agent_registry: Mapping[str, Type[BaseAgent]] = MappingProxyType({})
 _registry_initialized = False
+_registry_lock = threading.Lock()
 
 
 def _init_registry():
-    """初始化 Agent 注册表（延迟加载）"""
+    """初始化 Agent 注册表（延迟加载，双重检查加锁保证只导入一次）"""
     global _registry_initialized, _agent_registry
     
     if _registry_initialized:
         return
     
-    # 导入所有 Agent 类
-    from agents.market import (
-        TrendScoutAgent,
-        CompetitorAnalystAgent,
-        RegulationCheckerAgent,
-        SocialSentinelAgent,
-        SynthesizerAgent,
-    )
-    from agents.debate import ChallengerAgent
-    
-    _agent_registry = {
-        AGENT_TREND_SCOUT: TrendScoutAgent,
-        AGENT_COMPETITOR_ANALYST: CompetitorAnalystAgent,
-        AGENT_REGULATION_CHECKER: RegulationCheckerAgent,
-        AGENT_SOCIAL_SENTINEL: SocialSentinelAgent,
-        AGENT_SYNTHESIZER: SynthesizerAgent,
-        AGENT_DEBATE_CHALLENGER: ChallengerAgent,
-    }
-    
-    _registry_initialized = True
+    with _registry_lock:
+        if _registry_initialized:
+            return
+        
+        # 导入所有 Agent 类
+        from agents.market import (
+            TrendScoutAgent,
+            CompetitorAnalystAgent,
+            RegulationCheckerAgent,
+            SocialSentinelAgent,
+            SynthesizerAgent,
+        )
+        from agents.debate import ChallengerAgent
+        
+        # 初始化后只读
+        _agent_registry = MappingProxyType({
+            AGENT_TREND_SCOUT: TrendScoutAgent,
+            AGENT_COMPETITOR_ANALYST: CompetitorAnalystAgent,
+            AGENT_REGULATION_CHECKER: RegulationCheckerAgent,
+            AGENT_SOCIAL_SENTINEL: SocialSentinelAgent,
+            AGENT_SYNTHESIZER: SynthesizerAgent,
+            AGENT_DEBATE_CHALLENGER: ChallengerAgent,
+        })
+        
+        _registry_initialized = True
 
 
 def get_agent_class(agent_name: str) -> Optional[Type[BaseAgent]]:
@@ -80,6 +88,9 @@ def create_agent(
     """
     创建 Agent 实例
     
+    每次调用都返回新实例：Agent 持有 stream_writer、执行 ID 等单次调用状态，
+    不能在会话 / 线程之间共享。
+    
     Args:
         agent_name: Agent 名称
         ark_client: Ark 客户端实例，不传则使用默认单例
@@ -171,6 +182,25 @@ def agent_factory_for_graph(
 # 辅助函数
 # ============================================
 
+_AGENT_DISPLAY_NAMES: Final[dict[str, str]] = {
+    AGENT_TREND_SCOUT: "趋势侦察员",
+    AGENT_COMPETITOR_ANALYST: "竞争分析师",
+    AGENT_REGULATION_CHECKER: "法规检查员",
+    AGENT_SOCIAL_SENTINEL: "社媒哨兵",
+    AGENT_SYNTHESIZER: "综合分析师",
+    AGENT_DEBATE_CHALLENGER: "红队审查官",
+}
+
+_AGENT_DESCRIPTIONS: Final[dict[str, str]] = {
+    AGENT_TREND_SCOUT: "发现市场新兴趋势和机会窗口",
+    AGENT_COMPETITOR_ANALYST: "竞争格局分析和竞品研究",
+    AGENT_REGULATION_CHECKER: "合规风险审查和政策解读",
+    AGENT_SOCIAL_SENTINEL: "舆情监测和消费者洞察",
+    AGENT_SYNTHESIZER: "整合多维分析，形成最终报告",
+    AGENT_DEBATE_CHALLENGER: "批判性审查和质疑",
+}
+
+
 def get_agent_display_name(agent_name: str) -> str:
     """
     获取 Agent 的显示名称（中文）
@@ -181,15 +211,7 @@ def get_agent_display_name(agent_name: str) -> str:
     Returns:
         中文显示名称
     """
-    display_names = {
-        AGENT_TREND_SCOUT: "趋势侦察员",
-        AGENT_COMPETITOR_ANALYST: "竞争分析师",
-        AGENT_REGULATION_CHECKER: "法规检查员",
-        AGENT_SOCIAL_SENTINEL: "社媒哨兵",
-        AGENT_SYNTHESIZER: "综合分析师",
-        AGENT_DEBATE_CHALLENGER: "红队审查官",
-    }
-    return display_names.get(agent_name, agent_name)
+    return _AGENT_DISPLAY_NAMES.get(agent_name, agent_name)
 
 
 def get_agent_description(agent_name: str) -> str:
@@ -202,12 +224,4 @@ def get_agent_description(agent_name: str) -> str:
     Returns:
         Agent 描述
     """
-    descriptions = {
-        AGENT_TREND_SCOUT: "发现市场新兴趋势和机会窗口",
-        AGENT_COMPETITOR_ANALYST: "竞争格局分析和竞品研究",
-        AGENT_REGULATION_CHECKER: "合规风险审查和政策解读",
-        AGENT_SOCIAL_SENTINEL: "舆情监测和消费者洞察",
-        AGENT_SYNTHESIZER: "整合多维分析，形成最终报告",
-        AGENT_DEBATE_CHALLENGER: "批判性审查和质疑",
-    }
-    return descriptions.get(agent_name, "未知 Agent")
+    return _AGENT_DESCRIPTIONS.get(agent_name, "未知 Agent")
@@ -4,58 +4,22 @@
 专注于竞争格局分析和竞品研究
 """
 
-from typing import Optional, Callable
-
-from core.config import (
-    settings,
-    AGENT_COMPETITOR_ANALYST,
-    AGENT_MODEL_MAPPING,
-    AGENT_WEBSEARCH_CONFIG,
-    AGENT_THINKING_MODE,
-)
-from core.ark_client import ArkClientWrapper
-from agents.base import BaseAgent, AgentContext
-
+import sys
+from typing import Any, Final, Optional, Callable
 
-class CompetitorAnalystAgent(BaseAgent):
-    """
-    竞争分析师 Agent
-
-    核心职责：
-    - 绘制竞争格局图谱
-    - 剖析竞品策略和优劣势
-    - 识别差异化机会
-    - 评估进入壁垒
-
-    使用模型：deepseek-v3-2-251201
-    - 逻辑推理能力强
-    - 结构化分析能力强
-    - 适合对比分析和策略推演
-    """
-
-    name = AGENT_COMPETITOR_ANALYST
-    description = "竞争分析师 - 竞争格局分析和竞品研究"
-
-    # 从配置获取模型和搜索设置
-    model = AGENT_MODEL_MAPPING.get(AGENT_COMPETITOR_ANALYST, settings.default_model)
-    use_websearch = AGENT_WEBSEARCH_CONFIG.get(AGENT_COMPETITOR_ANALYST, {}).get(
-        "enabled", True
-    )
-    websearch_limit = AGENT_WEBSEARCH_CONFIG.get(AGENT_COMPETITOR_ANALYST, {}).get(
-        "limit", 15
-    )
+from core.config import AGENT_COMPETITOR_ANALYST
+from core.ark_client import ArkClientWrapper
+from agents.base import (
+    BaseAgent,
+    AgentContext,
+    SystemPrompt,
+    build_system_content,
+    get_agent_config,
+)
 
-    def __init__(
-        self,
-        ark_client: Optional[ArkClientWrapper] = None,
-        stream_writer: Optional[Callable[[dict], None]] = None,
-    ):
-        super().__init__(ark_client, stream_writer)
-        self.thinking_mode = AGENT_THINKING_MODE.get(AGENT_COMPETITOR_ANALYST)
 
-    def get_system_prompt(self, context: AgentContext) -> str:
-        """获取系统提示词"""
-        return """你是【竞争分析师】，专注于竞争格局分析和竞品研究。
+# 系统提示词为纯常量，模块级构建并驻留一次
+_SYSTEM_PROMPT: Final[str] = sys.intern("""你是【竞争分析师】，专注于竞争格局分析和竞品研究。
 
 ## 核心职责
 1. **绘制竞争格局**：梳理市场主要玩家、市场份额、竞争态势
@@ -80,29 +44,13 @@ class CompetitorAnalystAgent(BaseAgent):
 3. 给出避开强敌和弯道超车的具体建议
 
 ## 输出格式
-使用 Markdown 格式，善用表格、列表进行结构化呈现。"""
+使用 Markdown 格式，善用表格、列表进行结构化呈现。""")
 
-    def get_user_prompt(self, context: AgentContext) -> str:
-        """获取用户提示词"""
-        profile = context.profile
-
-        target_market = profile.get("target_market", "未指定市场")
-        supply_chain = profile.get("supply_chain", "未指定品类")
-        seller_type = profile.get("seller_type", "未指定卖家类型")
-        min_price = profile.get("min_price", None)
-        max_price = profile.get("max_price", None)
-        price_range = (
-            f"${min_price}-${max_price}"
-            if (min_price is not None and max_price is not None)
-            else "未指定"
-        )
+# 已分段的系统 content 同样只构建一次，各次调用共享（只读）
+_SYSTEM_CONTENT: Final[list[dict[str, Any]]] = build_system_content(_SYSTEM_PROMPT)
 
-        competitors = profile.get("known_competitors", [])
-        competitors_text = (
-            "、".join(competitors) if competitors else "（请你自行识别 Top 竞品）"
-        )
-
-        prompt = f"""## 分析任务
+# 用户提示词模板：静态段为模块级常量，仅替换变量
+_USER_PROMPT_TPL: Final[str] = """## 分析任务
 请针对以下业务场景，进行全面的竞争分析：
 
 ### 用户画像
@@ -126,12 +74,71 @@ class CompetitorAnalystAgent(BaseAgent):
 - 竞品的技术壁垒和专利布局
 - 潜在的新进入者和跨界竞争者"""
 
+
+_CONFIG = get_agent_config(AGENT_COMPETITOR_ANALYST)
+
+
+class CompetitorAnalystAgent(BaseAgent):
+    """
+    竞争分析师 Agent
+
+    核心职责：
+    - 绘制竞争格局图谱
+    - 剖析竞品策略和优劣势
+    - 识别差异化机会
+    - 评估进入壁垒
+
+    使用模型：deepseek-v3-2-251201
+    - 逻辑推理能力强
+    - 结构化分析能力强
+    - 适合对比分析和策略推演
+    """
+
+    name = AGENT_COMPETITOR_ANALYST
+    description = "竞争分析师 - 竞争格局分析和竞品研究"
+
+    # 从配置获取模型和搜索设置
+    model = _CONFIG.model
+    use_websearch = _CONFIG.use_websearch
+    websearch_limit = _CONFIG.websearch_limit
+
+    def __init__(
+        self,
+        ark_client: Optional[ArkClientWrapper] = None,
+        stream_writer: Optional[Callable[[dict], None]] = None,
+    ):
+        super().__init__(ark_client, stream_writer)
+        self.thinking_mode = _CONFIG.thinking_mode
+
+    def get_system_prompt(self, context: AgentContext) -> SystemPrompt:
+        """获取系统提示词（纯静态，单段 content 便于前缀缓存命中）"""
+        return _SYSTEM_CONTENT
+
+    def get_user_prompt(self, context: AgentContext) -> str:
+        """获取用户提示词"""
+        profile = context.profile
+
+        competitors = profile.known_competitors
+        competitors_text = (
+            "、".join(competitors) if competitors else "（请你自行识别 Top 竞品）"
+        )
+
+        prompt = _USER_PROMPT_TPL.format_map(
+            {
+                "target_market": profile.target_market,
+                "supply_chain": profile.supply_chain,
+                "seller_type": profile.seller_type,
+                "price_range": profile.price_range,
+                "competitors_text": competitors_text,
+            }
+        )
+
         # 辩论模式下添加其他 Agent 输出
         if context.debate_round > 0 and context.other_agent_outputs:
-            prompt += "\n\n### 参考信息\n"
-            for output in context.other_agent_outputs:
-                if output.agent_name != self.name:
-                    prompt += f"\n**{output.agent_name}**:\n{output.content[:500]}...\n"
+            parts = [prompt, "\n\n### 参考信息\n"]
+            for output in context.get_peer_outputs(self.name):
+                parts.append(f"\n**{output.agent_name}**:\n{output.content_digest}...\n")
+            prompt = "".join(parts)
 
         return prompt
 
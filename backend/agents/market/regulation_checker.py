@@ -4,58 +4,22 @@
 专注于合规风险审查和政策解读
 """
 
-from typing import Optional, Callable
-
-from core.config import (
-    settings,
-    AGENT_REGULATION_CHECKER,
-    AGENT_MODEL_MAPPING,
-    AGENT_WEBSEARCH_CONFIG,
-    AGENT_THINKING_MODE,
-)
-from core.ark_client import ArkClientWrapper
-from agents.base import BaseAgent, AgentContext
-
-
-class RegulationCheckerAgent(BaseAgent):
-    """
-    法规检查员 Agent
-
-    核心职责：
-    - 识别适用的法规要求
-    - 评估合规成本
-    - 预警政策变化
-    - 提供合规路径
-
-    使用模型：kimi-k2-thinking-251104
-    - 长文档阅读能力强
-    - 支持 Thinking 模式，适合复杂法规分析
-    - 细节把控能力强
-    """
+import sys
+from typing import Any, Final, Optional, Callable
 
-    name = AGENT_REGULATION_CHECKER
-    description = "法规检查员 - 合规风险审查和政策解读"
-
-    # 从配置获取模型和搜索设置
-    model = AGENT_MODEL_MAPPING.get(AGENT_REGULATION_CHECKER, settings.default_model)
-    use_websearch = AGENT_WEBSEARCH_CONFIG.get(AGENT_REGULATION_CHECKER, {}).get(
-        "enabled", True
-    )
-    websearch_limit = AGENT_WEBSEARCH_CONFIG.get(AGENT_REGULATION_CHECKER, {}).get(
-        "limit", 15
-    )
+from core.config import AGENT_REGULATION_CHECKER
+from core.ark_client import ArkClientWrapper
+from agents.base import (
+    BaseAgent,
+    AgentContext,
+    SystemPrompt,
+    build_system_content,
+    get_agent_config,
+)
 
-    def __init__(
-        self,
-        ark_client: Optional[ArkClientWrapper] = None,
-        stream_writer: Optional[Callable[[dict], None]] = None,
-    ):
-        super().__init__(ark_client, stream_writer)
-        self.thinking_mode = AGENT_THINKING_MODE.get(AGENT_REGULATION_CHECKER)
 
-    def get_system_prompt(self, context: AgentContext) -> str:
-        """获取系统提示词"""
-        return """你是【法规检查员】，专注于合规风险审查和政策解读。
+# 系统提示词为纯常量，模块级构建并驻留一次
+_SYSTEM_PROMPT: Final[str] = sys.intern("""你是【法规检查员】，专注于合规风险审查和政策解读。
 
 ## 核心职责
 1. **识别法规要求**：梳理适用的法律法规、行业标准、监管要求
@@ -84,24 +48,13 @@ class RegulationCheckerAgent(BaseAgent):
 - 🟢 低风险：建议遵循，有改进空间
 
 ## 输出格式
-使用 Markdown 格式，按法规类别和风险等级组织内容。"""
+使用 Markdown 格式，按法规类别和风险等级组织内容。""")
 
-    def get_user_prompt(self, context: AgentContext) -> str:
-        """获取用户提示词"""
-        profile = context.profile
-
-        target_market = profile.get("target_market", "未指定市场")
-        supply_chain = profile.get("supply_chain", "未指定品类")
-        seller_type = profile.get("seller_type", "未指定卖家类型")
-        min_price = profile.get("min_price", None)
-        max_price = profile.get("max_price", None)
-        price_range = (
-            f"${min_price}-${max_price}"
-            if (min_price is not None and max_price is not None)
-            else "未指定"
-        )
+# 已分段的系统 content 同样只构建一次，各次调用共享（只读）
+_SYSTEM_CONTENT: Final[list[dict[str, Any]]] = build_system_content(_SYSTEM_PROMPT)
 
-        prompt = f"""## 分析任务
+# 用户提示词模板：静态段为模块级常量，仅替换变量
+_USER_PROMPT_TPL: Final[str] = """## 分析任务
 请针对以下业务场景，进行全面的法规合规审查：
 
 ### 用户画像
@@ -128,12 +81,65 @@ class RegulationCheckerAgent(BaseAgent):
 - 给出可执行的合规建议
 - 预估合规所需的资源投入"""
 
+
+_CONFIG = get_agent_config(AGENT_REGULATION_CHECKER)
+
+
+class RegulationCheckerAgent(BaseAgent):
+    """
+    法规检查员 Agent
+
+    核心职责：
+    - 识别适用的法规要求
+    - 评估合规成本
+    - 预警政策变化
+    - 提供合规路径
+
+    使用模型：kimi-k2-thinking-251104
+    - 长文档阅读能力强
+    - 支持 Thinking 模式，适合复杂法规分析
+    - 细节把控能力强
+    """
+
+    name = AGENT_REGULATION_CHECKER
+    description = "法规检查员 - 合规风险审查和政策解读"
+
+    # 从配置获取模型和搜索设置
+    model = _CONFIG.model
+    use_websearch = _CONFIG.use_websearch
+    websearch_limit = _CONFIG.websearch_limit
+
+    def __init__(
+        self,
+        ark_client: Optional[ArkClientWrapper] = None,
+        stream_writer: Optional[Callable[[dict], None]] = None,
+    ):
+        super().__init__(ark_client, stream_writer)
+        self.thinking_mode = _CONFIG.thinking_mode
+
+    def get_system_prompt(self, context: AgentContext) -> SystemPrompt:
+        """获取系统提示词（纯静态，单段 content 便于前缀缓存命中）"""
+        return _SYSTEM_CONTENT
+
+    def get_user_prompt(self, context: AgentContext) -> str:
+        """获取用户提示词"""
+        profile = context.profile
+
+        prompt = _USER_PROMPT_TPL.format_map(
+            {
+                "target_market": profile.target_market,
+                "supply_chain": profile.supply_chain,
+                "seller_type": profile.seller_type,
+                "price_range": profile.price_range,
+            }
+        )
+
         # 辩论模式
         if context.debate_round > 0 and context.other_agent_outputs:
-            prompt += "\n\n### 参考信息\n"
-            for output in context.other_agent_outputs:
-                if output.agent_name != self.name:
-                    prompt += f"\n**{output.agent_name}**:\n{output.content[:500]}...\n"
+            parts = [prompt, "\n\n### 参考信息\n"]
+            for output in context.get_peer_outputs(self.name):
+                parts.append(f"\n**{output.agent_name}**:\n{output.content_digest}...\n")
+            prompt = "".join(parts)
 
         return prompt
 
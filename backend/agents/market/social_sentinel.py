@@ -4,58 +4,22 @@
 专注于舆情监测和消费者洞察
 """
 
-from typing import Optional, Callable
-
-from core.config import (
-    settings,
-    AGENT_SOCIAL_SENTINEL,
-    AGENT_MODEL_MAPPING,
-    AGENT_WEBSEARCH_CONFIG,
-    AGENT_THINKING_MODE,
-)
-from core.ark_client import ArkClientWrapper
-from agents.base import BaseAgent, AgentContext
-
-
-class SocialSentinelAgent(BaseAgent):
-    """
-    社媒哨兵 Agent
-
-    核心职责：
-    - 捕捉舆论热点
-    - 分析口碑评价
-    - 识别 KOL 分布
-    - 预警舆论风险
-
-    使用模型：doubao-seed-2-0-pro-260215
-    - 2.0旗舰多模态通用模型
-    - 中文语感强 + 情感理解能力强
-    - 适合社交媒体内容分析
-    """
-
-    name = AGENT_SOCIAL_SENTINEL
-    description = "社媒哨兵 - 舆情监测和消费者洞察"
+import sys
+from typing import Any, Final, Optional, Callable
 
-    # 从配置获取模型和搜索设置
-    model = AGENT_MODEL_MAPPING.get(AGENT_SOCIAL_SENTINEL, settings.default_model)
-    use_websearch = AGENT_WEBSEARCH_CONFIG.get(AGENT_SOCIAL_SENTINEL, {}).get(
-        "enabled", True
-    )
-    websearch_limit = AGENT_WEBSEARCH_CONFIG.get(AGENT_SOCIAL_SENTINEL, {}).get(
-        "limit", 20
-    )
+from core.config import AGENT_SOCIAL_SENTINEL
+from core.ark_client import ArkClientWrapper
+from agents.base import (
+    BaseAgent,
+    AgentContext,
+    SystemPrompt,
+    build_system_content,
+    get_agent_config,
+)
 
-    def __init__(
-        self,
-        ark_client: Optional[ArkClientWrapper] = None,
-        stream_writer: Optional[Callable[[dict], None]] = None,
-    ):
-        super().__init__(ark_client, stream_writer)
-        self.thinking_mode = AGENT_THINKING_MODE.get(AGENT_SOCIAL_SENTINEL)
 
-    def get_system_prompt(self, context: AgentContext) -> str:
-        """获取系统提示词"""
-        return """你是【社媒哨兵】，专注于舆情监测和消费者洞察。
+# 系统提示词为纯常量，模块级构建并驻留一次
+_SYSTEM_PROMPT: Final[str] = sys.intern("""你是【社媒哨兵】，专注于舆情监测和消费者洞察。
 
 ## 核心职责
 1. **捕捉舆论热点**：监测社交媒体、论坛、资讯平台的热门话题
@@ -85,26 +49,58 @@ class SocialSentinelAgent(BaseAgent):
 - 😠 负面：吐槽、投诉、批评
 
 ## 输出格式
-使用 Markdown 格式，按话题/维度组织内容，穿插真实用户评论作为佐证。"""
+使用 Markdown 格式，按话题/维度组织内容，穿插真实用户评论作为佐证。""")
+
+# 已分段的系统 content 同样只构建一次，各次调用共享（只读）
+_SYSTEM_CONTENT: Final[list[dict[str, Any]]] = build_system_content(_SYSTEM_PROMPT)
+
+
+_CONFIG = get_agent_config(AGENT_SOCIAL_SENTINEL)
+
+
+class SocialSentinelAgent(BaseAgent):
+    """
+    社媒哨兵 Agent
+
+    核心职责：
+    - 捕捉舆论热点
+    - 分析口碑评价
+    - 识别 KOL 分布
+    - 预警舆论风险
+
+    使用模型：doubao-seed-2-0-pro-260215
+    - 2.0旗舰多模态通用模型
+    - 中文语感强 + 情感理解能力强
+    - 适合社交媒体内容分析
+    """
+
+    name = AGENT_SOCIAL_SENTINEL
+    description = "社媒哨兵 - 舆情监测和消费者洞察"
+
+    # 从配置获取模型和搜索设置
+    model = _CONFIG.model
+    use_websearch = _CONFIG.use_websearch
+    websearch_limit = _CONFIG.websearch_limit
+
+    def __init__(
+        self,
+        ark_client: Optional[ArkClientWrapper] = None,
+        stream_writer: Optional[Callable[[dict], None]] = None,
+    ):
+        super().__init__(ark_client, stream_writer)
+        self.thinking_mode = _CONFIG.thinking_mode
+
+    def get_system_prompt(self, context: AgentContext) -> SystemPrompt:
+        """获取系统提示词（纯静态，单段 content 便于前缀缓存命中）"""
+        return _SYSTEM_CONTENT
 
     def get_user_prompt(self, context: AgentContext) -> str:
         """获取用户提示词"""
         profile = context.profile
 
-        target_market = profile.get("target_market", "未指定市场")
-        supply_chain = profile.get("supply_chain", "未指定品类")
-        seller_type = profile.get("seller_type", "未指定卖家类型")
-        min_price = profile.get("min_price", None)
-        max_price = profile.get("max_price", None)
-        price_range = (
-            f"${min_price}-${max_price}"
-            if (min_price is not None and max_price is not None)
-            else "未指定"
-        )
-
-        brand_name = profile.get("brand_name", "")
-        target_audience = profile.get("target_audience", "未指定")
-        competitors = profile.get("known_competitors", [])
+        brand_name = profile.brand_name
+        target_audience = profile.target_audience
+        competitors = profile.known_competitors
 
         brand_text = f"- **品牌名称**：{brand_name}\n" if brand_name else ""
         competitors_text = "、".join(competitors) if competitors else "（请你自行识别）"
@@ -113,10 +109,10 @@ class SocialSentinelAgent(BaseAgent):
 请针对以下业务场景，进行全面的舆情分析和消费者洞察：
 
 ### 用户画像
-- **目标市场**：{target_market}
-- **核心品类**：{supply_chain}
-- **卖家类型**：{seller_type}
-- **目标售价区间**：{price_range}
+- **目标市场**：{profile.target_market}
+- **核心品类**：{profile.supply_chain}
+- **卖家类型**：{profile.seller_type}
+- **目标售价区间**：{profile.price_range}
 {brand_text}- **目标用户**：{target_audience}
 - **主要竞品**：{competitors_text}
 
@@ -139,10 +135,10 @@ class SocialSentinelAgent(BaseAgent):
 
         # 辩论模式
         if context.debate_round > 0 and context.other_agent_outputs:
-            prompt += "\n\n### 参考信息\n"
-            for output in context.other_agent_outputs:
-                if output.agent_name != self.name:
-                    prompt += f"\n**{output.agent_name}**:\n{output.content[:500]}...\n"
+            parts = [prompt, "\n\n### 参考信息\n"]
+            for output in context.get_peer_outputs(self.name):
+                parts.append(f"\n**{output.agent_name}**:\n{output.content_digest}...\n")
+            prompt = "".join(parts)
 
         return prompt
 
@@ -4,54 +4,24 @@
 负责整合多位专家的分析并形成最终报告
 """
 
-from typing import Optional, Callable, List
-
-from core.config import (
-    settings,
-    AGENT_SYNTHESIZER,
-    AGENT_MODEL_MAPPING,
-    AGENT_WEBSEARCH_CONFIG,
-    AGENT_THINKING_MODE,
-)
-from core.ark_client import ArkClientWrapper
-from agents.base import BaseAgent, AgentContext, AgentOutput
-
-
-class SynthesizerAgent(BaseAgent):
-    """
-    综合分析师 Agent
-
-    核心职责：
-    - 整合四个维度的分析结果
-    - 识别分析之间的关联和矛盾
-    - 形成一致的综合建议
-    - 标注共识和分歧
-
-    使用模型：kimi-k2-thinking-251104
-    - 超长上下文
-    - 不丢失细节
-    - 支持 Thinking 模式进行深度整合
-    """
-
-    name = AGENT_SYNTHESIZER
-    description = "综合分析师 - 整合多维分析，形成最终报告"
+import sys
+from typing import Any, Final, Optional, Callable, List
 
-    # 综合器不需要联网搜索
-    model = AGENT_MODEL_MAPPING.get(AGENT_SYNTHESIZER, settings.default_model)
-    use_websearch = False
-    websearch_limit = 0
+from core.config import AGENT_SYNTHESIZER
+from core.ark_client import ArkClientWrapper
+from agents.factory import get_agent_display_name
+from agents.base import (
+    BaseAgent,
+    AgentContext,
+    AgentOutput,
+    SystemPrompt,
+    build_system_content,
+    get_agent_config,
+)
 
-    def __init__(
-        self,
-        ark_client: Optional[ArkClientWrapper] = None,
-        stream_writer: Optional[Callable[[dict], None]] = None,
-    ):
-        super().__init__(ark_client, stream_writer)
-        self.thinking_mode = AGENT_THINKING_MODE.get(AGENT_SYNTHESIZER)
 
-    def get_system_prompt(self, context: AgentContext) -> str:
-        """获取系统提示词"""
-        return """你是【综合分析师】，负责整合多位专家的分析并形成最终报告。
+# 系统提示词为纯常量，模块级构建并驻留一次
+_SYSTEM_PROMPT: Final[str] = sys.intern("""你是【综合分析师】，负责整合多位专家的分析并形成最终报告。
 
 ## 核心职责
 1. **整合四个维度**：趋势洞察、竞争分析、法规审查、舆情监测
@@ -100,80 +70,117 @@ class SynthesizerAgent(BaseAgent):
 - ✅ 完整性：覆盖所有关键维度
 - ✅ 一致性：结论与论据相符
 - ✅ 可操作性：建议具体可执行
-- ✅ 平衡性：机会与风险并重"""
+- ✅ 平衡性：机会与风险并重""")
+
+# 已分段的系统 content 同样只构建一次，各次调用共享（只读）
+_SYSTEM_CONTENT: Final[list[dict[str, Any]]] = build_system_content(_SYSTEM_PROMPT)
+
+
+# 综合要求：固定段落，追加在提示词末尾
+_SYNTHESIS_REQUIREMENTS: Final[str] = """
+---
+
+### 综合要求
+1. 整合以上所有分析，形成统一的市场洞察报告
+2. 识别不同分析之间的关联（如趋势与竞争的交叉点）
+3. 指出存在的矛盾或分歧，并给出你的判断
+4. 确保报告结构完整、逻辑清晰
+5. 给出可操作的具体建议
+"""
+
+# 辩论记录中每段内容的截断长度
+_DEBATE_PREVIEW_CHARS = 200
+
+
+_CONFIG = get_agent_config(AGENT_SYNTHESIZER)
+
+
+class SynthesizerAgent(BaseAgent):
+    """
+    综合分析师 Agent
+
+    核心职责：
+    - 整合四个维度的分析结果
+    - 识别分析之间的关联和矛盾
+    - 形成一致的综合建议
+    - 标注共识和分歧
+
+    使用模型：kimi-k2-thinking-251104
+    - 超长上下文
+    - 不丢失细节
+    - 支持 Thinking 模式进行深度整合
+    """
+
+    name = AGENT_SYNTHESIZER
+    description = "综合分析师 - 整合多维分析，形成最终报告"
+
+    # 综合器不需要联网搜索
+    model = _CONFIG.model
+    use_websearch = False
+    websearch_limit = 0
+
+    def __init__(
+        self,
+        ark_client: Optional[ArkClientWrapper] = None,
+        stream_writer: Optional[Callable[[dict], None]] = None,
+    ):
+        super().__init__(ark_client, stream_writer)
+        self.thinking_mode = _CONFIG.thinking_mode
+
+    def get_system_prompt(self, context: AgentContext) -> SystemPrompt:
+        """获取系统提示词（纯静态，单段 content 便于前缀缓存命中）"""
+        return _SYSTEM_CONTENT
 
     def get_user_prompt(self, context: AgentContext) -> str:
         """获取用户提示词"""
         profile = context.profile
 
-        target_market = profile.get("target_market", "未指定市场")
-        supply_chain = profile.get("supply_chain", "未指定品类")
-        seller_type = profile.get("seller_type", "未指定卖家类型")
-        min_price = profile.get("min_price", None)
-        max_price = profile.get("max_price", None)
-        price_range = (
-            f"${min_price}-${max_price}"
-            if (min_price is not None and max_price is not None)
-            else "未指定"
-        )
-
         prompt = f"""## 综合分析任务
 
 请基于以下各专家的分析报告，形成一份综合的市场洞察报告。
 
 ### 业务背景
-- **目标市场**：{target_market}
-- **核心品类**：{supply_chain}
-- **卖家类型**：{seller_type}
-- **目标售价区间**：{price_range}
+- **目标市场**：{profile.target_market}
+- **核心品类**：{profile.supply_chain}
+- **卖家类型**：{profile.seller_type}
+- **目标售价区间**：{profile.price_range}
 
 ### 各专家分析报告
 """
 
+        parts = [prompt]
+
         # 添加各 Agent 的输出
         for output in context.other_agent_outputs:
-            agent_display_names = {
-                "trend_scout": "趋势侦察员",
-                "competitor_analyst": "竞争分析师",
-                "regulation_checker": "法规检查员",
-                "social_sentinel": "社媒哨兵",
-            }
-            display_name = agent_display_names.get(output.agent_name, output.agent_name)
-
-            prompt += f"\n---\n\n### 📊 {display_name} ({output.agent_name})\n\n"
-            prompt += output.content
-            prompt += "\n"
+            display_name = get_agent_display_name(output.agent_name)
+            parts.append(f"\n---\n\n### 📊 {display_name} ({output.agent_name})\n\n")
+            parts.append(output.content)
+            parts.append("\n")
 
         # 添加辩论记录（如果有）
         debate_history = context.shared_memory.get("debate_history", [])
         if debate_history:
-            prompt += "\n---\n\n### 🗣️ 辩论记录\n\n"
+            parts.append("\n---\n\n### 🗣️ 辩论记录\n\n")
             for exchange in debate_history:
-                prompt += (
+                parts.append(
                     f"**{exchange.get('challenger')} → {exchange.get('responder')}**\n"
                 )
-                prompt += (
-                    f"质疑：{(exchange.get('challenge_content') or '')[:200]}...\n"
+                parts.append(
+                    f"质疑：{(exchange.get('challenge_content') or '')[:_DEBATE_PREVIEW_CHARS]}...\n"
+                )
+                parts.append(
+                    f"回应：{(exchange.get('response_content') or '')[:_DEBATE_PREVIEW_CHARS]}...\n"
                 )
-                prompt += f"回应：{(exchange.get('response_content') or '')[:200]}...\n"
                 if exchange.get("followup_content"):
-                    prompt += f"追问/确认：{(exchange.get('followup_content') or '')[:200]}...\n"
+                    parts.append(
+                        f"追问/确认：{exchange['followup_content'][:_DEBATE_PREVIEW_CHARS]}...\n"
+                    )
                 if exchange.get("revised") is True:
-                    prompt += "（对方表示已修订观点）\n"
-                prompt += "\n"
-
-        prompt += """
----
-
-### 综合要求
-1. 整合以上所有分析，形成统一的市场洞察报告
-2. 识别不同分析之间的关联（如趋势与竞争的交叉点）
-3. 指出存在的矛盾或分歧，并给出你的判断
-4. 确保报告结构完整、逻辑清晰
-5. 给出可操作的具体建议
-"""
+                    parts.append("（对方表示已修订观点）\n")
+                parts.append("\n")
 
-        return prompt
+        parts.append(_SYNTHESIS_REQUIREMENTS)
+        return "".join(parts)
 
     def post_process(self, content: str, context: AgentContext) -> str:
         """后处理"""
@@ -4,17 +4,52 @@
 专注于发现市场新兴趋势和机会窗口
 """
 
-from typing import Optional, Callable
-
-from core.config import (
-    settings,
-    AGENT_TREND_SCOUT,
-    AGENT_MODEL_MAPPING,
-    AGENT_WEBSEARCH_CONFIG,
-    AGENT_THINKING_MODE,
-)
+import sys
+from typing import Any, Final, Optional, Callable
+
+from core.config import AGENT_TREND_SCOUT
 from core.ark_client import ArkClientWrapper
-from agents.base import BaseAgent, AgentContext
+from agents.base import (
+    BaseAgent,
+    AgentContext,
+    SystemPrompt,
+    build_system_content,
+    get_agent_config,
+)
+
+
+# 系统提示词为纯常量，模块级构建并驻留一次
+_SYSTEM_PROMPT: Final[str] = sys.intern("""你是【趋势侦察员】，专注于发现市场新兴趋势和机会窗口。
+
+## 核心职责
+1. **识别新兴趋势**：发现正在形成或即将爆发的市场趋势
+2. **评估成熟度**：判断趋势处于萌芽期、成长期还是成熟期
+3. **发现蓝海机会**：找到尚未被充分开发的市场空间
+4. **预警颠覆性变化**：识别可能颠覆现有格局的技术或模式
+
+## 分析维度
+- **技术趋势**：新技术、新工艺、新材料的发展和应用
+- **消费趋势**：消费者偏好、行为模式、需求变化
+- **政策趋势**：政府政策、行业法规、标准规范的变化
+- **竞争趋势**：竞争格局、新进入者、跨界竞争
+
+## 输出要求
+1. 每个趋势必须标注：
+   - 📊 可信度 (高/中/低)
+   - ⏱️ 时间窗口 (预计多久形成主流)
+   - 📎 数据来源 (具体的报告/新闻/数据)
+2. 区分「已验证趋势」和「早期信号」
+3. 给出趋势对目标行业的具体影响
+4. 提供可操作的机会点建议
+
+## 输出格式
+使用 Markdown 格式，结构清晰，重点突出。每个趋势用独立章节描述。""")
+
+# 已分段的系统 content 同样只构建一次，各次调用共享（只读）
+_SYSTEM_CONTENT: Final[list[dict[str, Any]]] = build_system_content(_SYSTEM_PROMPT)
+
+
+_CONFIG = get_agent_config(AGENT_TREND_SCOUT)
 
 
 class TrendScoutAgent(BaseAgent):
@@ -37,11 +72,9 @@ class TrendScoutAgent(BaseAgent):
     description = "趋势侦察员 - 发现市场新兴趋势和机会窗口"
 
     # 从配置获取模型和搜索设置
-    model = AGENT_MODEL_MAPPING.get(AGENT_TREND_SCOUT, settings.default_model)
-    use_websearch = AGENT_WEBSEARCH_CONFIG.get(AGENT_TREND_SCOUT, {}).get(
-        "enabled", True
-    )
-    websearch_limit = AGENT_WEBSEARCH_CONFIG.get(AGENT_TREND_SCOUT, {}).get("limit", 20)
+    model = _CONFIG.model
+    use_websearch = _CONFIG.use_websearch
+    websearch_limit = _CONFIG.websearch_limit
 
     def __init__(
         self,
@@ -50,59 +83,24 @@ class TrendScoutAgent(BaseAgent):
     ):
         super().__init__(ark_client, stream_writer)
         # 获取 Thinking 模式
-        self.thinking_mode = AGENT_THINKING_MODE.get(AGENT_TREND_SCOUT)
-
-    def get_system_prompt(self, context: AgentContext) -> str:
-        """获取系统提示词"""
-        return """你是【趋势侦察员】，专注于发现市场新兴趋势和机会窗口。
+        self.thinking_mode = _CONFIG.thinking_mode
 
-## 核心职责
-1. **识别新兴趋势**：发现正在形成或即将爆发的市场趋势
-2. **评估成熟度**：判断趋势处于萌芽期、成长期还是成熟期
-3. **发现蓝海机会**：找到尚未被充分开发的市场空间
-4. **预警颠覆性变化**：识别可能颠覆现有格局的技术或模式
-
-## 分析维度
-- **技术趋势**：新技术、新工艺、新材料的发展和应用
-- **消费趋势**：消费者偏好、行为模式、需求变化
-- **政策趋势**：政府政策、行业法规、标准规范的变化
-- **竞争趋势**：竞争格局、新进入者、跨界竞争
-
-## 输出要求
-1. 每个趋势必须标注：
-   - 📊 可信度 (高/中/低)
-   - ⏱️ 时间窗口 (预计多久形成主流)
-   - 📎 数据来源 (具体的报告/新闻/数据)
-2. 区分「已验证趋势」和「早期信号」
-3. 给出趋势对目标行业的具体影响
-4. 提供可操作的机会点建议
-
-## 输出格式
-使用 Markdown 格式，结构清晰，重点突出。每个趋势用独立章节描述。"""
+    def get_system_prompt(self, context: AgentContext) -> SystemPrompt:
+        """获取系统提示词（纯静态，单段 content 便于前缀缓存命中）"""
+        return _SYSTEM_CONTENT
 
     def get_user_prompt(self, context: AgentContext) -> str:
         """获取用户提示词"""
         profile = context.profile
 
-        target_market = profile.get("target_market", "未指定市场")
-        supply_chain = profile.get("supply_chain", "未指定品类")
-        seller_type = profile.get("seller_type", "未指定卖家类型")
-        min_price = profile.get("min_price", None)
-        max_price = profile.get("max_price", None)
-        price_range = (
-            f"${min_price}-${max_price}"
-            if (min_price is not None and max_price is not None)
-            else "未指定"
-        )
-
         prompt = f"""## 分析任务
 请围绕以下跨境选品/出海场景，进行趋势分析与机会识别：
 
 ### 用户画像
-- **目标市场**：{target_market}
-- **核心品类**：{supply_chain}
-- **卖家类型**：{seller_type}
-- **目标售价区间**：{price_range}
+- **目标市场**：{profile.target_market}
+- **核心品类**：{profile.supply_chain}
+- **卖家类型**：{profile.seller_type}
+- **目标售价区间**：{profile.price_range}
 
 ### 分析要求
 1. 搜索并分析该市场/品类最新的趋势报告、行业研究、新闻与数据
@@ -119,11 +117,14 @@ class TrendScoutAgent(BaseAgent):
 
         # 如果是辩论模式，添加其他 Agent 的输出供参考
         if context.debate_round > 0 and context.other_agent_outputs:
-            prompt += "\n\n### 参考信息\n"
-            prompt += "以下是其他分析师的观点，请在分析时予以考虑：\n"
-            for output in context.other_agent_outputs:
-                if output.agent_name != self.name:
-                    prompt += f"\n**{output.agent_name}**:\n{output.content[:500]}...\n"
+            parts = [
+                prompt,
+                "\n\n### 参考信息\n",
+                "以下是其他分析师的观点，请在分析时予以考虑：\n",
+            ]
+            for output in context.get_peer_outputs(self.name):
+                parts.append(f"\n**{output.agent_name}**:\n{output.content_digest}...\n")
+            prompt = "".join(parts)
 
         return prompt
 
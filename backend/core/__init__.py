@@ -11,6 +11,8 @@ from .exceptions import (
     ToolExecutionError,
     GraphExecutionError,
     DebateError,
+    RequestCancelledError,
+    CircuitOpenError,
 )
 from .graph_engine import (
     IGraphEngine,
@@ -34,6 +36,8 @@ __all__ = [
     "ToolExecutionError",
     "GraphExecutionError",
     "DebateError",
+    "RequestCancelledError",
+    "CircuitOpenError",
     # 图引擎
     "IGraphEngine",
     "MarketInsightGraphEngine",
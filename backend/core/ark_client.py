@@ -4,21 +4,31 @@
 统一管理 API 调用，支持 Responses API + web_search + Thinking 模式
 """
 
-from typing import Generator, Optional, Any, Literal
-from functools import lru_cache
+from typing import AsyncGenerator, Callable, Generator, Optional, Any, Literal
 from dataclasses import dataclass
 from enum import Enum
+import importlib.util
+import inspect
 import logging
 import re
+import threading
 
 import httpx
-from volcenginesdkarkruntime import Ark
+from volcenginesdkarkruntime import Ark, AsyncArk
 
+from .concurrency import apply_rate_limit_headers
 from .config import settings, ThinkingMode
-from .exceptions import ConfigurationError, ToolExecutionError
+from .exceptions import ConfigurationError, RequestCancelledError, ToolExecutionError
 
 logger = logging.getLogger(__name__)
 
+# 来源 URL 提取（逐 chunk 调用，进程内只编译一次；findall 预先绑定）
+_URL_PATTERN = re.compile(r"https?://[^\s\]\[<>()\"']+")
+_find_urls = _URL_PATTERN.findall
+_URL_PREFIXES = ("http://", "https://")
+# 来源 URL 末尾需要剥离的标点
+_URL_TRAILING = ".,;:)]}>\"'"
+
 
 # ============================================
 # 流式事件类型定义
@@ -59,6 +69,456 @@ class StreamEvent:
         }
 
 
+_NO_EVENTS: tuple[StreamEvent, ...] = ()
+
+
+class _DeltaCoalescer:
+    """
+    把连续的 OUTPUT_DELTA 合并到至少 max_chars 个字符后再下发
+
+    遇到其他类型事件（或流结束）时先冲刷已缓冲的文本，保证事件相对顺序不变。
+    """
+
+    __slots__ = ("max_chars", "_parts", "_size")
+
+    def __init__(self, max_chars: int):
+        self.max_chars = max_chars
+        self._parts: list[str] = []
+        self._size = 0
+
+    def push(self, event: StreamEvent) -> tuple[StreamEvent, ...]:
+        """输入一个事件，返回此刻应下发的事件（可能为空）"""
+        if event.type is StreamEventType.OUTPUT_DELTA:
+            self._parts.append(event.content or "")
+            self._size += len(event.content or "")
+            if self._size < self.max_chars:
+                return _NO_EVENTS
+            return (self._drain(),)
+        if self._parts:
+            return (self._drain(), event)
+        return (event,)
+
+    def flush(self) -> tuple[StreamEvent, ...]:
+        """流结束或出错前冲刷剩余文本"""
+        return (self._drain(),) if self._parts else _NO_EVENTS
+
+    def _drain(self) -> StreamEvent:
+        content = "".join(self._parts)
+        self._parts.clear()
+        self._size = 0
+        return StreamEvent(type=StreamEventType.OUTPUT_DELTA, content=content)
+
+
+class _ResponseStreamState:
+    """
+    单次 Responses 流的解析状态
+
+    同步 / 异步两条流式路径共用：累积思考与输出片段、收集来源 URL，
+    并把原生 chunk 映射为 StreamEvent。
+
+    Args:
+        accumulate: 是否累积文本片段。仅逐事件消费、不需要 result() 的路径
+            传 False，避免与调用方的累积重复分配。
+    """
+
+    def __init__(self, accumulate: bool = True):
+        self.accumulate = accumulate
+        self.has_thinking = False
+        self.thinking_parts: list[str] = []
+        self.output_parts: list[str] = []
+        # 预先绑定 append，逐 chunk 累积时省去一次属性查找
+        self._append_thinking = self.thinking_parts.append
+        self._append_output = self.output_parts.append
+        self.sources: list[str] = []
+        self._source_seen: set[str] = set()
+
+    def add_source(self, raw_value: Any) -> None:
+        if not isinstance(raw_value, str):
+            return
+        value = raw_value.strip()
+        if value.startswith("www."):
+            value = "https://" + value
+        elif not value.startswith(_URL_PREFIXES):
+            return
+        value = value.rstrip(_URL_TRAILING)
+        seen = self._source_seen
+        if value in seen:
+            return
+        seen.add(value)
+        self.sources.append(value)
+
+    def collect_sources(self, payload: Any) -> None:
+        """
+        遍历 payload 收集来源 URL
+
+        显式栈迭代（不递归）：常见类型按 type 直接分派，其余走
+        _walk_fallback；子节点逆序入栈，来源顺序与深度优先递归一致。
+        """
+        add_source = self.add_source
+        stack: list[Any] = [payload]
+        pop = stack.pop
+        push = stack.append
+        while stack:
+            obj = pop()
+            kind = type(obj)
+            if kind is dict:
+                children: list[Any] = []
+                for key, value in obj.items():
+                    # JSON 字段名几乎都已是小写 str，此时不再构造临时字符串
+                    if type(key) is not str or not key.islower():
+                        key = str(key).lower()
+                    if key in _URL_KEYS:
+                        found = value
+                    elif key == _CITATION_KEY and isinstance(value, dict):
+                        found = value.get("url")
+                    else:
+                        found = _NOT_FOUND
+                    if found is not _NOT_FOUND:
+                        # 已有子节点待遍历时延后登记，保证顺序不变
+                        if children:
+                            children.append(_SourceValue(found))
+                        else:
+                            add_source(found)
+
+                    value_kind = type(value)
+                    if value_kind is str:
+                        # 子串预检远快于正则扫描，绝大多数字段不含 URL；
+                        # url/href/source 字段值本身就是单个 URL（add_source 会登记）
+                        # 时不再扫描，其余情况（如 "来源:https://..."）仍按正则提取
+                        if "http" in value and not (
+                            found is value
+                            and value.startswith(_URL_PREFIXES)
+                            and " " not in value
+                            and "\n" not in value
+                        ):
+                            children.append(value)
+                    elif value_kind in _SOURCE_NESTED or (
+                        value_kind not in _SOURCE_LEAVES
+                        and isinstance(value, _SOURCE_CONTAINERS)
+                    ):
+                        children.append(value)
+                if children:
+                    children.reverse()
+                    stack.extend(children)
+            elif kind is str:
+                if "http" in obj:
+                    for match in _find_urls(obj):
+                        add_source(match)
+            elif kind is list or kind is tuple:
+                stack.extend(reversed(obj))
+            elif kind is _SourceValue:
+                add_source(obj.value)
+            elif kind not in _SOURCE_LEAVES:
+                _walk_fallback(obj, push, add_source)
+
+    @staticmethod
+    def chunk_to_dict(chunk_obj: Any) -> dict[str, Any]:
+        if hasattr(chunk_obj, "model_dump"):
+            try:
+                data = _dump_model(chunk_obj)
+                if isinstance(data, dict):
+                    return data
+            except Exception:
+                pass
+        if hasattr(chunk_obj, "to_dict"):
+            try:
+                data = chunk_obj.to_dict()  # type: ignore[call-arg]
+                if isinstance(data, dict):
+                    return data
+            except Exception:
+                pass
+        try:
+            data = dict(getattr(chunk_obj, "__dict__", {}) or {})
+            return data if isinstance(data, dict) else {}
+        except Exception:
+            return {}
+
+    def _on_thinking_delta(self, chunk: Any) -> Optional[StreamEvent]:
+        # 思考过程增量
+        delta = getattr(chunk, "delta", "")
+        if delta:
+            self.has_thinking = True
+            if self.accumulate:
+                self._append_thinking(delta)
+            return StreamEvent(type=StreamEventType.THINKING_DELTA, content=delta)
+        return None
+
+    def _on_output_delta(self, chunk: Any) -> Optional[StreamEvent]:
+        # 最终输出增量
+        delta = getattr(chunk, "delta", "")
+        if delta:
+            if self.accumulate:
+                self._append_output(delta)
+            return StreamEvent(type=StreamEventType.OUTPUT_DELTA, content=delta)
+        return None
+
+    def _on_search_in_progress(self, chunk: Any) -> Optional[StreamEvent]:
+        # 搜索进行中
+        return StreamEvent(
+            type=StreamEventType.SEARCH_PROGRESS,
+            metadata={"status": "in_progress"},
+        )
+
+    def _on_search_completed(self, chunk: Any) -> Optional[StreamEvent]:
+        # 搜索完成，优先从结构化 results 提取来源
+        has_structured_url = False
+        for result in getattr(chunk, "results", None) or ():
+            url = getattr(result, "url", None)
+            if url:
+                has_structured_url = True
+                self.add_source(url)
+
+        # 兼容不同 SDK 的返回结构：结构化字段取不到 URL 时才递归遍历完整 chunk
+        if not has_structured_url:
+            self.collect_sources(self.chunk_to_dict(chunk))
+
+        return StreamEvent(
+            type=StreamEventType.SEARCH_COMPLETE,
+            metadata={
+                "sources_count": len(self.sources),
+                # 返回来源详情，便于 Phase 3 证据包追溯。
+                # sources 经 add_source 的 _source_seen 去重，天然唯一，复制即可
+                "sources": self.sources.copy(),
+            },
+        )
+
+    def _on_search_start(self, chunk: Any) -> Optional[StreamEvent]:
+        # 搜索开始
+        return StreamEvent(type=StreamEventType.SEARCH_START)
+
+    def _on_annotated_item(self, chunk: Any) -> Optional[StreamEvent]:
+        # 兼容 OpenAI/Ark 在 message annotations 中回传 url_citation 的场景
+        payload = self.chunk_to_dict(chunk)
+        self.collect_sources(payload)
+        return None
+
+    def _on_output_item_done(self, chunk: Any) -> Optional[StreamEvent]:
+        # 仅在条目可能携带来源时遍历：非 message 条目（如搜索调用），
+        # 或 content 中带 annotations 的 message；纯文本在 response.completed 中兜底
+        item = getattr(chunk, "item", None)
+        if item is None:
+            return None
+        if getattr(item, "type", None) == "message" and not any(
+            getattr(part, "annotations", None)
+            for part in getattr(item, "content", None) or ()
+        ):
+            return None
+        self.collect_sources(item)
+        return None
+
+    def _on_ignored(self, chunk: Any) -> Optional[StreamEvent]:
+        # 不携带来源的条目起止事件，内容会在 response.completed 中完整出现
+        return None
+
+    def _on_legacy_chunk(self, chunk: Any) -> Optional[StreamEvent]:
+        # 兼容旧格式：直接从 delta 属性获取
+        delta_content = getattr(chunk, "delta", None)
+        if isinstance(delta_content, str) and delta_content:
+            if self.accumulate:
+                self._append_output(delta_content)
+            return StreamEvent(type=StreamEventType.OUTPUT_DELTA, content=delta_content)
+        return None
+
+    def handle_chunk(self, chunk: Any) -> Optional[StreamEvent]:
+        """处理单个原生 chunk，返回需要下发的事件（可能为 None）"""
+        # 按 chunk.type 查表分发，未知类型走旧格式兼容逻辑
+        handler = _CHUNK_HANDLERS.get(getattr(chunk, "type", None))
+        if handler is None:
+            return self._on_legacy_chunk(chunk)
+        return handler(self, chunk)
+
+    def complete_event(self) -> StreamEvent:
+        """完成事件"""
+        return StreamEvent(
+            type=StreamEventType.RESPONSE_COMPLETE,
+            metadata={
+                "has_thinking": self.has_thinking,
+                "sources_count": len(self.sources),
+                "sources": self.sources.copy(),
+            },
+        )
+
+    def result(self) -> dict[str, Any]:
+        """完整结果"""
+        return {
+            "output": "".join(self.output_parts),
+            "thinking": "".join(self.thinking_parts) if self.thinking_parts else None,
+            "sources": self.sources,
+        }
+
+
+
+# chunk.type -> 处理方法；高频的增量类型放在最前
+_CHUNK_HANDLERS: dict[str, Callable[..., Optional[StreamEvent]]] = {
+    "response.output_text.delta": _ResponseStreamState._on_output_delta,
+    "response.reasoning_summary_text.delta": _ResponseStreamState._on_thinking_delta,
+    "response.web_search_call.in_progress": _ResponseStreamState._on_search_in_progress,
+    "response.web_search_call.completed": _ResponseStreamState._on_search_completed,
+    "response.web_search_call.searching": _ResponseStreamState._on_search_start,
+    "response.output_item.added": _ResponseStreamState._on_ignored,
+    "response.output_item.done": _ResponseStreamState._on_output_item_done,
+    "response.output_text.done": _ResponseStreamState._on_ignored,
+    "response.completed": _ResponseStreamState._on_annotated_item,
+}
+
+
+# ============================================
+# 来源收集：collect_sources 的按类型遍历函数
+# ============================================
+
+# 其值直接视为来源的字段名（小写）
+_URL_KEYS = frozenset({"url", "href", "source"})
+_CITATION_KEY = "url_citation"
+_NOT_FOUND = object()
+# 需要继续遍历的容器类型（str 单独处理）；无需遍历的标量类型
+_SOURCE_NESTED = frozenset({dict, list, tuple, set})
+_SOURCE_LEAVES = frozenset({int, float, bool, bytes, type(None)})
+_SOURCE_CONTAINERS = (dict, list, tuple, set, str)
+
+
+class _SourceValue:
+    """栈中的待登记来源值（同一 dict 内排在已入栈子节点之后的命中字段）"""
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any):
+        self.value = value
+
+
+def _dump_model(obj: Any) -> Any:
+    """
+    pydantic 对象转 dict，去掉值为 None 的字段
+
+    pydantic v2 的 model_dump 已在 pydantic-core 中完成，无需再经 JSON 往返；
+    exclude_none 让来源遍历少走空分支（None 本就不含来源）。
+    """
+    try:
+        return obj.model_dump(exclude_none=True)  # type: ignore[call-arg]
+    except TypeError:
+        return obj.model_dump()  # type: ignore[call-arg]
+
+
+def _walk_fallback(
+    obj: Any, push: Callable[[Any], None], add_source: Callable[[Any], None]
+) -> None:
+    """非常见类型：子类转为基础类型重新入栈，SDK 对象尝试 model_dump / to_dict / __dict__"""
+    if isinstance(obj, str):
+        if "http" in obj:
+            for match in _find_urls(obj):
+                add_source(match)
+        return
+    if isinstance(obj, dict):
+        push(dict(obj))
+        return
+    if isinstance(obj, (list, tuple, set)):
+        push(list(obj))
+        return
+
+    if hasattr(obj, "model_dump"):
+        try:
+            push(_dump_model(obj))
+            return
+        except Exception:
+            pass
+
+    if hasattr(obj, "to_dict"):
+        try:
+            push(obj.to_dict())  # type: ignore[call-arg]
+            return
+        except Exception:
+            pass
+
+    raw_dict = getattr(obj, "__dict__", None)
+    if isinstance(raw_dict, dict):
+        push(raw_dict)
+
+
+def _wrap_content(content: Any) -> Any:
+    """str content 包装为单段 input_text；其余（已分段 list）原样返回"""
+    if isinstance(content, str):
+        return [{"type": "input_text", "text": content}]
+    return content
+
+
+def _on_http_response(response: httpx.Response) -> None:
+    """httpx 响应钩子：读取 body 前按限流响应头收紧共享并发上限"""
+    try:
+        apply_rate_limit_headers(response.headers)
+    except Exception as e:
+        logger.debug(f"解析限流响应头失败: {e}")
+
+
+async def _aon_http_response(response: httpx.Response) -> None:
+    """AsyncClient 只接受协程钩子"""
+    _on_http_response(response)
+
+
+def _close_stream(response: Any) -> None:
+    """关闭 SDK 同步流，释放底层 HTTP 连接（提前退出时不再读取剩余 chunk）"""
+    close = getattr(response, "close", None)
+    if callable(close):
+        try:
+            close()
+        except Exception as e:
+            logger.debug(f"关闭 Ark 流失败: {e}")
+
+
+async def _aclose_stream(response: Any) -> None:
+    """_close_stream 的异步版本（AsyncStream.close 为协程）"""
+    close = getattr(response, "close", None)
+    if callable(close):
+        try:
+            result = close()
+            if inspect.isawaitable(result):
+                await result
+        except Exception as e:
+            logger.debug(f"关闭 Ark 异步流失败: {e}")
+
+
+def _base_request_params(
+    model: str,
+    use_websearch: bool,
+    websearch_limit: int,
+    thinking_mode: ThinkingMode,
+    prompt_cache: bool,
+) -> dict[str, Any]:
+    """
+    Responses API 请求中与消息无关的参数
+
+    每次调用都新建 dict 及嵌套的 tools / caching / extra_body，
+    SDK 或调用方对请求参数的修改不会影响其他请求。
+    """
+    params: dict[str, Any] = {"model": model, "stream": True}
+
+    # 添加 web_search 工具
+    if use_websearch:
+        params["tools"] = [{"type": "web_search", "limit": websearch_limit}]
+
+    # 开启服务端上下文缓存（静态系统提示词在最前，构成可复用的公共前缀）
+    if prompt_cache:
+        params["caching"] = {"type": "enabled"}
+
+    # 添加 Thinking 模式 (仅对支持的模型生效)
+    if thinking_mode != ThinkingMode.DISABLED:
+        params["extra_body"] = {"thinking": {"type": thinking_mode.value}}
+
+    return params
+
+
+def _response_output_text(response: Any) -> str:
+    """从非流式 Response 中取最终输出文本（不含思考过程）"""
+    output_text = getattr(response, "output_text", None)
+    if isinstance(output_text, str):
+        return output_text
+    return "".join(
+        part.text
+        for item in getattr(response, "output", None) or ()
+        if getattr(item, "type", None) == "message"
+        for part in getattr(item, "content", None) or ()
+        if getattr(part, "type", None) == "output_text" and part.text
+    )
+
+
 class ArkClientWrapper:
     """
     火山引擎 Ark 客户端包装类
@@ -70,6 +530,7 @@ class ArkClientWrapper:
     4. 解析原生 chunk.type 区分思考/输出
     5. 提供流式和非流式调用接口
     6. 返回结构化流式事件
+    7. 提供基于 AsyncArk 的异步流式接口
     """
 
     def __init__(self, api_key: Optional[str] = None, base_url: Optional[str] = None):
@@ -82,18 +543,192 @@ class ArkClientWrapper:
         self._client = Ark(
             api_key=self.api_key,
             base_url=self.base_url,
-            timeout=httpx.Timeout(
-                timeout=float(settings.ark_timeout_seconds),
-                connect=float(settings.ark_connect_timeout_seconds),
-            ),
+            timeout=self._build_timeout(),
             max_retries=max(0, int(settings.ark_max_retries)),
+            http_client=httpx.Client(
+                **self._build_http_options(),
+                event_hooks={"response": [_on_http_response]},
+            ),
+        )
+        # 缓存绑定方法，避免每次调用重复解析 client.responses.create 属性链
+        self._responses_create = self._client.responses.create
+        # 异步客户端按需创建，仅同步调用的场景不产生额外连接池
+        self._async_client: Optional[AsyncArk] = None
+
+    @staticmethod
+    def _build_timeout() -> httpx.Timeout:
+        return httpx.Timeout(
+            timeout=float(settings.ark_timeout_seconds),
+            connect=float(settings.ark_connect_timeout_seconds),
         )
 
+    @staticmethod
+    def _build_http_options() -> dict[str, Any]:
+        """共享连接池参数：长连接复用，可用时启用 HTTP/2 多路复用"""
+        http2 = bool(settings.ark_http2)
+        if http2 and importlib.util.find_spec("h2") is None:
+            logger.warning("未安装 h2，Ark 连接回退为 HTTP/1.1（pip install httpx[http2]）")
+            http2 = False
+        return {
+            "http2": http2,
+            "timeout": ArkClientWrapper._build_timeout(),
+            "limits": httpx.Limits(
+                max_connections=max(1, int(settings.ark_max_connections)),
+                max_keepalive_connections=max(
+                    0, int(settings.ark_max_keepalive_connections)
+                ),
+                keepalive_expiry=float(settings.ark_keepalive_expiry_seconds),
+            ),
+            "follow_redirects": True,
+        }
+
     @property
     def client(self) -> Ark:
         """获取原始 Ark 客户端"""
         return self._client
 
+    @property
+    def async_client(self) -> AsyncArk:
+        """获取原始 AsyncArk 客户端（延迟创建）"""
+        if self._async_client is None:
+            self._async_client = AsyncArk(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                timeout=self._build_timeout(),
+                max_retries=max(0, int(settings.ark_max_retries)),
+                http_client=httpx.AsyncClient(
+                    **self._build_http_options(),
+                    event_hooks={"response": [_aon_http_response]},
+                ),
+            )
+        return self._async_client
+
+    def _build_request_params(
+        self,
+        messages: list[dict[str, Any]],
+        model: str,
+        use_websearch: bool,
+        websearch_limit: int,
+        thinking_mode: ThinkingMode,
+        **kwargs,
+    ) -> dict[str, Any]:
+        """构建 Responses API 流式请求参数"""
+        # 转换消息格式为 Responses API 格式：
+        # content 需为数组，已分段的 list 原样透传（不复制），仅 str 需包装
+        input_messages = [
+            {
+                "role": msg.get("role", "user"),
+                "content": _wrap_content(msg.get("content", "")),
+            }
+            for msg in messages
+        ]
+
+        # 与消息无关的参数按 (模型, 联网, 思考模式, 缓存开关) 构建，调用方 kwargs 优先
+        request_params = _base_request_params(
+            model,
+            use_websearch,
+            websearch_limit,
+            thinking_mode,
+            bool(settings.enable_prompt_cache),
+        )
+        request_params["input"] = input_messages
+        request_params.update(kwargs)
+
+        logger.debug(
+            "调用 Ark Responses API: model=%s, use_websearch=%s, thinking_mode=%s",
+            model,
+            use_websearch,
+            thinking_mode.value,
+        )
+        return request_params
+
+    def _wrap_api_error(
+        self, e: Exception, model: str, use_websearch: bool
+    ) -> ToolExecutionError:
+        """记录并包装 Ark API 异常"""
+        request_id = getattr(e, "request_id", None)
+        logger.error(
+            "Ark API 调用失败: %s (type=%s, model=%s, request_id=%s)",
+            e,
+            type(e).__name__,
+            model,
+            request_id,
+        )
+        return ToolExecutionError(
+            message=f"Ark API 调用失败: {e}",
+            tool_name="ark_responses",
+            details={
+                "model": model,
+                "use_websearch": use_websearch,
+                "request_id": request_id,
+                "exception_type": type(e).__name__,
+            },
+        )
+
+    def _collect(
+        self,
+        messages: list[dict[str, Any]],
+        model: Optional[str],
+        use_websearch: bool,
+        websearch_limit: int,
+        thinking_mode: Optional[ThinkingMode],
+        **kwargs,
+    ) -> dict[str, Any]:
+        """直接消费原生流并返回完整结果（不经过事件生成器）"""
+        model = model or settings.default_model
+        request_params = self._build_request_params(
+            messages,
+            model,
+            use_websearch,
+            websearch_limit,
+            thinking_mode or ThinkingMode.DISABLED,
+            **kwargs,
+        )
+        state = _ResponseStreamState()
+
+        try:
+            for chunk in self._responses_create(**request_params):
+                state.handle_chunk(chunk)
+        except Exception as e:
+            raise self._wrap_api_error(e, model, use_websearch)
+
+        return state.result()
+
+    async def _acollect(
+        self,
+        messages: list[dict[str, Any]],
+        model: Optional[str],
+        use_websearch: bool,
+        websearch_limit: int,
+        thinking_mode: Optional[ThinkingMode],
+        **kwargs,
+    ) -> dict[str, Any]:
+        """_collect 的异步版本（基于 AsyncArk）"""
+        model = model or settings.default_model
+        request_params = self._build_request_params(
+            messages,
+            model,
+            use_websearch,
+            websearch_limit,
+            thinking_mode or ThinkingMode.DISABLED,
+            **kwargs,
+        )
+        state = _ResponseStreamState()
+        response = None
+
+        try:
+            response = await self.async_client.responses.create(**request_params)
+            async for chunk in response:
+                state.handle_chunk(chunk)
+        except Exception as e:
+            raise self._wrap_api_error(e, model, use_websearch)
+        finally:
+            # 任务被取消时同样关闭底层流
+            if response is not None:
+                await _aclose_stream(response)
+
+        return state.result()
+
     def create_response_stream_v2(
         self,
         messages: list[dict[str, Any]],
@@ -101,17 +736,24 @@ class ArkClientWrapper:
         use_websearch: bool = False,
         websearch_limit: int = 15,
         thinking_mode: ThinkingMode = ThinkingMode.DISABLED,
+        cancel_event: Optional[threading.Event] = None,
+        coalesce_chars: int = 0,
         **kwargs,
     ) -> Generator[StreamEvent, None, dict[str, Any]]:
         """
         创建流式响应 v2 (返回结构化事件)
 
         Args:
-            messages: 消息列表，格式为 [{"role": "system/user", "content": "..."}]
+            messages: 消息列表，格式为 [{"role": "system/user", "content": "..."}]，
+                content 为 list 时视为已分段的 input content，原样透传
             model: 模型名称，默认使用配置中的 default_model
             use_websearch: 是否启用联网搜索
             websearch_limit: 联网搜索结果数量限制
             thinking_mode: Thinking 模式 (auto/enabled/disabled)
+            cancel_event: 取消信号；置位后在下一个 chunk 处关闭连接并抛出
+                RequestCancelledError
+            coalesce_chars: > 0 时把连续输出增量合并到至少该字符数再下发
+                （调用方不需要逐 token 事件时使用），默认逐 chunk 下发
             **kwargs: 其他参数传递给 API
 
         Yields:
@@ -126,243 +768,128 @@ class ArkClientWrapper:
         if thinking_mode is None:
             thinking_mode = ThinkingMode.DISABLED
 
-        # 转换消息格式为 Responses API 格式
-        input_messages = []
-        for msg in messages:
-            role = msg.get("role", "user")
-            content = msg.get("content", "")
+        request_params = self._build_request_params(
+            messages, model, use_websearch, websearch_limit, thinking_mode, **kwargs
+        )
+        state = _ResponseStreamState()
+        coalescer = _DeltaCoalescer(coalesce_chars) if coalesce_chars > 0 else None
+        response = None
 
-            # Responses API 需要 content 为数组格式
-            if isinstance(content, str):
-                content = [{"type": "input_text", "text": content}]
+        try:
+            # 发送开始事件
+            yield StreamEvent(type=StreamEventType.RESPONSE_START)
 
-            input_messages.append({"role": role, "content": content})
+            if cancel_event is not None and cancel_event.is_set():
+                raise RequestCancelledError(details={"model": model})
 
-        # 构建请求参数
-        request_params = {
-            "model": model,
-            "input": input_messages,
-            "stream": True,
-            **kwargs,
-        }
+            response = self._responses_create(**request_params)
+
+            for chunk in response:
+                if cancel_event is not None and cancel_event.is_set():
+                    raise RequestCancelledError(details={"model": model})
+                event = state.handle_chunk(chunk)
+                if event is None:
+                    continue
+                if coalescer is None:
+                    yield event
+                else:
+                    yield from coalescer.push(event)
 
-        # 添加 web_search 工具
-        if use_websearch:
-            request_params["tools"] = [{"type": "web_search", "limit": websearch_limit}]
+            if coalescer is not None:
+                yield from coalescer.flush()
 
-        # 添加 Thinking 模式 (仅对支持的模型生效)
-        if thinking_mode != ThinkingMode.DISABLED:
-            request_params["extra_body"] = {"thinking": {"type": thinking_mode.value}}
+            # 发送完成事件
+            yield state.complete_event()
 
-        logger.debug(
-            f"调用 Ark Responses API: model={model}, "
-            f"use_websearch={use_websearch}, thinking_mode={thinking_mode.value}"
-        )
+            # 返回完整结果
+            return state.result()
 
-        # 累积结果
-        thinking_parts: list[str] = []
-        output_parts: list[str] = []
-        sources: list[str] = []
-        source_seen: set[str] = set()
-        url_pattern = re.compile(r"https?://[^\s\]\[<>()\"']+")
-
-        def _add_source(raw_value: Any) -> None:
-            if not isinstance(raw_value, str):
-                return
-            value = raw_value.strip()
-            if not value:
-                return
-            if value.startswith("www."):
-                value = f"https://{value}"
-            value = value.rstrip(".,;:)]}>\"'")
-            if not (value.startswith("http://") or value.startswith("https://")):
-                return
-            if value in source_seen:
-                return
-            source_seen.add(value)
-            sources.append(value)
-
-        def _collect_sources(payload: Any) -> None:
-            if payload is None:
-                return
-
-            if isinstance(payload, str):
-                for match in url_pattern.findall(payload):
-                    _add_source(match)
-                return
-
-            if isinstance(payload, dict):
-                for key, value in payload.items():
-                    key_lower = str(key).lower()
-                    if key_lower in {"url", "href", "source"}:
-                        _add_source(value)
-                    elif key_lower == "url_citation" and isinstance(value, dict):
-                        _add_source(value.get("url"))
-
-                    if isinstance(value, (dict, list, tuple, set, str)):
-                        _collect_sources(value)
-                return
-
-            if isinstance(payload, (list, tuple, set)):
-                for item in payload:
-                    _collect_sources(item)
-                return
-
-            if hasattr(payload, "model_dump"):
-                try:
-                    _collect_sources(payload.model_dump())  # type: ignore[call-arg]
-                    return
-                except Exception:
-                    pass
-
-            if hasattr(payload, "to_dict"):
-                try:
-                    _collect_sources(payload.to_dict())  # type: ignore[call-arg]
-                    return
-                except Exception:
-                    pass
-
-            raw_dict = getattr(payload, "__dict__", None)
-            if isinstance(raw_dict, dict):
-                _collect_sources(raw_dict)
-
-        def _chunk_to_dict(chunk_obj: Any) -> dict[str, Any]:
-            if hasattr(chunk_obj, "model_dump"):
-                try:
-                    data = chunk_obj.model_dump()  # type: ignore[call-arg]
-                    if isinstance(data, dict):
-                        return data
-                except Exception:
-                    pass
-            if hasattr(chunk_obj, "to_dict"):
-                try:
-                    data = chunk_obj.to_dict()  # type: ignore[call-arg]
-                    if isinstance(data, dict):
-                        return data
-                except Exception:
-                    pass
-            try:
-                data = dict(getattr(chunk_obj, "__dict__", {}) or {})
-                return data if isinstance(data, dict) else {}
-            except Exception:
-                return {}
+        except RequestCancelledError:
+            raise
+
+        except Exception as e:
+            error = self._wrap_api_error(e, model, use_websearch)
+            if coalescer is not None:
+                yield from coalescer.flush()
+            yield StreamEvent(type=StreamEventType.ERROR, content=str(e))
+            raise error
+
+        finally:
+            # 正常读完时为空操作；取消/调用方提前关闭生成器时及时断开连接
+            if response is not None:
+                _close_stream(response)
+
+    async def acreate_response_stream_v2(
+        self,
+        messages: list[dict[str, Any]],
+        model: Optional[str] = None,
+        use_websearch: bool = False,
+        websearch_limit: int = 15,
+        thinking_mode: ThinkingMode = ThinkingMode.DISABLED,
+        coalesce_chars: int = 0,
+        **kwargs,
+    ) -> AsyncGenerator[StreamEvent, None]:
+        """
+        异步创建流式响应 v2 (基于 AsyncArk，返回结构化事件)
+
+        参数与事件序列同 create_response_stream_v2。异步生成器无法携带返回值，
+        完整结果可由调用方累积 OUTPUT_DELTA / THINKING_DELTA 得到，
+        来源列表见 RESPONSE_COMPLETE 事件的 metadata["sources"]。
+
+        任务被取消（asyncio.CancelledError）或调用方提前 aclose 时，
+        会关闭底层流并释放连接，不再继续读取剩余 chunk。
+
+        Yields:
+            StreamEvent: 结构化流式事件
+        """
+        model = model or settings.default_model
+
+        # 兼容调用方可能传入 None 的情况
+        if thinking_mode is None:
+            thinking_mode = ThinkingMode.DISABLED
+
+        request_params = self._build_request_params(
+            messages, model, use_websearch, websearch_limit, thinking_mode, **kwargs
+        )
+        state = _ResponseStreamState(accumulate=False)
+        coalescer = _DeltaCoalescer(coalesce_chars) if coalesce_chars > 0 else None
+        response = None
 
         try:
             # 发送开始事件
             yield StreamEvent(type=StreamEventType.RESPONSE_START)
 
-            response = self._client.responses.create(**request_params)
-
-            for chunk in response:
-                # 获取 chunk.type 用于区分事件类型
-                chunk_type = getattr(chunk, "type", None)
-
-                # 处理不同类型的 chunk
-                if chunk_type == "response.reasoning_summary_text.delta":
-                    # 思考过程增量
-                    delta = getattr(chunk, "delta", "")
-                    if delta:
-                        thinking_parts.append(delta)
-                        yield StreamEvent(
-                            type=StreamEventType.THINKING_DELTA, content=delta
-                        )
-
-                elif chunk_type == "response.output_text.delta":
-                    # 最终输出增量
-                    delta = getattr(chunk, "delta", "")
-                    if delta:
-                        output_parts.append(delta)
-                        yield StreamEvent(
-                            type=StreamEventType.OUTPUT_DELTA, content=delta
-                        )
-
-                elif chunk_type == "response.web_search_call.in_progress":
-                    # 搜索进行中
-                    yield StreamEvent(
-                        type=StreamEventType.SEARCH_PROGRESS,
-                        metadata={"status": "in_progress"},
-                    )
-
-                elif chunk_type == "response.web_search_call.completed":
-                    # 搜索完成，提取来源
-                    search_results = getattr(chunk, "results", [])
-                    for result in search_results:
-                        url = getattr(result, "url", None)
-                        _add_source(url)
-
-                    # 兼容不同 SDK 的返回结构：从完整 chunk 中递归提取 URL
-                    payload = _chunk_to_dict(chunk)
-                    _collect_sources(payload)
-
-                    yield StreamEvent(
-                        type=StreamEventType.SEARCH_COMPLETE,
-                        metadata={
-                            "sources_count": len(sources),
-                            # 返回来源详情，便于 Phase 3 证据包追溯。
-                            "sources": list(dict.fromkeys(sources)),
-                        },
-                    )
-
-                elif chunk_type == "response.web_search_call.searching":
-                    # 搜索开始
-                    yield StreamEvent(type=StreamEventType.SEARCH_START)
-
-                elif chunk_type in (
-                    "response.output_item.added",
-                    "response.output_item.done",
-                    "response.output_text.done",
-                    "response.completed",
-                ):
-                    # 兼容 OpenAI/Ark 在 message annotations 中回传 url_citation 的场景
-                    payload = _chunk_to_dict(chunk)
-                    _collect_sources(payload)
+            response = await self.async_client.responses.create(**request_params)
 
+            async for chunk in response:
+                event = state.handle_chunk(chunk)
+                if event is None:
+                    continue
+                if coalescer is None:
+                    yield event
                 else:
-                    # 兼容旧格式：直接从 delta 属性获取
-                    delta_content = getattr(chunk, "delta", None)
-                    if isinstance(delta_content, str) and delta_content:
-                        output_parts.append(delta_content)
-                        yield StreamEvent(
-                            type=StreamEventType.OUTPUT_DELTA, content=delta_content
-                        )
+                    for out in coalescer.push(event):
+                        yield out
 
-            # 发送完成事件
-            yield StreamEvent(
-                type=StreamEventType.RESPONSE_COMPLETE,
-                metadata={
-                    "has_thinking": bool(thinking_parts),
-                    "sources_count": len(sources),
-                    "sources": list(dict.fromkeys(sources)),
-                },
-            )
+            if coalescer is not None:
+                for out in coalescer.flush():
+                    yield out
 
-            # 返回完整结果
-            return {
-                "output": "".join(output_parts),
-                "thinking": "".join(thinking_parts) if thinking_parts else None,
-                "sources": sources,
-            }
+            # 发送完成事件
+            yield state.complete_event()
 
         except Exception as e:
-            request_id = getattr(e, "request_id", None)
-            logger.error(
-                "Ark API 调用失败: %s (type=%s, model=%s, request_id=%s)",
-                e,
-                type(e).__name__,
-                model,
-                request_id,
-            )
+            error = self._wrap_api_error(e, model, use_websearch)
+            if coalescer is not None:
+                for out in coalescer.flush():
+                    yield out
             yield StreamEvent(type=StreamEventType.ERROR, content=str(e))
-            raise ToolExecutionError(
-                message=f"Ark API 调用失败: {e}",
-                tool_name="ark_responses",
-                details={
-                    "model": model,
-                    "use_websearch": use_websearch,
-                    "request_id": request_id,
-                    "exception_type": type(e).__name__,
-                },
-            )
+            raise error
+
+        finally:
+            # CancelledError / GeneratorExit 不属于 Exception，在此统一关闭连接
+            if response is not None:
+                await _aclose_stream(response)
 
     def create_response_stream(
         self,
@@ -387,21 +914,44 @@ class ArkClientWrapper:
         Yields:
             str: 流式返回的内容片段 (仅输出，不含思考)
         """
-        gen = self.create_response_stream_v2(
+        for event in self.create_response_stream_v2(
             messages=messages,
             model=model,
             use_websearch=use_websearch,
             websearch_limit=websearch_limit,
             thinking_mode=thinking_mode,
             **kwargs,
-        )
+        ):
+            if event.type is StreamEventType.OUTPUT_DELTA and event.content:
+                yield event.content
 
-        try:
-            for event in gen:
-                if event.type == StreamEventType.OUTPUT_DELTA and event.content:
-                    yield event.content
-        except StopIteration:
-            pass
+    async def acreate_response_stream(
+        self,
+        messages: list[dict[str, Any]],
+        model: Optional[str] = None,
+        use_websearch: bool = False,
+        websearch_limit: int = 15,
+        thinking_mode: ThinkingMode = ThinkingMode.DISABLED,
+        **kwargs,
+    ) -> AsyncGenerator[str, None]:
+        """
+        异步创建流式响应 (仅返回输出内容)
+
+        参数同 create_response_stream。
+
+        Yields:
+            str: 流式返回的内容片段 (仅输出，不含思考)
+        """
+        async for event in self.acreate_response_stream_v2(
+            messages=messages,
+            model=model,
+            use_websearch=use_websearch,
+            websearch_limit=websearch_limit,
+            thinking_mode=thinking_mode,
+            **kwargs,
+        ):
+            if event.type is StreamEventType.OUTPUT_DELTA and event.content:
+                yield event.content
 
     def create_response(
         self,
@@ -410,33 +960,48 @@ class ArkClientWrapper:
         use_websearch: bool = False,
         websearch_limit: int = 15,
         thinking_mode: ThinkingMode = ThinkingMode.DISABLED,
+        stream: bool = False,
         **kwargs,
     ) -> str:
         """
         创建非流式响应 (使用 Responses API)
 
+        默认发起 stream=False 请求，一次取回完整 Response，不逐 chunk 解析。
+
         Args:
             messages: 消息列表
             model: 模型名称
             use_websearch: 是否启用联网搜索
             websearch_limit: 联网搜索结果数量限制
             thinking_mode: Thinking 模式
+            stream: 为 True 时改走流式请求并在本地拼接（需要流式链路行为时使用）
             **kwargs: 其他参数
 
         Returns:
             str: 完整响应内容
         """
-        content_parts = []
-        for chunk in self.create_response_stream(
-            messages=messages,
-            model=model,
-            use_websearch=use_websearch,
-            websearch_limit=websearch_limit,
-            thinking_mode=thinking_mode,
+        if stream:
+            return self._collect(
+                messages, model, use_websearch, websearch_limit, thinking_mode, **kwargs
+            )["output"]
+
+        model = model or settings.default_model
+        request_params = self._build_request_params(
+            messages,
+            model,
+            use_websearch,
+            websearch_limit,
+            thinking_mode or ThinkingMode.DISABLED,
             **kwargs,
-        ):
-            content_parts.append(chunk)
-        return "".join(content_parts)
+        )
+        request_params["stream"] = False
+
+        try:
+            response = self._responses_create(**request_params)
+        except Exception as e:
+            raise self._wrap_api_error(e, model, use_websearch)
+
+        return _response_output_text(response)
 
     def create_response_full(
         self,
@@ -461,26 +1026,44 @@ class ArkClientWrapper:
         Returns:
             dict: {"output": str, "thinking": str|None, "sources": list}
         """
-        gen = self.create_response_stream_v2(
-            messages=messages,
-            model=model,
-            use_websearch=use_websearch,
-            websearch_limit=websearch_limit,
-            thinking_mode=thinking_mode,
-            **kwargs,
+        return self._collect(
+            messages, model, use_websearch, websearch_limit, thinking_mode, **kwargs
+        )
+
+    async def acreate_response_full(
+        self,
+        messages: list[dict[str, Any]],
+        model: Optional[str] = None,
+        use_websearch: bool = False,
+        websearch_limit: int = 15,
+        thinking_mode: ThinkingMode = ThinkingMode.DISABLED,
+        **kwargs,
+    ) -> dict[str, Any]:
+        """
+        异步创建完整响应 (包含思考过程和来源)
+
+        参数同 create_response_full。
+
+        Returns:
+            dict: {"output": str, "thinking": str|None, "sources": list}
+        """
+        return await self._acollect(
+            messages, model, use_websearch, websearch_limit, thinking_mode, **kwargs
         )
 
-        result = None
-        try:
-            while True:
-                next(gen)
-        except StopIteration as e:
-            result = e.value
 
-        return result or {"output": "", "thinking": None, "sources": []}
+_ark_client: Optional[ArkClientWrapper] = None
+_ark_client_lock = threading.Lock()
 
 
-@lru_cache()
 def get_ark_client() -> ArkClientWrapper:
-    """获取 Ark 客户端单例"""
-    return ArkClientWrapper()
+    """获取 Ark 客户端单例（命中路径仅一次 None 判断，不经 lru_cache 包装）"""
+    global _ark_client
+
+    client = _ark_client
+    if client is not None:
+        return client
+    with _ark_client_lock:
+        if _ark_client is None:
+            _ark_client = ArkClientWrapper()
+        return _ark_client
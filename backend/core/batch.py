@@ -0,0 +1,148 @@
+"""
+批量画像分析（离线评估 / 多画像对比）
+
+目标：
+- K 个画像 × N 个 Worker Agent 一次性扇出，而不是 K 次串行跑完整流程
+- 全局信号量限制同时在途的模型调用数，令牌桶限制每分钟发起的调用数（RPM）
+- 单个调用失败以 FAILED 输出返回，不影响其余；进度通过 on_progress 回调上报
+"""
+
+from __future__ import annotations
+
+import asyncio
+import time
+import uuid
+from collections.abc import Mapping, Sequence
+from typing import Any, Callable, Optional
+
+from agents.base import AgentContext, AgentOutput, AgentStatus, BaseAgent
+from agents.factory import get_agent_class, get_worker_agents
+
+from .ark_client import ArkClientWrapper, get_ark_client
+
+# 进度回调：(已完成数, 总数, 本次完成的输出)
+ProgressCallback = Callable[[int, int, AgentOutput], None]
+
+
+class _RateLimiter:
+    """
+    异步令牌桶
+
+    容量为 rate_per_minute，按匀速补充；桶空时等待下一个令牌。
+    """
+
+    def __init__(self, rate_per_minute: float):
+        self._rate = rate_per_minute / 60.0
+        self._capacity = max(1.0, float(rate_per_minute))
+        self._tokens = self._capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    async def acquire(self) -> None:
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity, self._tokens + (now - self._updated_at) * self._rate
+                )
+                self._updated_at = now
+                if self._tokens >= 1.0:
+                    self._tokens -= 1.0
+                    return
+                await asyncio.sleep((1.0 - self._tokens) / self._rate)
+
+
+class BatchProcessor:
+    """按 (画像, Agent) 扇出的批量执行器"""
+
+    def __init__(
+        self,
+        ark_client: Optional[ArkClientWrapper] = None,
+        agent_factory: Optional[Callable[[str], BaseAgent]] = None,
+    ):
+        """
+        Args:
+            ark_client: Ark 客户端实例，不传则使用默认单例
+            agent_factory: 自定义 Agent 工厂；默认每次调用新建实例
+                （实例池中的 Agent 持有单次调用状态，不能被并发共享）
+        """
+        self.ark_client = ark_client or get_ark_client()
+        self._agent_factory = agent_factory or self._new_agent
+
+    def _new_agent(self, agent_name: str) -> BaseAgent:
+        agent_class = get_agent_class(agent_name)
+        if agent_class is None:
+            raise ValueError(f"未知的 Agent: {agent_name}")
+        return agent_class(ark_client=self.ark_client)
+
+    async def run_batch(
+        self,
+        profiles: Sequence[Mapping[str, Any]],
+        agents: Optional[Sequence[str]] = None,
+        max_concurrency: int = 10,
+        rate_limit: Optional[float] = 100,
+        on_progress: Optional[ProgressCallback] = None,
+    ) -> list[dict[str, AgentOutput]]:
+        """
+        批量执行多个画像的 Worker 分析
+
+        Args:
+            profiles: 画像 dict 列表
+            agents: Agent 名称列表，默认全部 Worker Agent
+            max_concurrency: 全局同时在途的调用上限，<= 0 表示不限制
+            rate_limit: 每分钟最多发起的调用数，None 或 <= 0 表示不限速
+            on_progress: 每完成一次调用回调一次
+
+        Returns:
+            list[dict[str, AgentOutput]]: 与 profiles 顺序一致，每项为 {agent_name: 输出}
+        """
+        agent_names = list(agents) if agents is not None else get_worker_agents()
+        total = len(profiles) * len(agent_names)
+        batch_id = uuid.uuid4().hex[:8]
+
+        semaphore = asyncio.Semaphore(max_concurrency) if max_concurrency > 0 else None
+        limiter = _RateLimiter(rate_limit) if rate_limit and rate_limit > 0 else None
+        done = 0
+
+        async def _run(index: int, agent_name: str) -> AgentOutput:
+            nonlocal done
+            context = AgentContext(
+                session_id=f"batch-{batch_id}-{index}",
+                profile=profiles[index],
+            )
+            if semaphore is not None:
+                await semaphore.acquire()
+            try:
+                if limiter is not None:
+                    await limiter.acquire()
+                try:
+                    output = await self._agent_factory(agent_name).aexecute(context)
+                except Exception as e:
+                    output = AgentOutput(
+                        agent_name=agent_name,
+                        content="",
+                        status=AgentStatus.FAILED,
+                        error_message=str(e),
+                    )
+            finally:
+                if semaphore is not None:
+                    semaphore.release()
+
+            done += 1
+            if on_progress is not None:
+                on_progress(done, total, output)
+            return output
+
+        outputs = await asyncio.gather(
+            *(
+                _run(index, agent_name)
+                for index in range(len(profiles))
+                for agent_name in agent_names
+            )
+        )
+
+        width = len(agent_names)
+        return [
+            dict(zip(agent_names, outputs[start : start + width]))
+            for start in range(0, len(outputs), width)
+        ]
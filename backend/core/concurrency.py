@@ -0,0 +1,399 @@
+# backend/core/concurrency.py
+"""
+Ark 调用并发自适应（进程内共享）
+
+- AIMDLimiter：按调用结果加性增 / 乘性减，逼近 Ark 的真实饱和点
+- RateLimitHeaders：每个 HTTP 响应到达时解析限流响应头，
+  在余量见底或收到 retry-after 时提前收紧上限、暂停放行，避免 429 风暴
+- SlidingWindowLimiter：按 60 秒滑动窗口统计 RPM / TPM，冷启动时也不超配额
+- 控制器状态由 ADAPTIVE_STATE_COND 保护，图引擎在同一 Condition 上等待槽位
+- AdmissionGate：限制同时执行的工作流会话数，已满时快速失败而不是无限排队
+"""
+
+from dataclasses import dataclass
+from collections import deque
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from contextlib import contextmanager
+from typing import Generator, Optional
+import logging
+import threading
+import time
+
+from .config import settings
+from .exceptions import GraphExecutionError
+
+logger = logging.getLogger(__name__)
+
+
+_ADAPTIVE_DEFAULT_LIMIT = 4
+_ADAPTIVE_MIN_LIMIT = 1
+_ADAPTIVE_INCREASE_STEP = 0.5
+_ADAPTIVE_DECREASE_FACTOR = 0.5
+_ADAPTIVE_DECREASE_COOLDOWN_SEC = 5.0
+# 延迟基线的 EWMA 平滑系数
+_ADAPTIVE_LATENCY_SMOOTHING = 0.2
+_ADAPTIVE_LATENCY_TOLERANCE = 1.5
+# 连续健康样本数达到该值才加性增，避免上限来回振荡
+_ADAPTIVE_INCREASE_HYSTERESIS = 3
+
+# 会话准入时最多等待的时长，超过即判定过载
+_ADMISSION_TIMEOUT_SEC = 0.1
+
+# 剩余额度低于上限的该比例（或绝对值不超过 _RATE_LIMIT_LOW_REMAINING）时视为即将限流
+_RATE_LIMIT_LOW_RATIO = 0.1
+_RATE_LIMIT_LOW_REMAINING = 2
+
+
+class AIMDLimiter:
+    """
+    AIMD 并发控制器（加性增、乘性减）
+
+    - 连续 hysteresis 次成功且延迟不高于 EWMA 基线 × tolerance 时，上限加 alpha
+      （基线按 O(1) 增量更新，不保留样本窗口）
+    - 限流 / 超时 / 连接类错误时，上限乘以 beta；冷却期内只减一次，
+      避免同一波并发失败把上限连续压到底
+    - 收到 retry-after 时在 blocked_until 之前暂停放行新调用
+    - 非线程安全，调用方需持有 ADAPTIVE_STATE_COND
+    """
+
+    def __init__(
+        self,
+        initial: float = _ADAPTIVE_DEFAULT_LIMIT,
+        *,
+        alpha: float = _ADAPTIVE_INCREASE_STEP,
+        beta: float = _ADAPTIVE_DECREASE_FACTOR,
+        c_min: int = _ADAPTIVE_MIN_LIMIT,
+        c_max: Optional[int] = None,
+        smoothing: float = _ADAPTIVE_LATENCY_SMOOTHING,
+        tolerance: float = _ADAPTIVE_LATENCY_TOLERANCE,
+        hysteresis: int = _ADAPTIVE_INCREASE_HYSTERESIS,
+        cooldown_sec: float = _ADAPTIVE_DECREASE_COOLDOWN_SEC,
+    ):
+        self.alpha = alpha
+        self.beta = beta
+        self.c_min = max(1, int(c_min))
+        if c_max is None:
+            c_max = int(settings.ark_max_concurrency)
+        self.c_max = max(self.c_min, int(c_max))
+        self.smoothing = smoothing
+        self.tolerance = tolerance
+        self.hysteresis = max(1, int(hysteresis))
+        self.cooldown_sec = cooldown_sec
+        self._c = min(self.c_max, max(float(self.c_min), float(initial)))
+        self._samples = 0
+        self._latency_ewma = 0.0
+        self._healthy_streak = 0
+        self._last_decrease_at = float("-inf")
+        # time.monotonic() 时间戳，之前不放行新调用
+        self.blocked_until = 0.0
+
+    def current(self) -> int:
+        """当前生效的整数并发上限"""
+        return int(self._c)
+
+    def is_blocked(self, now: Optional[float] = None) -> bool:
+        """是否处于 retry-after 暂停期"""
+        now = time.monotonic() if now is None else now
+        return now < self.blocked_until
+
+    def on_success(self, latency_ms: Optional[float]) -> bool:
+        """
+        记录一次成功调用
+
+        Returns:
+            bool: 整数上限是否上调
+        """
+        if latency_ms is None:
+            return False
+        if self._samples:
+            healthy = latency_ms <= self._latency_ewma * self.tolerance
+            self._latency_ewma += self.smoothing * (latency_ms - self._latency_ewma)
+        else:
+            healthy = True
+            self._latency_ewma = float(latency_ms)
+        self._samples += 1
+
+        if not healthy:
+            self._healthy_streak = 0
+            return False
+        self._healthy_streak += 1
+        if self._healthy_streak < self.hysteresis:
+            return False
+        self._healthy_streak = 0
+        before = int(self._c)
+        self._c = min(float(self.c_max), self._c + self.alpha)
+        return int(self._c) > before
+
+    def on_overload(self, now: Optional[float] = None) -> bool:
+        """
+        记录一次过载信号（429 / 5xx / 超时 / 连接重置）
+
+        Returns:
+            bool: 整数上限是否下调
+        """
+        now = time.monotonic() if now is None else now
+        if now - self._last_decrease_at < self.cooldown_sec:
+            return False
+        self._last_decrease_at = now
+        self._healthy_streak = 0
+        before = int(self._c)
+        self._c = max(float(self.c_min), self._c * self.beta)
+        return int(self._c) < before
+
+    def on_rate_limit(
+        self, headers: "RateLimitHeaders", now: Optional[float] = None
+    ) -> bool:
+        """
+        按限流响应头提前收紧
+
+        Returns:
+            bool: 整数上限是否下调
+        """
+        now = time.monotonic() if now is None else now
+        if headers.retry_after is not None and headers.retry_after > 0:
+            self.blocked_until = max(self.blocked_until, now + headers.retry_after)
+
+        before = int(self._c)
+        if headers.requests_exhausted():
+            # 剩余请求数即为此刻还能安全放行的并发
+            self._c = min(
+                self._c, float(max(self.c_min, headers.remaining_requests or 0))
+            )
+        elif headers.tokens_exhausted():
+            return self.on_overload(now)
+        return int(self._c) < before
+
+
+@dataclass(frozen=True)
+class RateLimitHeaders:
+    """一次响应携带的限流信息（缺失的字段为 None）"""
+
+    limit_requests: Optional[int] = None
+    remaining_requests: Optional[int] = None
+    limit_tokens: Optional[int] = None
+    remaining_tokens: Optional[int] = None
+    # 秒
+    retry_after: Optional[float] = None
+
+    @classmethod
+    def parse(cls, headers: Mapping[str, str]) -> Optional["RateLimitHeaders"]:
+        """
+        解析 x-ratelimit-* / retry-after 响应头
+
+        Returns:
+            Optional[RateLimitHeaders]: 不含任何限流头时返回 None
+        """
+        if not headers:
+            return None
+        # 普通 dict 大小写敏感，统一转小写再取
+        get = {str(k).lower(): v for k, v in headers.items()}.get
+
+        parsed = cls(
+            limit_requests=_parse_int(get("x-ratelimit-limit-requests")),
+            remaining_requests=_parse_int(get("x-ratelimit-remaining-requests")),
+            limit_tokens=_parse_int(get("x-ratelimit-limit-tokens")),
+            remaining_tokens=_parse_int(get("x-ratelimit-remaining-tokens")),
+            retry_after=_parse_retry_after(get("retry-after-ms"), get("retry-after")),
+        )
+        if parsed == _EMPTY_RATE_LIMIT_HEADERS:
+            return None
+        return parsed
+
+    def requests_exhausted(self) -> bool:
+        return _is_low(self.remaining_requests, self.limit_requests)
+
+    def tokens_exhausted(self) -> bool:
+        return _is_low(self.remaining_tokens, self.limit_tokens)
+
+
+_EMPTY_RATE_LIMIT_HEADERS = RateLimitHeaders()
+
+
+def _parse_int(value: Optional[str]) -> Optional[int]:
+    if value is None:
+        return None
+    try:
+        return int(float(value))
+    except (TypeError, ValueError):
+        return None
+
+
+def _parse_retry_after(
+    value_ms: Optional[str], value: Optional[str]
+) -> Optional[float]:
+    """retry-after-ms 优先；retry-after 支持秒数与 HTTP 日期两种写法"""
+    if value_ms is not None:
+        try:
+            return max(0.0, float(value_ms) / 1000)
+        except (TypeError, ValueError):
+            pass
+    if value is None:
+        return None
+    try:
+        return max(0.0, float(value))
+    except (TypeError, ValueError):
+        pass
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+def _is_low(remaining: Optional[int], limit: Optional[int]) -> bool:
+    if remaining is None:
+        return False
+    if remaining <= _RATE_LIMIT_LOW_REMAINING:
+        return True
+    return bool(limit) and remaining / limit < _RATE_LIMIT_LOW_RATIO
+
+
+class SlidingWindowLimiter:
+    """
+    滑动窗口 RPM / TPM 计数
+
+    AIMD 只能在调用完成后反应；冷启动时一批 Worker 同时发起可能直接打满配额。
+    放行前按窗口内的请求数与 token 数预判，超额则给出需要等待的秒数。
+    非线程安全，调用方需持有 ADAPTIVE_STATE_COND。
+    """
+
+    def __init__(self, rpm_limit: int = 0, tpm_limit: int = 0, window_sec: float = 60.0):
+        self.rpm_limit = max(0, int(rpm_limit))
+        self.tpm_limit = max(0, int(tpm_limit))
+        self.window_sec = window_sec
+        self._entries: deque[tuple[float, int]] = deque()
+        self._tokens = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.rpm_limit or self.tpm_limit)
+
+    def _evict(self, now: float) -> None:
+        entries = self._entries
+        expire_before = now - self.window_sec
+        while entries and entries[0][0] <= expire_before:
+            self._tokens -= entries.popleft()[1]
+
+    def wait_time(self, expected_tokens: int = 0, now: Optional[float] = None) -> float:
+        """
+        放行一次调用前需要等待的秒数
+
+        Returns:
+            float: 0 表示可立即放行
+        """
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        self._evict(now)
+        entries = self._entries
+        if not entries:
+            # 窗口为空时总是放行，避免单次预估超过 TPM 时永远等待
+            return 0.0
+        over_rpm = self.rpm_limit and len(entries) >= self.rpm_limit
+        over_tpm = self.tpm_limit and self._tokens + expected_tokens > self.tpm_limit
+        if not (over_rpm or over_tpm):
+            return 0.0
+        return max(0.0, entries[0][0] + self.window_sec - now)
+
+    def record(self, tokens: int = 0, now: Optional[float] = None) -> None:
+        """记录一次已放行的调用"""
+        if not self.enabled:
+            return
+        now = time.monotonic() if now is None else now
+        tokens = max(0, int(tokens))
+        self._entries.append((now, tokens))
+        self._tokens += tokens
+
+
+ADAPTIVE_LIMITER = AIMDLimiter()
+# 所有模型（含 DeepSeek / Kimi）都经同一 Ark 账号调用，共用一个配额窗口
+ARK_RATE_WINDOW = SlidingWindowLimiter(
+    rpm_limit=settings.ark_rpm_limit, tpm_limit=settings.ark_tpm_limit
+)
+ADAPTIVE_STATE_LOCK = threading.Lock()
+ADAPTIVE_STATE_COND = threading.Condition(ADAPTIVE_STATE_LOCK)
+
+
+def apply_rate_limit_headers(
+    headers: Mapping[str, str],
+) -> Optional[RateLimitHeaders]:
+    """
+    解析响应头并作用到进程内共享的 AIMD 控制器
+
+    Returns:
+        Optional[RateLimitHeaders]: 解析结果；不含限流头时为 None
+    """
+    parsed = RateLimitHeaders.parse(headers)
+    if parsed is None:
+        return None
+    with ADAPTIVE_STATE_COND:
+        if ADAPTIVE_LIMITER.on_rate_limit(parsed):
+            logger.info(
+                f"Ark 限流余量不足，并发上限降至 {ADAPTIVE_LIMITER.current()}"
+            )
+    return parsed
+
+
+class AdmissionGate:
+    """
+    工作流会话准入（有界，线程安全）
+
+    槽位等待是无界的：持续过载时每个新会话都会占住一个线程，
+    最终耗尽 Worker 线程池并造成队头阻塞。这里在入口限制并发会话数，
+    满额时在 timeout 内仍拿不到槽位就抛出 OVERLOADED，由路由返回 429。
+    """
+
+    def __init__(self, capacity: int, timeout_sec: float = _ADMISSION_TIMEOUT_SEC):
+        self.capacity = max(1, int(capacity))
+        self.timeout_sec = max(0.0, timeout_sec)
+        self._semaphore = threading.BoundedSemaphore(self.capacity)
+        self._active = 0
+        self._lock = threading.Lock()
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def saturation_ratio(self) -> float:
+        """当前占用比例（0 ~ 1），用于观测"""
+        return self._active / self.capacity
+
+    def try_acquire(self) -> bool:
+        if not self._semaphore.acquire(timeout=self.timeout_sec):
+            return False
+        with self._lock:
+            self._active += 1
+        return True
+
+    def release(self) -> None:
+        with self._lock:
+            self._active = max(0, self._active - 1)
+        self._semaphore.release()
+
+    @contextmanager
+    def admit(self) -> Generator[None, None, None]:
+        """
+        占用一个会话槽位
+
+        Raises:
+            GraphExecutionError: 槽位已满（code=OVERLOADED）
+        """
+        if not self.try_acquire():
+            logger.warning(f"工作流准入已满（{self.capacity}），拒绝新会话")
+            raise GraphExecutionError(
+                "服务繁忙，请稍后重试",
+                details={"capacity": self.capacity, "active": self._active},
+                code="OVERLOADED",
+            )
+        try:
+            yield
+        finally:
+            self.release()
+
+
+SESSION_ADMISSION = AdmissionGate(settings.graph_admission_cap)
@@ -107,6 +107,22 @@ class Settings(BaseSettings):
         default=20.0, alias="ARK_CONNECT_TIMEOUT_SECONDS"
     )
     ark_max_retries: int = Field(default=2, alias="ARK_MAX_RETRIES")
+    # 同时在途的 Ark 调用上限（AIMD 自适应并发的天花板）
+    ark_max_concurrency: int = Field(default=8, alias="ARK_MAX_CONCURRENCY")
+    # 账号级 RPM / TPM 配额（60 秒滑动窗口主动限速），0 表示不限
+    ark_rpm_limit: int = Field(default=0, alias="ARK_RPM_LIMIT")
+    ark_tpm_limit: int = Field(default=0, alias="ARK_TPM_LIMIT")
+    # 同时执行的工作流会话上限，超出时立即拒绝（HTTP 429），而非排队等待
+    graph_admission_cap: int = Field(default=32, alias="GRAPH_ADMISSION_CAP")
+    # 连接池：长连接复用，HTTP/2 需安装 h2（httpx[http2]），未安装时自动回退 HTTP/1.1
+    ark_http2: bool = Field(default=True, alias="ARK_HTTP2")
+    ark_max_connections: int = Field(default=64, alias="ARK_MAX_CONNECTIONS")
+    ark_max_keepalive_connections: int = Field(
+        default=32, alias="ARK_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    ark_keepalive_expiry_seconds: float = Field(
+        default=30.0, alias="ARK_KEEPALIVE_EXPIRY_SECONDS"
+    )
 
     # 默认模型 (支持 web_search 的模型)
     default_model: str = Field(default="doubao-seed-1-6-250615", alias="DEFAULT_MODEL")
@@ -141,6 +157,10 @@ class Settings(BaseSettings):
     # 辩论配置
     default_debate_rounds: int = Field(default=2, alias="DEFAULT_DEBATE_ROUNDS")
     max_debate_rounds: int = Field(default=4, alias="MAX_DEBATE_ROUNDS")
+    # 质疑 prompt 中被审查报告的 token 预算（估算值），<= 0 表示不压缩
+    debate_context_token_budget: int = Field(
+        default=2000, alias="DEBATE_CONTEXT_TOKEN_BUDGET"
+    )
 
     # 二次回应配置 (质疑 → 回应 → 确认/追问)
     enable_followup_response: bool = Field(
@@ -174,10 +194,45 @@ class Settings(BaseSettings):
         alias="PROMPT_TEMPLATE_VERSION",
     )
 
+    # Ark 上下文缓存：请求携带 caching 参数，由服务端复用相同前缀（系统提示词）的 KV
+    enable_prompt_cache: bool = Field(default=False, alias="ENABLE_PROMPT_CACHE")
+
     # 缓存配置
     tool_cache_ttl_seconds: int = Field(default=300, alias="TOOL_CACHE_TTL_SECONDS")
     tool_cache_max_size: int = Field(default=128, alias="TOOL_CACHE_MAX_SIZE")
 
+    # 红队/同行质疑结果缓存（相同目标内容直接复用审查结果）
+    challenge_cache_ttl_seconds: int = Field(
+        default=86400, alias="CHALLENGE_CACHE_TTL_SECONDS"
+    )
+    challenge_cache_max_size: int = Field(default=256, alias="CHALLENGE_CACHE_MAX_SIZE")
+
+    # 结构化响应缓存：相同画像槽位（归一化后）的 Worker 输出跨会话复用
+    enable_structural_cache: bool = Field(default=False, alias="ENABLE_STRUCTURAL_CACHE")
+    structural_cache_ttl_seconds: int = Field(
+        default=3600, alias="STRUCTURAL_CACHE_TTL_SECONDS"
+    )
+    structural_cache_max_size: int = Field(
+        default=256, alias="STRUCTURAL_CACHE_MAX_SIZE"
+    )
+
+    # 模型响应缓存：非联网调用按 (模型, 消息, 思考模式) 逐字命中时直接复用输出
+    enable_llm_cache: bool = Field(default=False, alias="ENABLE_LLM_CACHE")
+    llm_cache_ttl_seconds: int = Field(default=3600, alias="LLM_CACHE_TTL_SECONDS")
+    llm_cache_max_size: int = Field(default=256, alias="LLM_CACHE_MAX_SIZE")
+
+    # 图检查点：配置 SQLite 文件路径时使用 SqliteSaver（需安装 langgraph-checkpoint-sqlite），
+    # 留空则每个引擎使用独立的 MemorySaver
+    graph_checkpoint_db: str = Field(default="", alias="GRAPH_CHECKPOINT_DB")
+
+    # 增量事件合并：节点内同一 Agent 连续的增量片段在源头合并后再写入事件流，任一阈值为 0 时关闭
+    stream_coalesce_max_chars: int = Field(
+        default=256, alias="STREAM_COALESCE_MAX_CHARS"
+    )
+    stream_coalesce_max_delay_ms: int = Field(
+        default=50, alias="STREAM_COALESCE_MAX_DELAY_MS"
+    )
+
     # web_search 配置
     web_search_limit: int = Field(default=15, alias="WEB_SEARCH_LIMIT")
 
@@ -11,6 +11,8 @@ from __future__ import annotations
 from datetime import datetime, timezone
 from typing import Any, Optional
 
+from memory import MemorySnapshotBuilder
+
 
 def _to_dict(row: Any) -> dict[str, Any]:
     """将对象转换为 dict（兼容 dataclass、pydantic、普通对象）。"""
@@ -29,6 +31,16 @@ def _to_dict(row: Any) -> dict[str, Any]:
         except Exception:
             pass
 
+    # 普通对象直接读实例 __dict__，避免 dir() 的 MRO 遍历与排序
+    raw = getattr(row, "__dict__", None)
+    if isinstance(raw, dict) and raw:
+        return {
+            key: value
+            for key, value in raw.items()
+            if not key.startswith("_") and not callable(value)
+        }
+
+    # __slots__ 等没有实例 __dict__ 的对象回退到 dir()
     data: dict[str, Any] = {}
     for key in dir(row):
         if key.startswith("_"):
@@ -48,7 +60,8 @@ def _now_iso() -> str:
 
 
 def _clip_text(text: Any, limit: int = 220) -> str:
-    raw = str(text or "").strip()
+    # 已是 str 时跳过 str() 转换；strip() 无可剥离字符时返回原对象，不额外分配
+    raw = (text if type(text) is str else str(text or "")).strip()
     if len(raw) <= limit:
         return raw
     return raw[: max(0, limit - 1)] + "…"
@@ -81,15 +94,8 @@ def _normalize_source_list(raw_sources: Any) -> list[str]:
         if value:
             source_list.append(value)
 
-    # 去重并保持原顺序
-    deduped: list[str] = []
-    seen = set()
-    for src in source_list:
-        if src in seen:
-            continue
-        seen.add(src)
-        deduped.append(src)
-    return deduped
+    # 去重并保持原顺序（dict 保序，去重在 C 层完成）
+    return list(dict.fromkeys(source_list))
 
 
 def _normalize_confidence(value: Any) -> float:
@@ -100,79 +106,53 @@ def _normalize_confidence(value: Any) -> float:
     return max(0.0, min(1.0, round(num, 3)))
 
 
-def _build_source_index(agent_rows: list[dict[str, Any]]) -> tuple[list[dict[str, Any]], dict[str, str]]:
-    """
-    构建全局来源索引。
-
-    Returns:
-        (sources, value_to_id)
-    """
-    sources: list[dict[str, Any]] = []
-    value_to_id: dict[str, str] = {}
-
-    for row in agent_rows:
-        agent_name = str(row.get("agent_name") or "unknown")
-        for src in _normalize_source_list(row.get("sources")):
-            if src in value_to_id:
-                continue
-            source_id = f"S{len(sources) + 1:03d}"
-            value_to_id[src] = source_id
-            sources.append(
-                {
-                    "source_id": source_id,
-                    "source": src,
-                    "first_seen_in_agent": agent_name,
-                }
-            )
-
-    return sources, value_to_id
-
-
-def build_evidence_pack(
-    *,
-    session_id: str,
-    profile: Optional[dict[str, Any]],
-    agent_results: list[Any],
-    debate_exchanges: list[Any],
-    final_report: str,
-    generated_at: Optional[str] = None,
-) -> dict[str, Any]:
+class EvidencePackBuilder:
     """
-    构建 Evidence Pack 结构化输出。
+    逐行累积的 Evidence Pack 构建器
 
-    该函数不会抛出业务异常，保证在降级场景仍可输出最小证据包。
+    来源编号按 Agent 行顺序分配：第 i 行的来源在处理该行时即已编号，
+    因此索引、claim 与溯源可在同一次遍历中生成。
     """
-    generated_at = generated_at or _now_iso()
-    profile = profile or {}
-
-    agent_rows = [_to_dict(r) for r in agent_results or []]
-    debate_rows = [_to_dict(r) for r in debate_exchanges or []]
 
-    sources, source_id_map = _build_source_index(agent_rows)
-    claims: list[dict[str, Any]] = []
-    traceability: list[dict[str, Any]] = []
+    def __init__(self, generated_at: str) -> None:
+        self.generated_at = generated_at
+        self.claims: list[dict[str, Any]] = []
+        self.traceability: list[dict[str, Any]] = []
+        self.sources: list[dict[str, Any]] = []
+        self.debate_adjustments: list[dict[str, Any]] = []
+        self._source_ids: dict[str, str] = {}
 
-    for idx, row in enumerate(agent_rows, start=1):
+    def add_agent_row(self, row: dict[str, Any]) -> None:
+        idx = len(self.claims) + 1
         agent_name = str(row.get("agent_name") or f"agent_{idx}")
-        content = row.get("content") or ""
-        confidence = _normalize_confidence(row.get("confidence"))
-        source_refs = [
-            source_id_map[src]
-            for src in _normalize_source_list(row.get("sources"))
-            if src in source_id_map
-        ]
+        source_ids = self._source_ids
+        source_refs: list[str] = []
+        for src in _normalize_source_list(row.get("sources")):
+            source_id = source_ids.get(src)
+            if source_id is None:
+                source_id = f"S{len(self.sources) + 1:03d}"
+                source_ids[src] = source_id
+                self.sources.append(
+                    {
+                        "source_id": source_id,
+                        "source": src,
+                        "first_seen_in_agent": str(row.get("agent_name") or "unknown"),
+                    }
+                )
+            source_refs.append(source_id)
 
         claim_id = f"C{idx:03d}"
-        claim = {
-            "claim_id": claim_id,
-            "agent": agent_name,
-            "summary": _clip_text(content, limit=240),
-            "confidence": confidence,
-            "source_refs": source_refs,
-            "generated_at": generated_at,
-        }
-        claims.append(claim)
-        traceability.append(
+        self.claims.append(
+            {
+                "claim_id": claim_id,
+                "agent": agent_name,
+                "summary": _clip_text(row.get("content") or "", limit=240),
+                "confidence": _normalize_confidence(row.get("confidence")),
+                "source_refs": source_refs,
+                "generated_at": self.generated_at,
+            }
+        )
+        self.traceability.append(
             {
                 "claim_id": claim_id,
                 "from_agent": agent_name,
@@ -180,9 +160,8 @@ def build_evidence_pack(
             }
         )
 
-    debate_adjustments = []
-    for row in debate_rows:
-        debate_adjustments.append(
+    def add_debate_row(self, row: dict[str, Any]) -> None:
+        self.debate_adjustments.append(
             {
                 "round_number": row.get("round_number"),
                 "debate_type": row.get("debate_type"),
@@ -194,26 +173,101 @@ def build_evidence_pack(
             }
         )
 
-    return {
-        "version": "phase3.v1",
-        "session_id": session_id,
-        "generated_at": generated_at,
-        "profile": {
-            "target_market": profile.get("target_market"),
-            "supply_chain": profile.get("supply_chain"),
-            "seller_type": profile.get("seller_type"),
-            "min_price": profile.get("min_price"),
-            "max_price": profile.get("max_price"),
-        },
-        "report_excerpt": _clip_text(final_report, limit=300),
-        "claims": claims,
-        "sources": sources,
-        "debate_adjustments": debate_adjustments,
-        "traceability": traceability,
-        "stats": {
-            "claims_count": len(claims),
-            "sources_count": len(sources),
-            "debate_count": len(debate_adjustments),
-        },
-    }
+    def build(
+        self,
+        *,
+        session_id: str,
+        profile: Optional[dict[str, Any]],
+        final_report: str,
+    ) -> dict[str, Any]:
+        profile = profile or {}
+        return {
+            "version": "phase3.v1",
+            "session_id": session_id,
+            "generated_at": self.generated_at,
+            "profile": {
+                "target_market": profile.get("target_market"),
+                "supply_chain": profile.get("supply_chain"),
+                "seller_type": profile.get("seller_type"),
+                "min_price": profile.get("min_price"),
+                "max_price": profile.get("max_price"),
+            },
+            "report_excerpt": _clip_text(final_report, limit=300),
+            "claims": self.claims,
+            "sources": self.sources,
+            "debate_adjustments": self.debate_adjustments,
+            "traceability": self.traceability,
+            "stats": {
+                "claims_count": len(self.claims),
+                "sources_count": len(self.sources),
+                "debate_count": len(self.debate_adjustments),
+            },
+        }
+
+
+def build_evidence_pack(
+    *,
+    session_id: str,
+    profile: Optional[dict[str, Any]],
+    agent_results: list[Any],
+    debate_exchanges: list[Any],
+    final_report: str,
+    generated_at: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    构建 Evidence Pack 结构化输出。
+
+    该函数不会抛出业务异常，保证在降级场景仍可输出最小证据包。
+    """
+    builder = EvidencePackBuilder(generated_at or _now_iso())
+    for row in agent_results or []:
+        builder.add_agent_row(_to_dict(row))
+    for row in debate_exchanges or []:
+        builder.add_debate_row(_to_dict(row))
+    return builder.build(
+        session_id=session_id, profile=profile, final_report=final_report
+    )
+
+
+def build_evidence_and_memory(
+    *,
+    session_id: str,
+    profile: Optional[dict[str, Any]],
+    agent_results: list[Any],
+    debate_exchanges: list[Any],
+    final_report: str,
+    generated_at: Optional[str] = None,
+) -> tuple[dict[str, Any], dict[str, Any]]:
+    """
+    一次遍历同时构建 Evidence Pack 与记忆快照。
 
+    每行只做一次 dict 转换，两个构建器共用；输出与分别调用
+    build_evidence_pack / build_memory_snapshot 一致。
+
+    Returns:
+        (evidence_pack, memory_snapshot)
+    """
+    generated_at = generated_at or _now_iso()
+    evidence = EvidencePackBuilder(generated_at)
+    memory = MemorySnapshotBuilder()
+
+    for row in agent_results or []:
+        row_dict = _to_dict(row)
+        evidence.add_agent_row(row_dict)
+        memory.add_agent_row(row_dict)
+    for row in debate_exchanges or []:
+        row_dict = _to_dict(row)
+        evidence.add_debate_row(row_dict)
+        memory.add_debate_row(row_dict)
+
+    return (
+        evidence.build(
+            session_id=session_id, profile=profile, final_report=final_report
+        ),
+        memory.build(
+            session_id=session_id,
+            profile=profile,
+            final_report=final_report,
+            generated_at=generated_at,
+        ),
+    )
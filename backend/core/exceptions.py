@@ -6,6 +6,15 @@
 from typing import Optional, Any
 
 
+def _merge_details(
+    base: dict[str, Any], details: Optional[dict[str, Any]]
+) -> dict[str, Any]:
+    """把调用方传入的 details 原地并入子类的固定字段（同名键以调用方为准）"""
+    if details:
+        base.update(details)
+    return base
+
+
 class WeaveAIException(Exception):
     """WeaveAI 基础异常类"""
     
@@ -18,16 +27,20 @@ class WeaveAIException(Exception):
         self.message = message
         self.code = code
         self.details = details or {}
+        self._dict: Optional[dict[str, Any]] = None
         super().__init__(self.message)
     
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "error": {
-                "code": self.code,
-                "message": self.message,
-                "details": self.details,
+        """序列化为错误响应结构（字段构造后不再变化，首次构建后复用，调用方勿修改）"""
+        if self._dict is None:
+            self._dict = {
+                "error": {
+                    "code": self.code,
+                    "message": self.message,
+                    "details": self.details,
+                }
             }
-        }
+        return self._dict
 
 
 class AgentExecutionError(WeaveAIException):
@@ -42,7 +55,7 @@ class AgentExecutionError(WeaveAIException):
         super().__init__(
             message=message,
             code="AGENT_EXECUTION_ERROR",
-            details={"agent_name": agent_name, **(details or {})}
+            details=_merge_details({"agent_name": agent_name}, details)
         )
         self.agent_name = agent_name
 
@@ -60,11 +73,9 @@ class ToolExecutionError(WeaveAIException):
         super().__init__(
             message=message,
             code="TOOL_EXECUTION_ERROR",
-            details={
-                "tool_name": tool_name,
-                "agent_name": agent_name,
-                **(details or {})
-            }
+            details=_merge_details(
+                {"tool_name": tool_name, "agent_name": agent_name}, details
+            )
         )
         self.tool_name = tool_name
         self.agent_name = agent_name
@@ -82,28 +93,55 @@ class DebateError(WeaveAIException):
         super().__init__(
             message=message,
             code="DEBATE_ERROR",
-            details={"round_number": round_number, **(details or {})}
+            details=_merge_details({"round_number": round_number}, details)
         )
         self.round_number = round_number
 
 
 class GraphExecutionError(WeaveAIException):
-    """图执行错误"""
+    """图执行错误（code 为 OVERLOADED 时表示准入已满，调用方应返回 429）"""
     
     def __init__(
         self,
         message: str,
         node_id: Optional[str] = None,
-        details: Optional[dict[str, Any]] = None
+        details: Optional[dict[str, Any]] = None,
+        code: str = "GRAPH_EXECUTION_ERROR"
     ):
         super().__init__(
             message=message,
-            code="GRAPH_EXECUTION_ERROR",
-            details={"node_id": node_id, **(details or {})}
+            code=code,
+            details=_merge_details({"node_id": node_id}, details)
         )
         self.node_id = node_id
 
 
+class RequestCancelledError(WeaveAIException):
+    """请求已被取消（如客户端断开），不应重试"""
+    
+    def __init__(self, message: str = "请求已取消", details: Optional[dict[str, Any]] = None):
+        super().__init__(
+            message=message,
+            code="REQUEST_CANCELLED",
+            details=details
+        )
+
+
+class CircuitOpenError(WeaveAIException):
+    """Ark 熔断中，调用被直接拒绝，不应在冷却期内重试"""
+    
+    def __init__(
+        self,
+        message: str = "Ark 服务熔断中，暂停调用",
+        details: Optional[dict[str, Any]] = None
+    ):
+        super().__init__(
+            message=message,
+            code="CIRCUIT_OPEN",
+            details=details
+        )
+
+
 class ConfigurationError(WeaveAIException):
     """配置错误"""
     
@@ -127,6 +165,6 @@ class ValidationError(WeaveAIException):
         super().__init__(
             message=message,
             code="VALIDATION_ERROR",
-            details={"field": field, **(details or {})}
+            details=_merge_details({"field": field}, details)
         )
         self.field = field
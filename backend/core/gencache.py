@@ -0,0 +1,80 @@
+"""
+结构化响应缓存（按画像槽位复用 Worker 输出）
+
+目标：
+- Worker 提示词由固定模板 + 画像槽位组成，相同槽位组合的请求可直接复用此前的输出
+- 槽位值做轻量归一化（去首尾空白、折叠空白、忽略大小写、列表去重排序），
+  使写法不同但语义相同的画像命中同一条缓存
+- 底层复用 ToolCache 的进程内 TTL + LRU 实现
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from collections.abc import Mapping
+from typing import Any, Optional
+
+from tools import ToolCache
+
+
+def _normalize_slot(value: Any) -> Any:
+    """归一化单个槽位值。"""
+    if isinstance(value, str):
+        return " ".join(value.split()).casefold()
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, (list, tuple, set)):
+        return sorted({str(_normalize_slot(item)) for item in value if item})
+    if isinstance(value, Mapping):
+        return {str(k): _normalize_slot(v) for k, v in value.items()}
+    return str(value)
+
+
+def profile_fingerprint(profile: Optional[Mapping[str, Any]]) -> str:
+    """
+    计算画像槽位指纹
+
+    Args:
+        profile: 用户画像 dict
+
+    Returns:
+        str: 归一化槽位的 sha256
+    """
+    slots = {str(k): _normalize_slot(v) for k, v in (profile or {}).items()}
+    raw = json.dumps(slots, ensure_ascii=False, sort_keys=True)
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class StructuralCache:
+    """按 (Agent, 模型, 模板版本, 画像指纹) 缓存 Worker 完整输出。"""
+
+    def __init__(self, ttl_seconds: int = 3600, max_size: int = 256):
+        self._cache = ToolCache(ttl_seconds=ttl_seconds, max_size=max_size)
+
+    @staticmethod
+    def build_key(
+        *,
+        agent_name: str,
+        model: str,
+        template_version: str,
+        profile: Optional[Mapping[str, Any]],
+        debate_round: int,
+        enable_websearch: bool,
+    ) -> str:
+        return ToolCache.build_key(
+            agent_name=agent_name,
+            model=model,
+            template_version=template_version,
+            prompt_hash=profile_fingerprint(profile),
+            debate_round=debate_round,
+            enable_websearch=enable_websearch,
+        )
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        self._cache.set(key, value)
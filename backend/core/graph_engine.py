@@ -18,20 +18,28 @@ from typing import (
 )
 from contextlib import contextmanager
 from dataclasses import dataclass, field
-from enum import Enum
+from enum import StrEnum
 import logging
 import uuid
 import time
 import copy
+import io
 from datetime import datetime
-import operator
 import asyncio
+import importlib.util
+import random
+import re
 import threading
+from collections import deque
 
 # LangGraph 核心导入
 from langgraph.graph import StateGraph, START, END
 from langgraph.types import Send, interrupt, Command
+from langgraph.checkpoint.base import BaseCheckpointSaver
 from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.jsonplus import JsonPlusSerializer
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import ContextThreadPoolExecutor
 from langgraph.config import get_stream_writer
 
 from core.config import (
@@ -42,11 +50,24 @@ from core.config import (
     AGENT_DEBATE_CHALLENGER,
     AGENT_SYNTHESIZER,
 )
-from core.exceptions import GraphExecutionError
-from core.evidence_pack import build_evidence_pack
-from memory import build_memory_snapshot
+from core.concurrency import (
+    ADAPTIVE_LIMITER,
+    ADAPTIVE_STATE_COND,
+    ADAPTIVE_STATE_LOCK,
+    ARK_RATE_WINDOW,
+    SESSION_ADMISSION,
+)
+from core.exceptions import (
+    CircuitOpenError,
+    GraphExecutionError,
+    RequestCancelledError,
+)
+from core.evidence_pack import build_evidence_and_memory
+from core.gencache import StructuralCache
+from core.llm_cache import LLMCache
 from tools import ToolCache, ToolGuardrail, ToolRegistry
-from utils.report_export import write_html_report
+from tools.metrics import estimate_tokens
+from utils.report_export import submit_html_report
 
 logger = logging.getLogger(__name__)
 
@@ -55,20 +76,141 @@ logger = logging.getLogger(__name__)
 # Ark 并发自适应状态（进程内共享）
 # ============================================
 
-_ADAPTIVE_DEFAULT_LIMIT = 4
-_ADAPTIVE_REDUCED_LIMIT = 2
-_ADAPTIVE_FAIL_THRESHOLD = 4
-_ADAPTIVE_RECOVERY_SUCCESS_STREAK = 6
-_ADAPTIVE_REDUCED_WINDOW_SEC = 120.0
-
-_ADAPTIVE_CONCURRENCY_LIMIT = _ADAPTIVE_DEFAULT_LIMIT
+# 控制器与 Condition 定义在 core.concurrency，HTTP 层据响应头同步收紧
 _ADAPTIVE_INFLIGHT_CALLS = 0
-_ADAPTIVE_CONN_FAIL_STREAK = 0
-_ADAPTIVE_SUCCESS_STREAK = 0
-_ADAPTIVE_RECOVER_AFTER_TS = 0.0
+# 等槽位时单次 wait 的兜底超时（正常由释放 / 扩容 / 取消通知唤醒）
+_ADAPTIVE_WAIT_CAP_SEC = 1.0
+# 重试退避的指数增长上限
+_RETRY_BACKOFF_CAP_MS = 30_000
+# Worker 首包错峰间隔
+_WORKER_STAGGER_STEP_MS = 120
+# 连接波动 / 限流 / 服务端过载类错误的关键词（一次编译，多线程共享）
+_CONNECTION_LIKE_ERROR_RE = re.compile(
+    "|".join(
+        re.escape(keyword)
+        for keyword in (
+            "connection error",
+            "connection reset",
+            "request timed out",
+            "timeout",
+            "connect",
+            "network",
+            "ssl",
+            "tls",
+            "429",
+            "rate limit",
+            "ratelimit",
+            "too many requests",
+            "502",
+            "503",
+            "504",
+            "server error",
+            "overloaded",
+        )
+    ),
+    re.IGNORECASE,
+)
+
+
+# ============================================
+# 熔断（进程内共享）
+# ============================================
+
+
+class CircuitBreaker:
+    """
+    滑动窗口熔断器（线程安全）
+
+    - closed：窗口内失败率达到 open_error_pct 且样本数不少于 min_calls 时熔断
+    - open：直接拒绝，half_open_after_ms 后进入 half-open
+    - half-open：只放行一次探测，成功恢复 closed，失败重新 open；
+      探测迟迟未回报（如被取消）时，超过 half_open_after_ms 再放行下一次
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(
+        self,
+        open_error_pct: float = 0.10,
+        half_open_after_ms: int = 15000,
+        window_sec: float = 30.0,
+        min_calls: int = 4,
+    ):
+        self.open_error_pct = open_error_pct
+        self.half_open_after = half_open_after_ms / 1000
+        self.window_sec = window_sec
+        self.min_calls = max(1, int(min_calls))
+        self._calls: deque[tuple[float, bool]] = deque()
+        self._failures = 0
+        self._state = self.CLOSED
+        self._opened_at = 0.0
+        self._probe_started_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def allow(self) -> bool:
+        """是否放行本次调用"""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.CLOSED:
+                return True
+            if self._state == self.OPEN:
+                if now - self._opened_at < self.half_open_after:
+                    return False
+                self._state = self.HALF_OPEN
+            elif (
+                self._probe_started_at is not None
+                and now - self._probe_started_at < self.half_open_after
+            ):
+                return False
+            self._probe_started_at = now
+            return True
+
+    def record(self, success: bool) -> None:
+        """回报一次调用结果"""
+        now = time.monotonic()
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._probe_started_at = None
+                if success:
+                    self._state = self.CLOSED
+                else:
+                    self._open(now)
+                return
+            if self._state == self.OPEN:
+                return
+
+            calls = self._calls
+            calls.append((now, success))
+            if not success:
+                self._failures += 1
+            expire_before = now - self.window_sec
+            while calls and calls[0][0] <= expire_before:
+                if not calls.popleft()[1]:
+                    self._failures -= 1
+            if (
+                len(calls) >= self.min_calls
+                and self._failures / len(calls) >= self.open_error_pct
+            ):
+                self._open(now)
+
+    def _open(self, now: float) -> None:
+        self._state = self.OPEN
+        self._opened_at = now
+        self._calls.clear()
+        self._failures = 0
+
 
-_ADAPTIVE_STATE_LOCK = threading.Lock()
-_ADAPTIVE_STATE_COND = threading.Condition(_ADAPTIVE_STATE_LOCK)
+# 红队质疑方（DeepSeek）故障时跨会话共享熔断状态，避免每个目标都耗尽重试
+_REDTEAM_BREAKER = CircuitBreaker()
+# 所有 Ark 调用共用：持续连接 / 限流 / 5xx 失败时快速失败，而不是逐个耗尽重试与退避。
+# 所有 Agent 共享同一账号，阈值比红队宽松，避免个别超时误熔断
+_ARK_BREAKER = CircuitBreaker(open_error_pct=0.5, min_calls=6)
 
 
 # ============================================
@@ -92,13 +234,181 @@ def _get_shared_tool_cache() -> ToolCache:
         return _SHARED_TOOL_CACHE
 
 
+_SHARED_STRUCTURAL_CACHE: Optional[StructuralCache] = None
+
+
+def _get_shared_structural_cache() -> Optional[StructuralCache]:
+    """获取进程内共享的结构化响应缓存；未启用时返回 None。"""
+    global _SHARED_STRUCTURAL_CACHE
+
+    if not settings.enable_structural_cache:
+        return None
+    with _SHARED_TOOL_CACHE_LOCK:
+        if _SHARED_STRUCTURAL_CACHE is None:
+            _SHARED_STRUCTURAL_CACHE = StructuralCache(
+                ttl_seconds=settings.structural_cache_ttl_seconds,
+                max_size=settings.structural_cache_max_size,
+            )
+        return _SHARED_STRUCTURAL_CACHE
+
+
+_SHARED_LLM_CACHE: Optional[LLMCache] = None
+
+
+def _get_shared_llm_cache() -> Optional[LLMCache]:
+    """获取进程内共享的模型响应缓存；未启用时返回 None。"""
+    global _SHARED_LLM_CACHE
+
+    if not settings.enable_llm_cache:
+        return None
+    with _SHARED_TOOL_CACHE_LOCK:
+        if _SHARED_LLM_CACHE is None:
+            _SHARED_LLM_CACHE = LLMCache(
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                max_size=settings.llm_cache_max_size,
+            )
+        return _SHARED_LLM_CACHE
+
+
+_SHARED_SQLITE_CHECKPOINTER: Optional[BaseCheckpointSaver] = None
+
+
+# 状态中以 msgpack 扩展类型写入检查点的本模块类型，显式登记后按白名单直接还原
+_CHECKPOINT_STATE_TYPES: tuple[tuple[str, str], ...] = tuple(
+    (__name__, name)
+    for name in ("AgentResult", "DebateExchange", "WorkflowPhase", "DebateType")
+)
+
+
+def _checkpoint_serde() -> Optional[JsonPlusSerializer]:
+    """
+    检查点序列化器：显式登记状态类型的 msgpack 白名单
+
+    默认的宽松模式对每个未登记类型走告警分支，且未来版本会直接拒绝还原；
+    登记后按白名单直接还原。旧版 langgraph 不支持该参数时返回 None（用默认）。
+    """
+    try:
+        return JsonPlusSerializer(allowed_msgpack_modules=_CHECKPOINT_STATE_TYPES)
+    except TypeError:
+        return None
+
+
+def _build_default_checkpointer() -> BaseCheckpointSaver:
+    """
+    默认检查点
+
+    配置了 GRAPH_CHECKPOINT_DB 且已安装 langgraph-checkpoint-sqlite 时，
+    进程内共享一个 SqliteSaver（检查点落盘，不随会话数常驻内存）；
+    否则每个引擎独立一个 MemorySaver，随引擎一起释放。
+    """
+    global _SHARED_SQLITE_CHECKPOINTER
+
+    db_path = settings.graph_checkpoint_db
+    if not db_path:
+        return MemorySaver(serde=_checkpoint_serde())
+    if importlib.util.find_spec("langgraph.checkpoint.sqlite") is None:
+        logger.warning(
+            "未安装 langgraph-checkpoint-sqlite，检查点回退为 MemorySaver"
+        )
+        return MemorySaver(serde=_checkpoint_serde())
+
+    with _SHARED_TOOL_CACHE_LOCK:
+        if _SHARED_SQLITE_CHECKPOINTER is None:
+            import sqlite3
+
+            from langgraph.checkpoint.sqlite import SqliteSaver
+
+            _SHARED_SQLITE_CHECKPOINTER = SqliteSaver(
+                sqlite3.connect(db_path, check_same_thread=False),
+                serde=_checkpoint_serde(),
+            )
+        return _SHARED_SQLITE_CHECKPOINTER
+
+
+# ============================================
+# 流式增量合并
+# ============================================
+
+class _ChunkBuffer:
+    """
+    单个 Agent 的流式输出缓冲
+
+    全文写入 StringIO（摊还 O(1) 追加、结束时一次 getvalue），
+    增量事件在源头按字符数 / 时间间隔合并后再交给 writer，
+    减少每个 token 一个事件 dict 的分配与 LangGraph 流队列开销。
+    writer 为 None 时只累积不下发。
+    """
+
+    def __init__(
+        self,
+        writer: Optional[Callable],
+        event: str,
+        agent_name: Any,
+        max_chars: int = 256,
+        max_delay_ms: int = 50,
+    ):
+        self._writer = writer
+        self._event = event
+        self._agent = agent_name
+        self._max_chars = max_chars
+        self._max_delay = max_delay_ms / 1000
+        self._buf = io.StringIO()
+        self._pending = io.StringIO()
+        self._pending_chars = 0
+        self._last_flush = time.monotonic()
+
+    def write(self, text: str) -> None:
+        self._buf.write(text)
+        if self._writer is None:
+            return
+        self._pending.write(text)
+        self._pending_chars += len(text)
+        if (
+            self._pending_chars >= self._max_chars
+            or time.monotonic() - self._last_flush >= self._max_delay
+        ):
+            self.flush()
+
+    def flush(self) -> None:
+        """下发尚未推送的增量"""
+        if self._writer is None or not self._pending_chars:
+            return
+        self._writer(
+            {
+                "event": self._event,
+                "agent": self._agent,
+                "content": self._pending.getvalue(),
+            }
+        )
+        self._pending.seek(0)
+        self._pending.truncate()
+        self._pending_chars = 0
+        self._last_flush = time.monotonic()
+
+    def getvalue(self) -> str:
+        return self._buf.getvalue()
+
+
+def _chunk_buffer(
+    writer: Optional[Callable], event: str, agent_name: Any
+) -> _ChunkBuffer:
+    """按流式合并配置创建缓冲"""
+    return _ChunkBuffer(
+        writer,
+        event,
+        agent_name,
+        max_chars=settings.stream_coalesce_max_chars,
+        max_delay_ms=settings.stream_coalesce_max_delay_ms,
+    )
+
+
 # ============================================
 # 状态定义
 # ============================================
 
 
-class WorkflowPhase(str, Enum):
-    """工作流阶段"""
+class WorkflowPhase(StrEnum):
+    """工作流阶段（成员本身即 str，可直接比较 / 序列化）"""
 
     INIT = "init"  # 初始化
     GATHER = "gather"  # 并行收集
@@ -109,16 +419,16 @@ class WorkflowPhase(str, Enum):
     ERROR = "error"  # 错误
 
 
-class DebateType(str, Enum):
-    """辩论类型"""
+class DebateType(StrEnum):
+    """辩论类型（成员本身即 str）"""
 
     PEER_REVIEW = "peer_review"  # 同行评审 (Worker 互相质疑)
     RED_TEAM = "red_team"  # 红队审查 (DeepSeek 审查所有)
 
 
-@dataclass
+@dataclass(frozen=True)
 class AgentResult:
-    """单个 Agent 的执行结果"""
+    """单个 Agent 的执行结果（构造后不可变，to_dict 结果可缓存）"""
 
     agent_name: str
     content: str
@@ -129,20 +439,26 @@ class AgentResult:
     error: Optional[str] = None
 
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "agent_name": self.agent_name,
-            "content": self.content,
-            "sources": self.sources,
-            "thinking": self.thinking,
-            "confidence": self.confidence,
-            "duration_ms": self.duration_ms,
-            "error": self.error,
-        }
+        """转为 dict（首次调用后缓存，调用方只读使用）"""
+        cached = self.__dict__.get("_dict")
+        if cached is None:
+            cached = {
+                "agent_name": self.agent_name,
+                "content": self.content,
+                "sources": self.sources,
+                "thinking": self.thinking,
+                "confidence": self.confidence,
+                "duration_ms": self.duration_ms,
+                "error": self.error,
+            }
+            # 缓存不是 dataclass 字段：checkpoint 序列化按 fields() 取值，不会带上它
+            object.__setattr__(self, "_dict", cached)
+        return cached
 
 
-@dataclass
+@dataclass(frozen=True)
 class DebateExchange:
-    """辩论交换记录"""
+    """辩论交换记录（构造后不可变，to_dict 结果可缓存）"""
 
     round_number: int
     debate_type: DebateType
@@ -154,23 +470,42 @@ class DebateExchange:
     revised: bool = False
 
     def to_dict(self) -> dict[str, Any]:
-        return {
-            "round_number": self.round_number,
-            "debate_type": self.debate_type.value,
-            "challenger": self.challenger,
-            "responder": self.responder,
-            "challenge_content": self.challenge_content,
-            "response_content": self.response_content,
-            "followup_content": self.followup_content,
-            "revised": self.revised,
-        }
+        """转为 dict（首次调用后缓存，调用方只读使用）"""
+        cached = self.__dict__.get("_dict")
+        if cached is None:
+            cached = {
+                "round_number": self.round_number,
+                "debate_type": self.debate_type,
+                "challenger": self.challenger,
+                "responder": self.responder,
+                "challenge_content": self.challenge_content,
+                "response_content": self.response_content,
+                "followup_content": self.followup_content,
+                "revised": self.revised,
+            }
+            object.__setattr__(self, "_dict", cached)
+        return cached
+
+
+def _extend_list(existing: list, new: list) -> list:
+    """
+    累积型字段的 reducer（等价于 operator.add，但空更新不复制）
+
+    不能原地 extend：LangGraph 的 checkpoint 按引用持有通道值，
+    原地修改会改写历史快照并导致后续步骤重复累积。
+    """
+    if not new:
+        return existing
+    if not existing:
+        return list(new)
+    return existing + new
 
 
 class MarketInsightState(TypedDict, total=False):
     """
     市场洞察工作流状态
 
-    使用 Annotated + operator.add 实现列表累积
+    使用 Annotated + _extend_list 实现列表累积
     """
 
     # 会话 ID
@@ -183,10 +518,10 @@ class MarketInsightState(TypedDict, total=False):
     phase: WorkflowPhase
 
     # Agent 执行结果 (累积)
-    agent_results: Annotated[list[AgentResult], operator.add]
+    agent_results: Annotated[list[AgentResult], _extend_list]
 
     # 辩论记录 (累积)
-    debate_exchanges: Annotated[list[DebateExchange], operator.add]
+    debate_exchanges: Annotated[list[DebateExchange], _extend_list]
 
     # 辩论配置
     debate_rounds: int
@@ -198,6 +533,8 @@ class MarketInsightState(TypedDict, total=False):
 
     # 是否启用联网搜索（覆盖各 Agent 默认配置）
     enable_websearch: bool
+    # 是否允许复用模型响应缓存（需同时开启 ENABLE_LLM_CACHE）
+    enable_cache: bool
 
     # 重试与降级配置
     retry_max_attempts: int
@@ -236,7 +573,10 @@ class IGraphEngine(ABC):
         pass
 
     @abstractmethod
-    def compile(self, checkpointer: Optional[MemorySaver] = None):
+    def compile(
+        self,
+        checkpointer: Union[BaseCheckpointSaver, bool, None] = None,
+    ):
         """编译状态图"""
         pass
 
@@ -253,6 +593,40 @@ class IGraphEngine(ABC):
         pass
 
 
+# ============================================
+# 共享图模板（进程内）
+# ============================================
+
+# 引擎实例经 configurable 传给节点；"__" 前缀的键不会写入检查点元数据
+_ENGINE_CONFIG_KEY = "__weave_engine"
+
+# (引擎类, 辩论轮数) -> 已编译的图模板；节点不绑定具体实例，可跨请求复用
+_SHARED_GRAPH_TEMPLATES: dict[tuple[type, int], Any] = {}
+_SHARED_GRAPH_TEMPLATES_LOCK = threading.Lock()
+
+
+def _engine_node(method_name: str) -> Callable:
+    """与实例无关的节点入口：运行时从 config 取出引擎并调用其同名方法"""
+
+    def node(state: MarketInsightState, config: RunnableConfig) -> Any:
+        engine = config["configurable"][_ENGINE_CONFIG_KEY]
+        return getattr(engine, method_name)(state)
+
+    node.__name__ = method_name
+    return node
+
+
+def _engine_agent_node(agent_name: str) -> Callable:
+    """与实例无关的 Worker 节点入口"""
+
+    def node(state: MarketInsightState, config: RunnableConfig) -> dict[str, Any]:
+        engine = config["configurable"][_ENGINE_CONFIG_KEY]
+        return engine._create_agent_node(agent_name)(state)
+
+    node.__name__ = agent_name
+    return node
+
+
 # ============================================
 # LangGraph 引擎实现
 # ============================================
@@ -322,10 +696,35 @@ class MarketInsightGraphEngine(IGraphEngine):
         self.degrade_mode = (
             degrade_mode if degrade_mode in ("skip", "partial", "fail") else "partial"
         )
+        # 初始状态模板：引擎级默认值只规范化一次，每次调用浅拷贝后覆盖请求级字段
+        # （列表等可变字段不放进模板，由 _prepare_initial_state 逐次新建）
+        self._state_defaults: dict[str, Any] = {
+            "phase": WorkflowPhase.INIT,
+            "debate_rounds": self._normalize_debate_rounds(debate_rounds),
+            "current_debate_round": 0,
+            "current_debate_type": None,
+            "enable_followup": enable_followup,
+            "enable_websearch": False,
+            "enable_cache": True,
+            "retry_max_attempts": self.retry_max_attempts,
+            "retry_backoff_ms": self.retry_backoff_ms,
+            "degrade_mode": self.degrade_mode,
+            "synthesized_report": None,
+            "error": None,
+            "completed_at": None,
+        }
         self._graph: Optional[StateGraph] = None
         self._compiled_graph = None
-        self._checkpointer: Optional[MemorySaver] = None
+        # 按辩论轮数特化的已编译图（拓扑随轮数裁剪，无运行时路由）
+        self._compiled_graphs: dict[int, Any] = {}
+        self._checkpointer: Optional[BaseCheckpointSaver] = None
         self._tool_cache = _get_shared_tool_cache()
+        self._structural_cache = _get_shared_structural_cache()
+        self._llm_cache = _get_shared_llm_cache()
+        self._worker_stagger_table = {
+            name: idx * _WORKER_STAGGER_STEP_MS
+            for idx, name in enumerate(self.WORKER_AGENTS)
+        }
         self._tool_guardrail = ToolGuardrail(
             max_estimated_cost_usd=settings.tool_guardrail_max_estimated_cost_usd,
             max_error_rate=settings.tool_guardrail_max_error_rate,
@@ -333,8 +732,19 @@ class MarketInsightGraphEngine(IGraphEngine):
             action=settings.tool_guardrail_action,
         )
         self._tool_registry = ToolRegistry(guardrail=self._tool_guardrail)
-
-    def build(self) -> StateGraph:
+        # 客户端断开等场景的取消信号：各节点在读取模型流时检查
+        self._cancel_event = threading.Event()
+        # 各线程最近一次 Ark 槽位占用时长，供 _record_ark_outcome 喂给 AIMD 控制器
+        self._slot_timing = threading.local()
+
+    def cancel(self) -> None:
+        """取消正在执行的工作流（线程安全），进行中的模型流会在下一个 chunk 处关闭"""
+        self._cancel_event.set()
+        # 唤醒仍在排队等槽位的线程，让其立即退出
+        with ADAPTIVE_STATE_COND:
+            ADAPTIVE_STATE_COND.notify_all()
+
+    def build(self, debate_rounds: Optional[int] = None) -> StateGraph:
         """
         构建市场洞察状态图
 
@@ -347,67 +757,50 @@ class MarketInsightGraphEngine(IGraphEngine):
               ↓
             gather (收集结果)
               ↓
-            debate_peer (Round 1: 同行评审)
+            debate_peer (Round 1: 同行评审，debate_rounds >= 1)
               ↓
-            debate_redteam (Round 2: 红队审查)
+            debate_redteam (Round 2: 红队审查，debate_rounds >= 2)
               ↓
             synthesizer (综合报告)
               ↓
             END
+
+        Args:
+            debate_rounds: 按该轮数特化拓扑，未用到的辩论节点不加入图；
+                None 时使用实例配置
         """
+        rounds = self._normalize_debate_rounds(
+            self.debate_rounds if debate_rounds is None else debate_rounds
+        )
         builder = StateGraph(MarketInsightState)
 
-        # 添加节点
-        builder.add_node("orchestrator", self._orchestrator_node)
-        builder.add_node(self.TREND_SCOUT, self._create_agent_node(self.TREND_SCOUT))
-        builder.add_node(
-            self.COMPETITOR_ANALYST, self._create_agent_node(self.COMPETITOR_ANALYST)
-        )
-        builder.add_node(
-            self.REGULATION_CHECKER, self._create_agent_node(self.REGULATION_CHECKER)
-        )
-        builder.add_node(
-            self.SOCIAL_SENTINEL, self._create_agent_node(self.SOCIAL_SENTINEL)
-        )
-        builder.add_node("gather", self._gather_node)
-        builder.add_node("debate_peer", self._debate_peer_node)
-        builder.add_node("debate_redteam", self._debate_redteam_node)
-        builder.add_node("synthesizer", self._synthesizer_node)
+        # 添加节点（入口不绑定 self，运行时经 config 找到引擎，编译结果可跨实例共享）
+        builder.add_node("orchestrator", _engine_node("_orchestrator_node"))
+        for agent_name in self.WORKER_AGENTS:
+            builder.add_node(agent_name, _engine_agent_node(agent_name))
+        builder.add_node("gather", _engine_node("_gather_node"))
+        if rounds >= 1:
+            builder.add_node("debate_peer", _engine_node("_debate_peer_node"))
+        if rounds >= 2:
+            builder.add_node("debate_redteam", _engine_node("_debate_redteam_node"))
+        builder.add_node("synthesizer", _engine_node("_synthesizer_node"))
 
         # 定义边
         builder.add_edge(START, "orchestrator")
 
         # orchestrator -> 并行分发到 4 个 Agent
         builder.add_conditional_edges(
-            "orchestrator", self._dispatch_to_workers, self.WORKER_AGENTS
+            "orchestrator", _engine_node("_dispatch_to_workers"), self.WORKER_AGENTS
         )
 
         # 4 个 Agent -> gather
         for agent_name in self.WORKER_AGENTS:
             builder.add_edge(agent_name, "gather")
 
-        # gather -> debate_peer / synthesizer（根据 debate_rounds 动态路由）
-        builder.add_conditional_edges(
-            "gather",
-            self._route_after_gather,
-            {
-                "debate_peer": "debate_peer",
-                "synthesizer": "synthesizer",
-            },
-        )
-
-        # debate_peer -> debate_redteam / synthesizer（根据 debate_rounds 动态路由）
-        builder.add_conditional_edges(
-            "debate_peer",
-            self._route_after_peer_debate,
-            {
-                "debate_redteam": "debate_redteam",
-                "synthesizer": "synthesizer",
-            },
-        )
-
-        # debate_redteam -> synthesizer
-        builder.add_edge("debate_redteam", "synthesizer")
+        # gather -> [debate_peer -> [debate_redteam]] -> synthesizer（轮数在构建时确定）
+        stages = ["gather", "debate_peer", "debate_redteam"][: rounds + 1]
+        for src, dst in zip(stages, stages[1:] + ["synthesizer"]):
+            builder.add_edge(src, dst)
 
         # synthesizer -> END
         builder.add_edge("synthesizer", END)
@@ -415,92 +808,137 @@ class MarketInsightGraphEngine(IGraphEngine):
         self._graph = builder
         return builder
 
-    def compile(self, checkpointer: Optional[MemorySaver] = None):
-        """编译状态图"""
-        if self._graph is None:
-            self.build()
+    def compile(
+        self,
+        checkpointer: Union[BaseCheckpointSaver, bool, None] = None,
+    ):
+        """
+        编译状态图
 
-        self._checkpointer = checkpointer or MemorySaver()
-        self._compiled_graph = self._graph.compile(checkpointer=self._checkpointer)
+        Args:
+            checkpointer: 检查点；None 使用默认（见 _build_default_checkpointer），
+                False 表示不使用检查点
+        """
+        if checkpointer is None:
+            checkpointer = _build_default_checkpointer()
+        elif checkpointer and hasattr(checkpointer, "with_allowlist"):
+            # 外部传入的严格模式检查点同样需要登记状态类型
+            checkpointer = checkpointer.with_allowlist(_CHECKPOINT_STATE_TYPES)
+        self._checkpointer = checkpointer or None
+        rounds = self._normalize_debate_rounds(self.debate_rounds)
+        self._compiled_graph = self._bind_graph(rounds)
+        self._compiled_graphs = {rounds: self._compiled_graph}
 
         logger.info("MarketInsightGraphEngine 编译完成")
 
-    def invoke(self, initial_state: dict[str, Any]) -> dict[str, Any]:
-        """同步执行工作流"""
+    def _get_graph_template(self, debate_rounds: int):
+        """取进程内共享的图模板，首次用到某个轮数时构建并编译一次"""
+        key = (type(self), debate_rounds)
+        with _SHARED_GRAPH_TEMPLATES_LOCK:
+            template = _SHARED_GRAPH_TEMPLATES.get(key)
+            if template is None:
+                template = self.build(debate_rounds).compile()
+                _SHARED_GRAPH_TEMPLATES[key] = template
+            return template
+
+    def _bind_graph(self, debate_rounds: int):
+        """
+        把共享模板绑定到本实例
+
+        只浅拷贝 Pregel 对象并替换检查点与引擎引用，
+        不重新执行 add_node / add_edge / compile。
+        """
+        template = self._get_graph_template(debate_rounds)
+        return template.with_config(configurable={_ENGINE_CONFIG_KEY: self}).copy(
+            update={"checkpointer": self._checkpointer}
+        )
+
+    def _get_compiled_graph(self, debate_rounds: int):
+        """
+        取按辩论轮数特化的已编译图
+
+        initial_state 覆盖了实例的 debate_rounds 时按需绑定一次并缓存，
+        沿用 compile() 确定的检查点。
+        """
         if self._compiled_graph is None:
             self.compile()
+        compiled = self._compiled_graphs.get(debate_rounds)
+        if compiled is None:
+            compiled = self._bind_graph(debate_rounds)
+            self._compiled_graphs[debate_rounds] = compiled
+        return compiled
 
+    def invoke(self, initial_state: dict[str, Any]) -> dict[str, Any]:
+        """同步执行工作流"""
         state = self._prepare_initial_state(initial_state)
         config = {"configurable": {"thread_id": state["session_id"]}}
+        compiled = self._get_compiled_graph(state["debate_rounds"])
 
-        try:
-            result = self._compiled_graph.invoke(state, config)
-            return result
-        except Exception as e:
-            logger.error(f"工作流执行失败: {e}")
-            raise GraphExecutionError(f"工作流执行失败: {e}")
+        with SESSION_ADMISSION.admit():
+            try:
+                result = compiled.invoke(state, config)
+                return result
+            except Exception as e:
+                logger.error(f"工作流执行失败: {e}")
+                raise GraphExecutionError(f"工作流执行失败: {e}")
 
     def stream(
         self, initial_state: dict[str, Any]
     ) -> Generator[dict[str, Any], None, None]:
         """流式执行工作流"""
-        if self._compiled_graph is None:
-            self.compile()
-
         state = self._prepare_initial_state(initial_state)
         config = {"configurable": {"thread_id": state["session_id"]}}
+        compiled = self._get_compiled_graph(state["debate_rounds"])
 
-        try:
-            for event in self._compiled_graph.stream(
-                state, config, stream_mode="custom"
-            ):
-                yield event
-        except Exception as e:
-            logger.error(f"流式执行失败: {e}")
-            yield {
-                "event": "error",
-                "error": str(e),
-                "timestamp": datetime.now().isoformat(),
-            }
+        # 准入失败直接抛出 OVERLOADED，不转成 error 事件
+        with SESSION_ADMISSION.admit():
+            try:
+                # 增量事件已在各节点的 _ChunkBuffer 中按阈值合并，这里原样透传
+                yield from compiled.stream(state, config, stream_mode="custom")
+            except Exception as e:
+                logger.error(f"流式执行失败: {e}")
+                yield {
+                    "event": "error",
+                    "error": str(e),
+                    "timestamp": datetime.now().isoformat(),
+                }
 
     def _prepare_initial_state(
         self, initial_state: dict[str, Any]
     ) -> MarketInsightState:
-        """准备初始状态"""
-        debate_rounds = self._normalize_debate_rounds(
-            initial_state.get("debate_rounds", self.debate_rounds)
-        )
-        retry_max_attempts = max(
-            1, int(initial_state.get("retry_max_attempts", self.retry_max_attempts))
+        """准备初始状态（未覆盖的字段直接取自预先规范化的模板）"""
+        state = self._state_defaults.copy()
+        state["session_id"] = (
+            initial_state["session_id"]
+            if "session_id" in initial_state
+            else str(uuid.uuid4())
         )
-        retry_backoff_ms = max(
-            0, int(initial_state.get("retry_backoff_ms", self.retry_backoff_ms))
-        )
-        degrade_mode = self._resolve_degrade_mode(
-            initial_state.get("degrade_mode", self.degrade_mode)
-        )
-
-        return {
-            "session_id": initial_state.get("session_id", str(uuid.uuid4())),
-            "user_profile": initial_state.get("user_profile", {}),
-            "phase": WorkflowPhase.INIT,
-            "agent_results": [],
-            "debate_exchanges": [],
-            "debate_rounds": debate_rounds,
-            "current_debate_round": 0,
-            "current_debate_type": None,
-            "enable_followup": initial_state.get(
-                "enable_followup", self.enable_followup
-            ),
-            "enable_websearch": initial_state.get("enable_websearch", False),
-            "retry_max_attempts": retry_max_attempts,
-            "retry_backoff_ms": retry_backoff_ms,
-            "degrade_mode": degrade_mode,
-            "synthesized_report": None,
-            "error": None,
-            "started_at": datetime.now(),
-            "completed_at": None,
-        }
+        state["user_profile"] = initial_state.get("user_profile", {})
+        state["agent_results"] = []
+        state["debate_exchanges"] = []
+        state["started_at"] = datetime.now()
+
+        if "debate_rounds" in initial_state:
+            state["debate_rounds"] = self._normalize_debate_rounds(
+                initial_state["debate_rounds"]
+            )
+        if "retry_max_attempts" in initial_state:
+            state["retry_max_attempts"] = max(
+                1, int(initial_state["retry_max_attempts"])
+            )
+        if "retry_backoff_ms" in initial_state:
+            state["retry_backoff_ms"] = max(0, int(initial_state["retry_backoff_ms"]))
+        if "degrade_mode" in initial_state:
+            state["degrade_mode"] = self._resolve_degrade_mode(
+                initial_state["degrade_mode"]
+            )
+        if "enable_followup" in initial_state:
+            state["enable_followup"] = initial_state["enable_followup"]
+        if "enable_websearch" in initial_state:
+            state["enable_websearch"] = initial_state["enable_websearch"]
+        if "enable_cache" in initial_state:
+            state["enable_cache"] = bool(initial_state["enable_cache"])
+        return state
 
     def _normalize_debate_rounds(self, value: Any) -> int:
         """将辩论轮数标准化到可执行范围。"""
@@ -544,33 +982,29 @@ class MarketInsightGraphEngine(IGraphEngine):
             }
         )
 
-    def _compute_backoff_ms(
-        self, base_ms: int, attempt: int, jitter_key: Optional[str] = None
-    ) -> int:
-        """计算指数退避时延，并按 key 注入稳定抖动避免并发同频重试。"""
+    def _compute_backoff_ms(self, base_ms: int, attempt: int) -> int:
+        """
+        计算重试退避时延（指数上限 + 全抖动）
+
+        在 [0, min(上限, base_ms * 2^(attempt-1))] 内均匀取值：不同会话中的
+        同一 Agent 不会同频醒来再次打满配额，AIMD 也不至于被连续 429 压在下限。
+        """
         if base_ms <= 0:
             return 0
 
-        delay_ms = base_ms * (2 ** max(0, attempt - 1))
-        if jitter_key:
-            token = f"{jitter_key}:{attempt}".encode("utf-8")
-            jitter_bucket = sum(token) % 41  # 0~40%
-            delay_ms += int(base_ms * (jitter_bucket / 100))
-        return delay_ms
+        ceiling_ms = min(_RETRY_BACKOFF_CAP_MS, base_ms * (2 ** max(0, attempt - 1)))
+        return int(random.uniform(0, ceiling_ms))
 
     def _sleep_backoff(self, delay_ms: int) -> None:
         """按计算后的时延休眠。"""
         if delay_ms <= 0:
             return
-        time.sleep(delay_ms / 1000)
+        # 可被 cancel() 提前唤醒
+        self._cancel_event.wait(delay_ms / 1000)
 
     def _worker_stagger_ms(self, agent_name: str) -> int:
         """Worker 启动抖动：保持 4 并发但错峰发起首包请求。"""
-        try:
-            idx = self.WORKER_AGENTS.index(agent_name)
-        except ValueError:
-            return 0
-        return idx * 120
+        return self._worker_stagger_table.get(agent_name, 0)
 
     def _build_prompt_hash(self, messages: list[dict[str, Any]]) -> str:
         parts: list[str] = []
@@ -613,43 +1047,68 @@ class MarketInsightGraphEngine(IGraphEngine):
         }
 
     def _is_connection_like_error(self, error: Optional[str]) -> bool:
-        """判断是否属于连接波动类错误。"""
+        """判断是否属于连接波动 / 限流 / 服务端过载类错误。"""
         if not error:
             return False
-        text = error.lower()
-        keywords = (
-            "connection error",
-            "request timed out",
-            "timeout",
-            "connect",
-            "network",
-            "ssl",
-            "tls",
-        )
-        return any(k in text for k in keywords)
+        return _CONNECTION_LIKE_ERROR_RE.search(error) is not None
 
     def _current_adaptive_limit(self) -> int:
         """读取当前并发上限。"""
-        with _ADAPTIVE_STATE_LOCK:
-            return _ADAPTIVE_CONCURRENCY_LIMIT
+        with ADAPTIVE_STATE_LOCK:
+            return ADAPTIVE_LIMITER.current()
 
     @contextmanager
-    def _acquire_ark_slot(self) -> Generator[int, None, None]:
-        """获取 Ark 调用并发槽位，支持动态从 4 降到 2。"""
+    def _acquire_ark_slot(
+        self, messages: Optional[list[dict[str, Any]]] = None
+    ) -> Generator[int, None, None]:
+        """
+        获取 Ark 调用并发槽位，上限由 AIMD 控制器动态调整。
+
+        Args:
+            messages: 本次调用的消息，配置了 TPM 配额时用于预估 token 数
+        """
         global _ADAPTIVE_INFLIGHT_CALLS
 
-        with _ADAPTIVE_STATE_COND:
-            while _ADAPTIVE_INFLIGHT_CALLS >= _ADAPTIVE_CONCURRENCY_LIMIT:
-                _ADAPTIVE_STATE_COND.wait(timeout=0.2)
+        if not _ARK_BREAKER.allow():
+            raise CircuitOpenError(
+                details={"retry_after_ms": int(_ARK_BREAKER.half_open_after * 1000)}
+            )
+
+        expected_tokens = (
+            estimate_tokens(messages) if messages and ARK_RATE_WINDOW.tpm_limit else 0
+        )
+
+        with ADAPTIVE_STATE_COND:
+            while True:
+                if self._cancel_event.is_set():
+                    # 把可能收到的唤醒让给下一个等待者
+                    ADAPTIVE_STATE_COND.notify()
+                    raise RequestCancelledError()
+                # 槽位已满时等待释放通知；retry-after 暂停或 RPM / TPM 窗口已满时
+                # 按剩余时长精确等待（wait 期间释放锁）
+                now = time.monotonic()
+                if ADAPTIVE_LIMITER.is_blocked(now):
+                    wait_sec = ADAPTIVE_LIMITER.blocked_until - now
+                elif _ADAPTIVE_INFLIGHT_CALLS >= ADAPTIVE_LIMITER.current():
+                    wait_sec = _ADAPTIVE_WAIT_CAP_SEC
+                else:
+                    wait_sec = ARK_RATE_WINDOW.wait_time(expected_tokens, now)
+                    if wait_sec <= 0:
+                        break
+                ADAPTIVE_STATE_COND.wait(timeout=min(wait_sec, _ADAPTIVE_WAIT_CAP_SEC))
+            ARK_RATE_WINDOW.record(expected_tokens)
             _ADAPTIVE_INFLIGHT_CALLS += 1
-            current_limit = _ADAPTIVE_CONCURRENCY_LIMIT
+            current_limit = ADAPTIVE_LIMITER.current()
 
+        started_at = time.monotonic()
         try:
             yield current_limit
         finally:
-            with _ADAPTIVE_STATE_COND:
+            self._slot_timing.latency_ms = (time.monotonic() - started_at) * 1000
+            with ADAPTIVE_STATE_COND:
                 _ADAPTIVE_INFLIGHT_CALLS = max(0, _ADAPTIVE_INFLIGHT_CALLS - 1)
-                _ADAPTIVE_STATE_COND.notify_all()
+                # 只空出一个槽位，唤醒一个等待者即可，避免所有线程争抢同一把锁
+                ADAPTIVE_STATE_COND.notify()
 
     def _record_ark_outcome(
         self,
@@ -658,50 +1117,45 @@ class MarketInsightGraphEngine(IGraphEngine):
         error: Optional[str],
         writer: Optional[Callable] = None,
     ) -> None:
-        """记录 Ark 调用结果，并在必要时触发并发自适应降载/恢复。"""
-        global _ADAPTIVE_CONCURRENCY_LIMIT
-        global _ADAPTIVE_CONN_FAIL_STREAK
-        global _ADAPTIVE_SUCCESS_STREAK
-        global _ADAPTIVE_RECOVER_AFTER_TS
+        """记录 Ark 调用结果，驱动 AIMD 并发上限的加性增 / 乘性减。"""
+        # 取走本线程最近一次槽位占用时长；缓存命中等未占槽位的成功不计入延迟样本
+        latency_ms = getattr(self._slot_timing, "latency_ms", None)
+        self._slot_timing.latency_ms = None
 
-        changed_to: Optional[int] = None
-        now_ts = time.time()
-
-        with _ADAPTIVE_STATE_COND:
+        mode: Optional[str] = None
+        with ADAPTIVE_STATE_COND:
             if success:
-                _ADAPTIVE_CONN_FAIL_STREAK = 0
-                _ADAPTIVE_SUCCESS_STREAK += 1
-
-                should_recover = (
-                    _ADAPTIVE_CONCURRENCY_LIMIT == _ADAPTIVE_REDUCED_LIMIT
-                    and now_ts >= _ADAPTIVE_RECOVER_AFTER_TS
-                    and _ADAPTIVE_SUCCESS_STREAK >= _ADAPTIVE_RECOVERY_SUCCESS_STREAK
-                )
-                if should_recover:
-                    _ADAPTIVE_CONCURRENCY_LIMIT = _ADAPTIVE_DEFAULT_LIMIT
-                    changed_to = _ADAPTIVE_DEFAULT_LIMIT
-                    _ADAPTIVE_SUCCESS_STREAK = 0
-                    _ADAPTIVE_STATE_COND.notify_all()
-            else:
-                _ADAPTIVE_SUCCESS_STREAK = 0
-                if self._is_connection_like_error(error):
-                    _ADAPTIVE_CONN_FAIL_STREAK += 1
-                    should_reduce = (
-                        _ADAPTIVE_CONCURRENCY_LIMIT == _ADAPTIVE_DEFAULT_LIMIT
-                        and _ADAPTIVE_CONN_FAIL_STREAK >= _ADAPTIVE_FAIL_THRESHOLD
+                limit_before = ADAPTIVE_LIMITER.current()
+                if ADAPTIVE_LIMITER.on_success(latency_ms):
+                    mode = "recovered"
+                    # 上限增加几个槽位就唤醒几个等待者，避免惊群
+                    ADAPTIVE_STATE_COND.notify(
+                        ADAPTIVE_LIMITER.current() - limit_before
                     )
-                    if should_reduce:
-                        _ADAPTIVE_CONCURRENCY_LIMIT = _ADAPTIVE_REDUCED_LIMIT
-                        _ADAPTIVE_RECOVER_AFTER_TS = (
-                            now_ts + _ADAPTIVE_REDUCED_WINDOW_SEC
-                        )
-                        changed_to = _ADAPTIVE_REDUCED_LIMIT
-                        _ADAPTIVE_STATE_COND.notify_all()
-                else:
-                    _ADAPTIVE_CONN_FAIL_STREAK = 0
+            elif self._is_connection_like_error(error):
+                if ADAPTIVE_LIMITER.on_overload():
+                    mode = "degraded"
+            changed_to = ADAPTIVE_LIMITER.current()
+
+        # 只有真正占用过槽位的调用计入熔断；缓存命中与熔断拒绝不计
+        if latency_ms is not None:
+            breaker_before = _ARK_BREAKER.state
+            _ARK_BREAKER.record(
+                success=success or not self._is_connection_like_error(error)
+            )
+            breaker_after = _ARK_BREAKER.state
+            if breaker_after != breaker_before and writer:
+                writer(
+                    {
+                        "event": "circuit_breaker",
+                        "breaker": "ark",
+                        "state": breaker_after,
+                        "reason": error or "probe_succeeded",
+                        "timestamp": datetime.now().isoformat(),
+                    }
+                )
 
-        if changed_to and writer:
-            mode = "degraded" if changed_to == _ADAPTIVE_REDUCED_LIMIT else "recovered"
+        if mode and writer:
             writer(
                 {
                     "event": "adaptive_concurrency",
@@ -712,16 +1166,6 @@ class MarketInsightGraphEngine(IGraphEngine):
                 }
             )
 
-    def _route_after_gather(self, state: MarketInsightState) -> str:
-        """gather 后路由：0 轮直达综合，其它进入同行评审。"""
-        rounds = self._normalize_debate_rounds(state.get("debate_rounds", 0))
-        return "synthesizer" if rounds <= 0 else "debate_peer"
-
-    def _route_after_peer_debate(self, state: MarketInsightState) -> str:
-        """同行评审后路由：1 轮直达综合，2 轮进入红队。"""
-        rounds = self._normalize_debate_rounds(state.get("debate_rounds", 0))
-        return "synthesizer" if rounds <= 1 else "debate_redteam"
-
     # ============================================
     # 节点实现
     # ============================================
@@ -753,7 +1197,7 @@ class MarketInsightGraphEngine(IGraphEngine):
 
         def agent_node(state: MarketInsightState) -> dict[str, Any]:
             writer = get_stream_writer()
-            start_time = time.time()
+            start_time = time.monotonic()
             max_attempts = max(1, int(state.get("retry_max_attempts", 1)))
             backoff_ms = max(0, int(state.get("retry_backoff_ms", 0)))
             forced_thinking_mode = ThinkingMode.ENABLED
@@ -779,9 +1223,10 @@ class MarketInsightGraphEngine(IGraphEngine):
             for attempt in range(1, max_attempts + 1):
                 active_invocation_id: Optional[str] = None
                 sources: list[str] = []
+                seen_sources: set[str] = set()
+                content_buf = _chunk_buffer(writer, "agent_chunk", agent_name)
+                thinking_buf = _chunk_buffer(writer, "agent_thinking", agent_name)
                 try:
-                    thinking_parts: list[str] = []
-
                     if self.agent_factory:
                         agent = self.agent_factory(agent_name)
                         session_id = str(state.get("session_id") or "")
@@ -789,7 +1234,9 @@ class MarketInsightGraphEngine(IGraphEngine):
                         requested_websearch = bool(
                             getattr(agent, "use_websearch", False)
                         ) and bool(state.get("enable_websearch", False))
-                        agent.use_websearch = (
+                        # 本会话的联网决策只保存在局部变量，不回写 Agent 实例
+                        # （自定义工厂可能跨会话 / 线程返回同一实例）
+                        effective_websearch = (
                             self._tool_registry.should_enable_websearch(
                                 session_id=session_id,
                                 requested=requested_websearch,
@@ -805,8 +1252,6 @@ class MarketInsightGraphEngine(IGraphEngine):
                             debate_round=state.get("current_debate_round", 0),
                         )
 
-                        content_parts: list[str] = []
-
                         from core.ark_client import StreamEventType
 
                         messages = [
@@ -821,11 +1266,14 @@ class MarketInsightGraphEngine(IGraphEngine):
                         tool_input_payload = self._make_tool_input_payload(
                             prompt_hash=prompt_hash,
                             debate_round=debate_round,
-                            enable_websearch=bool(agent.use_websearch),
+                            enable_websearch=effective_websearch,
                         )
 
                         cache_key: Optional[str] = None
-                        if agent.use_websearch:
+                        structural_key: Optional[str] = None
+                        llm_cache_key: Optional[str] = None
+                        cached: Any = None
+                        if effective_websearch:
                             cache_key = self._build_tool_cache_key(
                                 agent_name=agent_name,
                                 model=str(agent.model),
@@ -834,6 +1282,18 @@ class MarketInsightGraphEngine(IGraphEngine):
                                 enable_websearch=True,
                             )
                             cached = self._tool_cache.get(cache_key)
+                            if self._structural_cache is not None:
+                                # 提示词未逐字命中时，按归一化画像槽位再查一次
+                                structural_key = StructuralCache.build_key(
+                                    agent_name=agent_name,
+                                    model=str(agent.model),
+                                    template_version=settings.prompt_template_version,
+                                    profile=state.get("user_profile"),
+                                    debate_round=debate_round,
+                                    enable_websearch=True,
+                                )
+                                if not isinstance(cached, dict):
+                                    cached = self._structural_cache.get(structural_key)
                             if isinstance(cached, dict):
                                 active_invocation_id = (
                                     self._tool_registry.begin_invocation(
@@ -865,61 +1325,62 @@ class MarketInsightGraphEngine(IGraphEngine):
                                 )
                                 active_invocation_id = None
                                 for source in end_result.get("sources", []):
-                                    if source not in sources:
+                                    if source not in seen_sources:
+                                        seen_sources.add(source)
                                         sources.append(source)
+                        elif self._llm_cache is not None and state.get(
+                            "enable_cache", True
+                        ):
+                            llm_cache_key = LLMCache.build_key(
+                                model=str(agent.model),
+                                messages=messages,
+                                thinking_mode=forced_thinking_mode.value,
+                                use_websearch=False,
+                                websearch_limit=agent.websearch_limit,
+                            )
+                            cached = self._llm_cache.get(llm_cache_key)
+                            if isinstance(cached, dict):
+                                self._emit_llm_cache_hit(writer, agent_name, "worker")
+
+                        if isinstance(cached, dict):
+                            cached_content = str(cached.get("content") or "")
+                            cached_thinking = cached.get("thinking")
+                            if cached_content:
+                                content_buf.write(cached_content)
+                                content_buf.flush()
+                            if isinstance(cached_thinking, str) and cached_thinking:
+                                thinking_buf.write(cached_thinking)
+                                thinking_buf.flush()
+
+                            content = content_buf.getvalue()
+                            content = agent.post_process(content, context)
+                            duration_ms = int((time.monotonic() - start_time) * 1000)
+                            self._record_ark_outcome(
+                                success=True,
+                                error=None,
+                                writer=writer,
+                            )
+                            result = AgentResult(
+                                agent_name=agent_name,
+                                content=content,
+                                thinking=thinking_buf.getvalue() or None,
+                                sources=sources,
+                                duration_ms=duration_ms,
+                            )
+                            writer(
+                                {
+                                    "event": "agent_end",
+                                    "agent": agent_name,
+                                    "status": "completed",
+                                    "duration_ms": duration_ms,
+                                    "sources": list(sources),
+                                    "attempt": attempt,
+                                    "timestamp": datetime.now().isoformat(),
+                                }
+                            )
+                            return {"agent_results": [result]}
 
-                                cached_content = str(cached.get("content") or "")
-                                cached_thinking = cached.get("thinking")
-                                if cached_content:
-                                    writer(
-                                        {
-                                            "event": "agent_chunk",
-                                            "agent": agent_name,
-                                            "content": cached_content,
-                                        }
-                                    )
-                                    content_parts.append(cached_content)
-                                if isinstance(cached_thinking, str) and cached_thinking:
-                                    writer(
-                                        {
-                                            "event": "agent_thinking",
-                                            "agent": agent_name,
-                                            "content": cached_thinking,
-                                        }
-                                    )
-                                    thinking_parts.append(cached_thinking)
-
-                                content = "".join(content_parts)
-                                content = agent.post_process(content, context)
-                                duration_ms = int((time.time() - start_time) * 1000)
-                                self._record_ark_outcome(
-                                    success=True,
-                                    error=None,
-                                    writer=writer,
-                                )
-                                result = AgentResult(
-                                    agent_name=agent_name,
-                                    content=content,
-                                    thinking="".join(thinking_parts)
-                                    if thinking_parts
-                                    else None,
-                                    sources=sources,
-                                    duration_ms=duration_ms,
-                                )
-                                writer(
-                                    {
-                                        "event": "agent_end",
-                                        "agent": agent_name,
-                                        "status": "completed",
-                                        "duration_ms": duration_ms,
-                                        "sources": list(dict.fromkeys(sources)),
-                                        "attempt": attempt,
-                                        "timestamp": datetime.now().isoformat(),
-                                    }
-                                )
-                                return {"agent_results": [result]}
-
-                        with self._acquire_ark_slot() as slot_limit:
+                        with self._acquire_ark_slot(messages) as slot_limit:
                             if slot_limit < len(self.WORKER_AGENTS):
                                 writer(
                                     {
@@ -934,35 +1395,27 @@ class MarketInsightGraphEngine(IGraphEngine):
                             for event in agent.ark_client.create_response_stream_v2(
                                 messages=messages,
                                 model=agent.model,
-                                use_websearch=agent.use_websearch,
+                                use_websearch=effective_websearch,
                                 websearch_limit=agent.websearch_limit,
                                 thinking_mode=forced_thinking_mode,
+                                cancel_event=self._cancel_event,
                             ):
                                 if (
-                                    event.type == StreamEventType.OUTPUT_DELTA
+                                    event.type is StreamEventType.OUTPUT_DELTA
                                     and event.content
                                 ):
-                                    writer(
-                                        {
-                                            "event": "agent_chunk",
-                                            "agent": agent_name,
-                                            "content": event.content,
-                                        }
-                                    )
-                                    content_parts.append(event.content)
+                                    # 增量类型切换时先下发另一侧，保持思考 / 正文的先后顺序
+                                    thinking_buf.flush()
+                                    content_buf.write(event.content)
                                 elif (
-                                    event.type == StreamEventType.THINKING_DELTA
+                                    event.type is StreamEventType.THINKING_DELTA
                                     and event.content
                                 ):
-                                    writer(
-                                        {
-                                            "event": "agent_thinking",
-                                            "agent": agent_name,
-                                            "content": event.content,
-                                        }
-                                    )
-                                    thinking_parts.append(event.content)
-                                elif event.type == StreamEventType.SEARCH_START:
+                                    content_buf.flush()
+                                    thinking_buf.write(event.content)
+                                elif event.type is StreamEventType.SEARCH_START:
+                                    thinking_buf.flush()
+                                    content_buf.flush()
                                     active_invocation_id = (
                                         self._tool_registry.begin_invocation(
                                             writer=writer,
@@ -975,7 +1428,9 @@ class MarketInsightGraphEngine(IGraphEngine):
                                             cache_hit=False,
                                         )
                                     )
-                                elif event.type == StreamEventType.SEARCH_COMPLETE:
+                                elif event.type is StreamEventType.SEARCH_COMPLETE:
+                                    thinking_buf.flush()
+                                    content_buf.flush()
                                     meta = event.metadata or {}
                                     if not active_invocation_id:
                                         active_invocation_id = (
@@ -1005,9 +1460,10 @@ class MarketInsightGraphEngine(IGraphEngine):
                                     )
                                     active_invocation_id = None
                                     for source in end_result.get("sources", []):
-                                        if source not in sources:
+                                        if source not in seen_sources:
+                                            seen_sources.add(source)
                                             sources.append(source)
-                                elif event.type == StreamEventType.RESPONSE_COMPLETE:
+                                elif event.type is StreamEventType.RESPONSE_COMPLETE:
                                     meta = event.metadata or {}
                                     final_sources = meta.get("sources")
                                     if isinstance(final_sources, list):
@@ -1015,21 +1471,31 @@ class MarketInsightGraphEngine(IGraphEngine):
                                             if (
                                                 isinstance(source, str)
                                                 and source
-                                                and source not in sources
+                                                and source not in seen_sources
                                             ):
+                                                seen_sources.add(source)
                                                 sources.append(source)
 
-                        content = "".join(content_parts)
+                        thinking_buf.flush()
+                        content_buf.flush()
+                        content = content_buf.getvalue()
                         content = agent.post_process(content, context)
 
-                        if agent.use_websearch and cache_key and content:
-                            self._tool_cache.set(
-                                cache_key,
+                        if effective_websearch and cache_key and content:
+                            cached_value = {
+                                "content": content,
+                                "thinking": thinking_buf.getvalue() or None,
+                                "sources": copy.deepcopy(sources),
+                            }
+                            self._tool_cache.set(cache_key, cached_value)
+                            if structural_key:
+                                self._structural_cache.set(structural_key, cached_value)
+                        elif llm_cache_key and content:
+                            self._llm_cache.set(
+                                llm_cache_key,
                                 {
                                     "content": content,
-                                    "thinking": "".join(thinking_parts)
-                                    if thinking_parts
-                                    else None,
+                                    "thinking": thinking_buf.getvalue() or None,
                                     "sources": copy.deepcopy(sources),
                                 },
                             )
@@ -1043,13 +1509,13 @@ class MarketInsightGraphEngine(IGraphEngine):
                         )
                         content = f"[{agent_name}] 模拟输出 - 市场: {target_market} / 品类: {supply_chain}"
 
-                    duration_ms = int((time.time() - start_time) * 1000)
+                    duration_ms = int((time.monotonic() - start_time) * 1000)
                     self._record_ark_outcome(success=True, error=None, writer=writer)
 
                     result = AgentResult(
                         agent_name=agent_name,
                         content=content,
-                        thinking="".join(thinking_parts) if thinking_parts else None,
+                        thinking=thinking_buf.getvalue() or None,
                         sources=sources,
                         duration_ms=duration_ms,
                     )
@@ -1060,7 +1526,7 @@ class MarketInsightGraphEngine(IGraphEngine):
                             "agent": agent_name,
                             "status": "completed",
                             "duration_ms": duration_ms,
-                            "sources": list(dict.fromkeys(sources)),
+                            "sources": list(sources),
                             "attempt": attempt,
                             "timestamp": datetime.now().isoformat(),
                         }
@@ -1068,7 +1534,12 @@ class MarketInsightGraphEngine(IGraphEngine):
 
                     return {"agent_results": [result]}
 
+                except RequestCancelledError:
+                    raise
                 except Exception as e:
+                    # 已收到的增量先于错误 / 重试事件下发
+                    thinking_buf.flush()
+                    content_buf.flush()
                     if active_invocation_id:
                         try:
                             self._tool_registry.error_invocation(
@@ -1082,10 +1553,9 @@ class MarketInsightGraphEngine(IGraphEngine):
                     self._record_ark_outcome(
                         success=False, error=last_error, writer=writer
                     )
-                    if attempt < max_attempts:
-                        delay_ms = self._compute_backoff_ms(
-                            backoff_ms, attempt, jitter_key=agent_name
-                        )
+                    # 熔断期内重试必然再次被拒，直接进入降级
+                    if attempt < max_attempts and not isinstance(e, CircuitOpenError):
+                        delay_ms = self._compute_backoff_ms(backoff_ms, attempt)
                         self._emit_retry_event(
                             writer=writer,
                             target_type="agent",
@@ -1098,7 +1568,9 @@ class MarketInsightGraphEngine(IGraphEngine):
                         self._sleep_backoff(delay_ms)
                         continue
 
-                    duration_ms = int((time.time() - start_time) * 1000)
+                    duration_ms = int((time.monotonic() - start_time) * 1000)
+                    # 同一批紧邻下发的事件共用一个时间戳
+                    now_iso = datetime.now().isoformat()
 
                     writer(
                         {
@@ -1108,7 +1580,7 @@ class MarketInsightGraphEngine(IGraphEngine):
                             "duration_ms": duration_ms,
                             "attempt": attempt,
                             "degrade_mode": degrade_mode,
-                            "timestamp": datetime.now().isoformat(),
+                            "timestamp": now_iso,
                         }
                     )
 
@@ -1126,9 +1598,9 @@ class MarketInsightGraphEngine(IGraphEngine):
                                 "agent": agent_name,
                                 "status": "skipped",
                                 "duration_ms": duration_ms,
-                                "sources": list(dict.fromkeys(sources)),
+                                "sources": list(sources),
                                 "attempt": attempt,
-                                "timestamp": datetime.now().isoformat(),
+                                "timestamp": now_iso,
                             }
                         )
                         return {}
@@ -1152,7 +1624,7 @@ class MarketInsightGraphEngine(IGraphEngine):
                         agent_name=agent_name,
                         content="",
                         error=last_error or "unknown_error",
-                        duration_ms=int((time.time() - start_time) * 1000),
+                        duration_ms=int((time.monotonic() - start_time) * 1000),
                     )
                 ]
             }
@@ -1207,25 +1679,18 @@ class MarketInsightGraphEngine(IGraphEngine):
 
         logger.info("开始 Round 1: 同行评审")
 
-        exchanges = []
-        results_map = {r.agent_name: r for r in state.get("agent_results", [])}
-
-        for pair in DEBATE_PEER_PAIRS:
-            agent_a, agent_b = pair
-
-            # 双向质疑
-            for challenger, responder in [(agent_a, agent_b), (agent_b, agent_a)]:
-                exchange = self._execute_debate_exchange(
-                    state=state,
-                    writer=writer,
-                    round_number=1,
-                    debate_type=DebateType.PEER_REVIEW,
-                    challenger=challenger,
-                    responder=responder,
-                    results_map=results_map,
-                )
-                if exchange:
-                    exchanges.append(exchange)
+        # 每个配对双向质疑，各交换互不依赖，并发执行
+        exchanges = self._run_debate_exchanges(
+            state=state,
+            writer=writer,
+            round_number=1,
+            debate_type=DebateType.PEER_REVIEW,
+            matchups=[
+                matchup
+                for agent_a, agent_b in DEBATE_PEER_PAIRS
+                for matchup in ((agent_a, agent_b), (agent_b, agent_a))
+            ],
+        )
 
         writer(
             {
@@ -1266,21 +1731,16 @@ class MarketInsightGraphEngine(IGraphEngine):
 
         logger.info("开始 Round 2: 红队审查")
 
-        exchanges = []
-        results_map = {r.agent_name: r for r in state.get("agent_results", [])}
-
-        for target_agent in DEBATE_REDTEAM_TARGETS:
-            exchange = self._execute_debate_exchange(
-                state=state,
-                writer=writer,
-                round_number=2,
-                debate_type=DebateType.RED_TEAM,
-                challenger=AGENT_DEBATE_CHALLENGER,
-                responder=target_agent,
-                results_map=results_map,
-            )
-            if exchange:
-                exchanges.append(exchange)
+        exchanges = self._run_debate_exchanges(
+            state=state,
+            writer=writer,
+            round_number=2,
+            debate_type=DebateType.RED_TEAM,
+            matchups=[
+                (AGENT_DEBATE_CHALLENGER, target_agent)
+                for target_agent in DEBATE_REDTEAM_TARGETS
+            ],
+        )
 
         writer(
             {
@@ -1299,6 +1759,81 @@ class MarketInsightGraphEngine(IGraphEngine):
             "phase": WorkflowPhase.SYNTHESIZE,
         }
 
+    def _run_debate_exchanges(
+        self,
+        *,
+        state: MarketInsightState,
+        writer: Callable,
+        round_number: int,
+        debate_type: DebateType,
+        matchups: list[tuple[str, str]],
+    ) -> list[DebateExchange]:
+        """
+        并发执行同一轮的全部辩论交换
+
+        各交换只读取 Worker 结果、互不依赖，整轮耗时取决于最慢的一组；
+        实际在途的模型调用数仍由 Ark 并发槽位约束。结果按 matchups 顺序返回，
+        degrade_mode=fail 时重新抛出第一个失败。
+        """
+        results_map = {r.agent_name: r for r in state.get("agent_results", [])}
+        # 扇出前在调用线程里为每个交换准备独立的 Agent 实例，
+        # 红队目标等单次调用状态不会在并发交换之间串用
+        exchange_agents = (
+            self._create_exchange_agents(matchups, debate_type)
+            if self.agent_factory
+            else [None] * len(matchups)
+        )
+
+        def run(
+            matchup: tuple[str, str], agents: Optional[tuple[Any, Any]]
+        ) -> Optional[DebateExchange]:
+            challenger, responder = matchup
+            return self._execute_debate_exchange(
+                state=state,
+                writer=writer,
+                round_number=round_number,
+                debate_type=debate_type,
+                challenger=challenger,
+                responder=responder,
+                results_map=results_map,
+                exchange_agents=agents,
+            )
+
+        if not self.agent_factory or len(matchups) <= 1:
+            # 占位结果无模型调用，不必开线程
+            outcomes = [run(*item) for item in zip(matchups, exchange_agents)]
+        else:
+            with ContextThreadPoolExecutor(max_workers=len(matchups)) as pool:
+                outcomes = list(pool.map(run, matchups, exchange_agents))
+        return [exchange for exchange in outcomes if exchange]
+
+    def _create_exchange_agents(
+        self, matchups: list[tuple[str, str]], debate_type: DebateType
+    ) -> list[tuple[Any, Any]]:
+        """
+        为每个辩论交换创建 (质疑方, 回应方) Agent
+
+        自定义 agent_factory 可能对同名 Agent 返回同一实例；
+        已分配给其他交换的实例做浅拷贝，保证每个交换独占自己的 Agent。
+        """
+        claimed: set[int] = set()
+
+        def own(agent_name: str) -> Any:
+            agent = self.agent_factory(agent_name)
+            if id(agent) in claimed:
+                agent = copy.copy(agent)
+            claimed.add(id(agent))
+            return agent
+
+        agents: list[tuple[Any, Any]] = []
+        for challenger, responder in matchups:
+            if debate_type is DebateType.PEER_REVIEW:
+                challenge_agent = own(challenger)
+            else:
+                challenge_agent = own(AGENT_DEBATE_CHALLENGER)
+            agents.append((challenge_agent, own(responder)))
+        return agents
+
     def _execute_debate_exchange(
         self,
         state: MarketInsightState,
@@ -1308,11 +1843,15 @@ class MarketInsightGraphEngine(IGraphEngine):
         challenger: str,
         responder: str,
         results_map: dict[str, AgentResult],
+        exchange_agents: Optional[tuple[Any, Any]] = None,
     ) -> Optional[DebateExchange]:
         """
         执行单次辩论交换
 
         流程：质疑 → 回应 → (可选) 确认/追问
+
+        exchange_agents 为本交换独占的 (质疑方, 回应方) Agent；
+        不传时按需从 agent_factory 创建。
         """
         if not self.agent_factory:
             # 无 agent_factory 时返回占位结果
@@ -1332,8 +1871,23 @@ class MarketInsightGraphEngine(IGraphEngine):
         max_attempts = max(1, int(state.get("retry_max_attempts", 1)))
         backoff_ms = max(0, int(state.get("retry_backoff_ms", 0)))
         degrade_mode = self._resolve_degrade_mode(state.get("degrade_mode", "partial"))
+        breaker = _REDTEAM_BREAKER if debate_type is DebateType.RED_TEAM else None
+        if exchange_agents is None:
+            exchange_agents = self._create_exchange_agents(
+                [(challenger, responder)], debate_type
+            )[0]
+        challenge_agent, responder_agent = exchange_agents
 
         for attempt in range(1, max_attempts + 1):
+            if breaker is not None and not breaker.allow():
+                return self._circuit_open_exchange(
+                    writer=writer,
+                    round_number=round_number,
+                    debate_type=debate_type,
+                    challenger=challenger,
+                    responder=responder,
+                    degrade_mode=degrade_mode,
+                )
             try:
                 from agents.debate import ChallengerAgent
 
@@ -1341,6 +1895,9 @@ class MarketInsightGraphEngine(IGraphEngine):
                 responder_result = results_map.get(responder)
                 if not responder_result or not responder_result.content:
                     return None
+                responder_content = self._pack_debate_context(
+                    responder_result.content
+                )
 
                 # === Step 1: 质疑 ===
                 writer(
@@ -1354,34 +1911,56 @@ class MarketInsightGraphEngine(IGraphEngine):
                     }
                 )
 
-                if debate_type == DebateType.PEER_REVIEW:
+                if debate_type is DebateType.PEER_REVIEW:
                     # 同行评审：由对方 Agent 发起质疑
-                    challenge_agent = self.agent_factory(challenger)
                     # 构建质疑 prompt
                     challenge_prompt = self._build_peer_challenge_prompt(
-                        challenger, responder, responder_result.content
+                        challenger, responder, responder_content
                     )
                 else:
                     # 红队审查：由 ChallengerAgent 发起
-                    challenge_agent = self.agent_factory(AGENT_DEBATE_CHALLENGER)
                     if isinstance(challenge_agent, ChallengerAgent):
                         challenge_agent.challenge_mode = "redteam"
                         challenge_agent.set_challenge_context(
                             target_agent=responder,
-                            target_content=responder_result.content,
+                            target_content=responder_content,
                         )
                     challenge_prompt = None  # 使用 Agent 内置 prompt
 
-                # 执行质疑
-                challenge_content = self._execute_agent_call(
-                    agent=challenge_agent,
-                    state=state,
-                    custom_prompt=challenge_prompt,
-                    writer=writer,
-                    event_prefix="challenge",
-                    emit_chunks=False,
+                # 红队审查：被审查内容过短或为降级占位时跳过，
+                # 相同目标内容直接复用质疑结果缓存
+                review_agent = (
+                    challenge_agent
+                    if challenge_prompt is None
+                    and isinstance(challenge_agent, ChallengerAgent)
+                    else None
+                )
+                challenge_skipped = (
+                    review_agent is not None and not review_agent.has_reviewable_target()
                 )
+                challenge_content = None
+                if challenge_skipped:
+                    challenge_content = review_agent.SKIPPED_REVIEW_CONTENT
+                elif review_agent is not None:
+                    challenge_content = review_agent.get_cached_challenge()
+                    if challenge_content is not None:
+                        self._emit_llm_cache_hit(
+                            writer, challenger, "challenge", cache="challenge"
+                        )
+                if challenge_content is None:
+                    challenge_content = self._execute_challenger_call(
+                        breaker,
+                        agent=challenge_agent,
+                        state=state,
+                        custom_prompt=challenge_prompt,
+                        writer=writer,
+                        event_prefix="challenge",
+                        emit_chunks=False,
+                    )
+                    if review_agent is not None:
+                        review_agent.store_challenge(challenge_content)
 
+                now_iso = datetime.now().isoformat()
                 writer(
                     {
                         "event": "agent_challenge_end",
@@ -1394,9 +1973,22 @@ class MarketInsightGraphEngine(IGraphEngine):
                         if challenge_content
                         else "",
                         "attempt": attempt,
-                        "timestamp": datetime.now().isoformat(),
+                        "skipped": challenge_skipped,
+                        "timestamp": now_iso,
                     }
                 )
+                if challenge_skipped:
+                    # 跳过审查时无需回应 / 追问
+                    return DebateExchange(
+                        round_number=round_number,
+                        debate_type=debate_type,
+                        challenger=challenger,
+                        responder=responder,
+                        challenge_content=challenge_content,
+                        response_content="",
+                        followup_content=None,
+                        revised=False,
+                    )
 
                 # === Step 2: 回应 ===
                 writer(
@@ -1406,11 +1998,10 @@ class MarketInsightGraphEngine(IGraphEngine):
                         "from_agent": responder,
                         "to_agent": challenger,
                         "attempt": attempt,
-                        "timestamp": datetime.now().isoformat(),
+                        "timestamp": now_iso,
                     }
                 )
 
-                responder_agent = self.agent_factory(responder)
                 response_prompt = self._build_response_prompt(
                     responder, challenge_content, responder_result.content
                 )
@@ -1428,6 +2019,7 @@ class MarketInsightGraphEngine(IGraphEngine):
                     "修改" in (response_content or "")
                 )
 
+                now_iso = datetime.now().isoformat()
                 writer(
                     {
                         "event": "agent_respond_end",
@@ -1441,7 +2033,7 @@ class MarketInsightGraphEngine(IGraphEngine):
                         if response_content
                         else "",
                         "attempt": attempt,
-                        "timestamp": datetime.now().isoformat(),
+                        "timestamp": now_iso,
                     }
                 )
 
@@ -1455,7 +2047,7 @@ class MarketInsightGraphEngine(IGraphEngine):
                             "from_agent": challenger,
                             "to_agent": responder,
                             "attempt": attempt,
-                            "timestamp": datetime.now().isoformat(),
+                            "timestamp": now_iso,
                         }
                     )
 
@@ -1464,7 +2056,8 @@ class MarketInsightGraphEngine(IGraphEngine):
                     )
 
                     # 使用同一个质疑 Agent 进行追问
-                    followup_content = self._execute_agent_call(
+                    followup_content = self._execute_challenger_call(
+                        breaker,
                         agent=challenge_agent,
                         state=state,
                         custom_prompt=followup_prompt,
@@ -1500,13 +2093,13 @@ class MarketInsightGraphEngine(IGraphEngine):
                     revised=revised,
                 )
 
+            except RequestCancelledError:
+                raise
             except Exception as e:
                 err = str(e)
                 exchange_id = f"r{round_number}:{challenger}->{responder}"
-                if attempt < max_attempts:
-                    delay_ms = self._compute_backoff_ms(
-                        backoff_ms, attempt, jitter_key=exchange_id
-                    )
+                if attempt < max_attempts and not isinstance(e, CircuitOpenError):
+                    delay_ms = self._compute_backoff_ms(backoff_ms, attempt)
                     self._emit_retry_event(
                         writer=writer,
                         target_type="debate_exchange",
@@ -1537,6 +2130,74 @@ class MarketInsightGraphEngine(IGraphEngine):
 
         return None
 
+    def _execute_challenger_call(
+        self, breaker: Optional[CircuitBreaker], **kwargs: Any
+    ) -> str:
+        """执行质疑方调用；红队模式下把连接 / 限流 / 5xx 类失败计入熔断器"""
+        if breaker is None:
+            return self._execute_agent_call(**kwargs)
+        try:
+            content = self._execute_agent_call(**kwargs)
+        except (RequestCancelledError, CircuitOpenError):
+            raise
+        except Exception as e:
+            breaker.record(success=not self._is_connection_like_error(str(e)))
+            raise
+        breaker.record(success=True)
+        return content
+
+    def _circuit_open_exchange(
+        self,
+        *,
+        writer: Callable,
+        round_number: int,
+        debate_type: DebateType,
+        challenger: str,
+        responder: str,
+        degrade_mode: str,
+    ) -> Optional[DebateExchange]:
+        """红队熔断期间不再发起调用，按 degrade_mode 立即降级"""
+        err = "circuit_open: 红队审查服务异常，已暂时熔断"
+        writer(
+            {
+                "event": "agent_error",
+                "agent": challenger,
+                "target_agent": responder,
+                "error": err,
+                "degrade_mode": degrade_mode,
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
+        logger.warning(f"红队熔断中，跳过 {challenger} -> {responder}")
+        if degrade_mode == "fail":
+            raise GraphExecutionError(err, node_id="debate_redteam")
+        if degrade_mode == "partial":
+            return DebateExchange(
+                round_number=round_number,
+                debate_type=debate_type,
+                challenger=challenger,
+                responder=responder,
+                challenge_content="",
+                response_content="",
+                followup_content=f"[降级] {err}",
+                revised=False,
+            )
+        return None
+
+    def _emit_llm_cache_hit(
+        self, writer: Callable, agent_name: str, context: str, cache: str = "llm"
+    ) -> None:
+        """模型响应缓存命中：跳过 Ark 调用并上报观测事件"""
+        writer(
+            {
+                "event": "cache_hit",
+                "cache": cache,
+                "agent": agent_name,
+                "context": context,
+                "timestamp": datetime.now().isoformat(),
+            }
+        )
+
     def _execute_agent_call(
         self,
         agent,
@@ -1567,7 +2228,9 @@ class MarketInsightGraphEngine(IGraphEngine):
                 {"role": "user", "content": agent.get_user_prompt(context)},
             ]
 
-        content_parts: list[str] = []
+        content_buf = _chunk_buffer(
+            writer if emit_chunks else None, f"{event_prefix}_chunk", agent.name
+        )
 
         from core.ark_client import StreamEventType
 
@@ -1590,6 +2253,7 @@ class MarketInsightGraphEngine(IGraphEngine):
 
         active_invocation_id: Optional[str] = None
         search_sources: list[str] = []
+        seen_sources: set[str] = set()
         cache_key: Optional[str] = None
         if effective_websearch:
             cache_key = self._build_tool_cache_key(
@@ -1638,27 +2302,43 @@ class MarketInsightGraphEngine(IGraphEngine):
                         }
                     )
                 return cached_content
+        elif self._llm_cache is not None and state.get("enable_cache", True):
+            thinking_mode = getattr(agent, "thinking_mode", None)
+            cache_key = LLMCache.build_key(
+                model=str(agent.model),
+                messages=messages,
+                thinking_mode=getattr(thinking_mode, "value", thinking_mode),
+                use_websearch=False,
+                websearch_limit=getattr(agent, "websearch_limit", 0),
+            )
+            cached = self._llm_cache.get(cache_key)
+            if isinstance(cached, dict):
+                self._emit_llm_cache_hit(writer, str(agent.name), event_prefix)
+                cached_content = str(cached.get("content") or "")
+                if cached_content and emit_chunks:
+                    writer(
+                        {
+                            "event": f"{event_prefix}_chunk",
+                            "agent": agent.name,
+                            "content": cached_content,
+                        }
+                    )
+                return cached_content
 
         try:
-            with self._acquire_ark_slot():
+            with self._acquire_ark_slot(messages):
                 for event in agent.ark_client.create_response_stream_v2(
                     messages=messages,
                     model=agent.model,
                     use_websearch=effective_websearch,
                     websearch_limit=getattr(agent, "websearch_limit", 0),
                     thinking_mode=getattr(agent, "thinking_mode", None),
+                    cancel_event=self._cancel_event,
                 ):
-                    if event.type == StreamEventType.OUTPUT_DELTA and event.content:
-                        if emit_chunks:
-                            writer(
-                                {
-                                    "event": f"{event_prefix}_chunk",
-                                    "agent": agent.name,
-                                    "content": event.content,
-                                }
-                            )
-                        content_parts.append(event.content)
-                    elif event.type == StreamEventType.SEARCH_START:
+                    if event.type is StreamEventType.OUTPUT_DELTA and event.content:
+                        content_buf.write(event.content)
+                    elif event.type is StreamEventType.SEARCH_START:
+                        content_buf.flush()
                         active_invocation_id = self._tool_registry.begin_invocation(
                             writer=writer,
                             session_id=session_id,
@@ -1669,7 +2349,8 @@ class MarketInsightGraphEngine(IGraphEngine):
                             context=event_prefix,
                             cache_hit=False,
                         )
-                    elif event.type == StreamEventType.SEARCH_COMPLETE:
+                    elif event.type is StreamEventType.SEARCH_COMPLETE:
+                        content_buf.flush()
                         meta = event.metadata or {}
                         if not active_invocation_id:
                             active_invocation_id = self._tool_registry.begin_invocation(
@@ -1694,14 +2375,16 @@ class MarketInsightGraphEngine(IGraphEngine):
                             },
                         )
                         for source in end_result.get("sources", []):
-                            if source not in search_sources:
+                            if source not in seen_sources:
+                                seen_sources.add(source)
                                 search_sources.append(source)
                         active_invocation_id = None
 
             self._record_ark_outcome(success=True, error=None, writer=writer)
-            content = "".join(content_parts)
-            if effective_websearch and cache_key and content:
-                self._tool_cache.set(
+            content_buf.flush()
+            content = content_buf.getvalue()
+            if cache_key and content:
+                (self._tool_cache if effective_websearch else self._llm_cache).set(
                     cache_key,
                     {
                         "content": content,
@@ -1710,7 +2393,10 @@ class MarketInsightGraphEngine(IGraphEngine):
                     },
                 )
             return content
+        except RequestCancelledError:
+            raise
         except Exception as e:
+            content_buf.flush()
             if active_invocation_id:
                 try:
                     self._tool_registry.error_invocation(
@@ -1723,20 +2409,39 @@ class MarketInsightGraphEngine(IGraphEngine):
             self._record_ark_outcome(success=False, error=str(e), writer=writer)
             raise
 
+    def _pack_debate_context(self, content: str) -> str:
+        """
+        按 token 预算压缩被审查报告，控制多轮辩论的 prompt 规模
+
+        超出 settings.debate_context_token_budget 时按比例保留开头与结尾
+        （结论多在末尾），中间以省略标记替代；预算 <= 0 时原样返回。
+        """
+        budget = settings.debate_context_token_budget
+        if budget <= 0 or not content:
+            return content
+        tokens = estimate_tokens(content)
+        if tokens <= budget:
+            return content
+
+        keep_chars = max(1, len(content) * budget // tokens)
+        head_chars = keep_chars * 2 // 3
+        tail_chars = keep_chars - head_chars
+        omitted = tokens - budget
+        return (
+            f"{content[:head_chars].rstrip()}\n\n"
+            f"……（中间省略约 {omitted} tokens）……\n\n"
+            f"{content[len(content) - tail_chars:].lstrip()}"
+        )
+
     def _build_peer_challenge_prompt(
         self, challenger: str, responder: str, responder_content: str
     ) -> str:
         """构建同行评审质疑 prompt"""
-        agent_names = {
-            "trend_scout": "趋势侦察员",
-            "competitor_analyst": "竞争分析师",
-            "regulation_checker": "法规检查员",
-            "social_sentinel": "社媒哨兵",
-        }
+        from agents.factory import get_agent_display_name
 
         return f"""## 同行评审任务
 
-你是 **{agent_names.get(challenger, challenger)}**，请对 **{agent_names.get(responder, responder)}** 的分析报告进行专业审查。
+你是 **{get_agent_display_name(challenger)}**，请对 **{get_agent_display_name(responder)}** 的分析报告进行专业审查。
 
 ### 被审查报告
 
@@ -1796,7 +2501,7 @@ class MarketInsightGraphEngine(IGraphEngine):
     def _synthesizer_node(self, state: MarketInsightState) -> dict[str, Any]:
         """综合器节点：整合所有结果生成最终报告"""
         writer = get_stream_writer()
-        start_time = time.time()
+        start_time = time.monotonic()
 
         writer(
             {
@@ -1819,6 +2524,8 @@ class MarketInsightGraphEngine(IGraphEngine):
 
         if self.agent_factory and has_worker_content:
             for attempt in range(1, max_attempts + 1):
+                content_buf = _chunk_buffer(writer, "agent_chunk", self.SYNTHESIZER)
+                thinking_buf = _chunk_buffer(writer, "agent_thinking", self.SYNTHESIZER)
                 try:
                     from agents.base import AgentContext, AgentOutput
 
@@ -1859,51 +2566,44 @@ class MarketInsightGraphEngine(IGraphEngine):
 
                     from core.ark_client import StreamEventType
 
-                    content_parts = []
-                    with self._acquire_ark_slot():
+                    with self._acquire_ark_slot(messages):
                         for event in synthesizer.ark_client.create_response_stream_v2(
                             messages=messages,
                             model=synthesizer.model,
                             use_websearch=False,
                             thinking_mode=getattr(synthesizer, "thinking_mode", None),
+                            cancel_event=self._cancel_event,
                         ):
                             if (
-                                event.type == StreamEventType.OUTPUT_DELTA
+                                event.type is StreamEventType.OUTPUT_DELTA
                                 and event.content
                             ):
-                                writer(
-                                    {
-                                        "event": "agent_chunk",
-                                        "agent": self.SYNTHESIZER,
-                                        "content": event.content,
-                                    }
-                                )
-                                content_parts.append(event.content)
+                                thinking_buf.flush()
+                                content_buf.write(event.content)
                             elif (
-                                event.type == StreamEventType.THINKING_DELTA
+                                event.type is StreamEventType.THINKING_DELTA
                                 and event.content
                             ):
-                                writer(
-                                    {
-                                        "event": "agent_thinking",
-                                        "agent": self.SYNTHESIZER,
-                                        "content": event.content,
-                                    }
-                                )
+                                content_buf.flush()
+                                thinking_buf.write(event.content)
 
-                    synthesized_report = "".join(content_parts)
+                    thinking_buf.flush()
+                    content_buf.flush()
+                    synthesized_report = content_buf.getvalue()
                     synthesized_report = synthesizer.post_process(
                         synthesized_report, context
                     )
                     self._record_ark_outcome(success=True, error=None, writer=writer)
                     break
+                except RequestCancelledError:
+                    raise
                 except Exception as e:
+                    thinking_buf.flush()
+                    content_buf.flush()
                     err = str(e)
                     self._record_ark_outcome(success=False, error=err, writer=writer)
-                    if attempt < max_attempts:
-                        delay_ms = self._compute_backoff_ms(
-                            backoff_ms, attempt, jitter_key=self.SYNTHESIZER
-                        )
+                    if attempt < max_attempts and not isinstance(e, CircuitOpenError):
+                        delay_ms = self._compute_backoff_ms(backoff_ms, attempt)
                         self._emit_retry_event(
                             writer=writer,
                             target_type="agent",
@@ -1952,7 +2652,8 @@ class MarketInsightGraphEngine(IGraphEngine):
 
         generated_at = datetime.now().isoformat()
         try:
-            evidence_pack = build_evidence_pack(
+            # 证据包与记忆快照共用一次遍历（每行只转换一次 dict）
+            evidence_pack, memory_snapshot = build_evidence_and_memory(
                 session_id=state["session_id"],
                 profile=state.get("user_profile", {}),
                 agent_results=results,
@@ -1961,7 +2662,7 @@ class MarketInsightGraphEngine(IGraphEngine):
                 generated_at=generated_at,
             )
         except Exception as e:
-            logger.warning(f"Evidence Pack 生成失败，将回退到最小结构: {e}")
+            logger.warning(f"Evidence Pack / 记忆快照生成失败，将回退到最小结构: {e}")
             evidence_pack = {
                 "version": "phase3.v1",
                 "session_id": state.get("session_id"),
@@ -1971,18 +2672,6 @@ class MarketInsightGraphEngine(IGraphEngine):
                 "traceability": [],
                 "stats": {"claims_count": 0, "sources_count": 0, "debate_count": 0},
             }
-
-        try:
-            memory_snapshot = build_memory_snapshot(
-                session_id=state["session_id"],
-                profile=state.get("user_profile", {}),
-                agent_results=results,
-                debate_exchanges=debates,
-                final_report=synthesized_report,
-                generated_at=generated_at,
-            )
-        except Exception as e:
-            logger.warning(f"轻量记忆快照生成失败，将回退到最小结构: {e}")
             memory_snapshot = {
                 "version": "phase3.memory.v1",
                 "session_id": state.get("session_id"),
@@ -1995,21 +2684,20 @@ class MarketInsightGraphEngine(IGraphEngine):
                 "risk_items": [],
             }
 
+        # HTML 报告后台写盘，URL 预先确定；生成完成前报告端点返回 202
         report_html_url: Optional[str] = None
         try:
-            report_path = write_html_report(
+            submit_html_report(
                 session_id=state["session_id"],
                 report_markdown=synthesized_report,
                 profile=state.get("user_profile", {}),
             )
-            if report_path:
-                report_html_url = (
-                    f"/api/v2/market-insight/report/{state['session_id']}.html"
-                )
+            report_html_url = f"/api/v2/market-insight/report/{state['session_id']}.html"
         except Exception as e:
             logger.warning(f"HTML 报告生成失败: {e}")
 
-        duration_ms = int((time.time() - start_time) * 1000)
+        duration_ms = int((time.monotonic() - start_time) * 1000)
+        now_iso = datetime.now().isoformat()
 
         writer(
             {
@@ -2018,7 +2706,7 @@ class MarketInsightGraphEngine(IGraphEngine):
                 "status": synthesizer_status,
                 "error": fallback_reason,
                 "duration_ms": duration_ms,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso,
             }
         )
 
@@ -2030,7 +2718,7 @@ class MarketInsightGraphEngine(IGraphEngine):
                 "report_html_url": report_html_url,
                 "evidence_pack": evidence_pack,
                 "memory_snapshot": memory_snapshot,
-                "timestamp": datetime.now().isoformat(),
+                "timestamp": now_iso,
             }
         )
 
@@ -2071,7 +2759,7 @@ class MarketInsightGraphEngine(IGraphEngine):
             report_parts.append("\n## 辩论总结\n")
             for exchange in debates:
                 report_parts.append(
-                    f"- 第 {exchange.round_number} 轮 ({exchange.debate_type.value}): "
+                    f"- 第 {exchange.round_number} 轮 ({exchange.debate_type}): "
                     f"{exchange.challenger} → {exchange.responder}\n"
                 )
 
@@ -2115,9 +2803,6 @@ def create_market_insight_engine(
         retry_backoff_ms=retry_backoff_ms,
         degrade_mode=degrade_mode,
     )
-    engine.build()
-
-    checkpointer = MemorySaver() if use_checkpointer else None
-    engine.compile(checkpointer=checkpointer)
+    engine.compile(checkpointer=None if use_checkpointer else False)
 
     return engine
@@ -0,0 +1,49 @@
+"""
+确定性提示词的模型响应缓存
+
+目标：
+- 同一模型、同一组消息、同一思考模式的非联网调用直接复用此前的输出，
+  重试、回放与辩论重跑不再重复请求 Ark
+- 联网搜索调用的结果依赖实时检索，不进入本缓存（由 ToolCache 按 web_search 路径管理）
+- 底层复用 ToolCache 的进程内 TTL + LRU 实现
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Optional
+
+from tools import ToolCache
+
+
+class LLMCache:
+    """按 sha256(模型, 消息, 思考模式, 联网参数) 缓存模型完整输出。"""
+
+    def __init__(self, ttl_seconds: int = 3600, max_size: int = 256):
+        self._cache = ToolCache(ttl_seconds=ttl_seconds, max_size=max_size)
+
+    @staticmethod
+    def build_key(
+        *,
+        model: str,
+        messages: list[dict[str, Any]],
+        thinking_mode: Optional[str],
+        use_websearch: bool,
+        websearch_limit: int,
+    ) -> str:
+        payload = {
+            "model": model,
+            "messages": messages,
+            "thinking": thinking_mode,
+            "ws": bool(use_websearch),
+            "limit": int(websearch_limit or 0),
+        }
+        raw = json.dumps(payload, ensure_ascii=False, sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[dict[str, Any]]:
+        return self._cache.get(key)
+
+    def set(self, key: str, value: dict[str, Any]) -> None:
+        self._cache.set(key, value)
@@ -29,6 +29,16 @@ def _to_dict(row: Any) -> dict[str, Any]:
         except Exception:
             pass
 
+    # 普通对象直接读实例 __dict__，避免 dir() 的 MRO 遍历与排序
+    raw = getattr(row, "__dict__", None)
+    if isinstance(raw, dict) and raw:
+        return {
+            key: value
+            for key, value in raw.items()
+            if not key.startswith("_") and not callable(value)
+        }
+
+    # __slots__ 等没有实例 __dict__ 的对象回退到 dir()
     data: dict[str, Any] = {}
     for key in dir(row):
         if key.startswith("_"):
@@ -91,28 +101,22 @@ def _extract_keywords(content: str) -> list[str]:
     return top
 
 
-def build_memory_snapshot(
-    *,
-    session_id: str,
-    profile: Optional[dict[str, Any]],
-    agent_results: list[Any],
-    debate_exchanges: list[Any],
-    final_report: str,
-    generated_at: Optional[str] = None,
-) -> dict[str, Any]:
+class MemorySnapshotBuilder:
     """
-    构建 session 级轻量记忆快照。
+    逐行累积的记忆快照构建器
+
+    调用方逐条喂入已转为 dict 的 Agent / 辩论行，最后 build() 组装；
+    便于与 Evidence Pack 共用同一次遍历（见 core.evidence_pack.build_evidence_and_memory）。
     """
-    generated_at = generated_at or _now_iso()
-    profile = profile or {}
 
-    agent_rows = [_to_dict(r) for r in agent_results or []]
-    debate_rows = [_to_dict(r) for r in debate_exchanges or []]
+    def __init__(self) -> None:
+        self.agent_highlights: list[dict[str, Any]] = []
+        self.debate_focus: list[dict[str, Any]] = []
+        self.revised_count = 0
 
-    agent_highlights = []
-    for row in agent_rows:
+    def add_agent_row(self, row: dict[str, Any]) -> None:
         content = str(row.get("content") or "")
-        agent_highlights.append(
+        self.agent_highlights.append(
             {
                 "agent_name": row.get("agent_name"),
                 "status": row.get("status") or "unknown",
@@ -122,47 +126,82 @@ def build_memory_snapshot(
             }
         )
 
-    revised_count = sum(1 for row in debate_rows if bool(row.get("revised")))
-    debate_focus = [
-        {
-            "round_number": row.get("round_number"),
-            "debate_type": row.get("debate_type"),
-            "challenger": row.get("challenger"),
-            "responder": row.get("responder"),
-            "revised": bool(row.get("revised")),
-        }
-        for row in debate_rows
-    ]
-
-    action_items = _extract_markdown_items(final_report, limit=6)
-    risk_items = [
-        item
-        for item in action_items
-        if any(k in item.lower() for k in ("风险", "risk", "合规", "限制", "约束", "挑战"))
-    ][:4]
-
-    return {
-        "version": "phase3.memory.v1",
-        "session_id": session_id,
-        "generated_at": generated_at,
-        "entities": {
-            "target_market": profile.get("target_market"),
-            "supply_chain": profile.get("supply_chain"),
-            "seller_type": profile.get("seller_type"),
-            "price_range": {
-                "min_price": profile.get("min_price"),
-                "max_price": profile.get("max_price"),
+    def add_debate_row(self, row: dict[str, Any]) -> None:
+        revised = bool(row.get("revised"))
+        if revised:
+            self.revised_count += 1
+        self.debate_focus.append(
+            {
+                "round_number": row.get("round_number"),
+                "debate_type": row.get("debate_type"),
+                "challenger": row.get("challenger"),
+                "responder": row.get("responder"),
+                "revised": revised,
+            }
+        )
+
+    def build(
+        self,
+        *,
+        session_id: str,
+        profile: Optional[dict[str, Any]],
+        final_report: str,
+        generated_at: str,
+    ) -> dict[str, Any]:
+        profile = profile or {}
+        action_items = _extract_markdown_items(final_report, limit=6)
+        risk_items = [
+            item
+            for item in action_items
+            if any(k in item.lower() for k in ("风险", "risk", "合规", "限制", "约束", "挑战"))
+        ][:4]
+
+        return {
+            "version": "phase3.memory.v1",
+            "session_id": session_id,
+            "generated_at": generated_at,
+            "entities": {
+                "target_market": profile.get("target_market"),
+                "supply_chain": profile.get("supply_chain"),
+                "seller_type": profile.get("seller_type"),
+                "price_range": {
+                    "min_price": profile.get("min_price"),
+                    "max_price": profile.get("max_price"),
+                },
+            },
+            "summary": _clip(final_report, 260),
+            "agent_highlights": self.agent_highlights,
+            "debate_focus": self.debate_focus,
+            "signals": {
+                "debate_count": len(self.debate_focus),
+                "revised_count": self.revised_count,
+                "agent_count": len(self.agent_highlights),
             },
-        },
-        "summary": _clip(final_report, 260),
-        "agent_highlights": agent_highlights,
-        "debate_focus": debate_focus,
-        "signals": {
-            "debate_count": len(debate_rows),
-            "revised_count": revised_count,
-            "agent_count": len(agent_rows),
-        },
-        "action_items": action_items,
-        "risk_items": risk_items,
-    }
+            "action_items": action_items,
+            "risk_items": risk_items,
+        }
+
 
+def build_memory_snapshot(
+    *,
+    session_id: str,
+    profile: Optional[dict[str, Any]],
+    agent_results: list[Any],
+    debate_exchanges: list[Any],
+    final_report: str,
+    generated_at: Optional[str] = None,
+) -> dict[str, Any]:
+    """
+    构建 session 级轻量记忆快照。
+    """
+    builder = MemorySnapshotBuilder()
+    for row in agent_results or []:
+        builder.add_agent_row(_to_dict(row))
+    for row in debate_exchanges or []:
+        builder.add_debate_row(_to_dict(row))
+    return builder.build(
+        session_id=session_id,
+        profile=profile,
+        final_report=final_report,
+        generated_at=generated_at or _now_iso(),
+    )
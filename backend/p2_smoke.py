@@ -11,7 +11,12 @@ class Ark:  # noqa: D401
     """占位 Ark 类，仅用于通过导入阶段。"""
 
 
+class AsyncArk:  # noqa: D401
+    """占位 AsyncArk 类，仅用于通过导入阶段。"""
+
+
 fake_ark_module.Ark = Ark
+fake_ark_module.AsyncArk = AsyncArk
 sys.modules.setdefault("volcenginesdkarkruntime", fake_ark_module)
 
 from core.ark_client import StreamEvent, StreamEventType
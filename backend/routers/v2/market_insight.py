@@ -5,20 +5,24 @@ v2 市场洞察 API 端点
 提供 SSE 流式接口，支持 Supervisor-Worker + 多轮辩论 架构
 """
 
-from typing import Optional, Any, cast
+from typing import Iterator, Optional, Any, cast
 from datetime import datetime, timezone
+import importlib.util
 import json
 import logging
 import asyncio
+import threading
 import uuid
+from collections import deque
 
 from fastapi import APIRouter, HTTPException, Query, Request
-from fastapi.responses import HTMLResponse, FileResponse
-from sse_starlette.sse import EventSourceResponse
+from fastapi.responses import HTMLResponse, FileResponse, JSONResponse
+from sse_starlette.sse import EventSourceResponse, ServerSentEvent
 
+from core.concurrency import SESSION_ADMISSION
 from core.config import settings
 from core.evidence_pack import build_evidence_pack
-from core.graph_engine import create_market_insight_engine
+from core.graph_engine import MarketInsightGraphEngine, create_market_insight_engine
 from core.exceptions import GraphExecutionError
 from schemas.v2.requests import MarketInsightRequest
 from schemas.v2.responses import MarketInsightResponse, WorkflowStatus
@@ -26,7 +30,11 @@ from agents.factory import agent_factory_for_graph
 from database.event_sink import create_session_event_sink
 from database.pg_client import pg_is_configured, create_pg_client
 from memory import build_memory_snapshot
-from utils.report_export import get_report_file_path, write_html_report
+from utils.report_export import (
+    get_report_file_path,
+    is_report_pending,
+    write_html_report,
+)
 from utils.rehearsal_log import append_rehearsal_metric
 from utils.roadshow_export import write_roadshow_zip
 from utils.report_charts import build_report_charts
@@ -35,13 +43,93 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter(prefix="/market-insight", tags=["Market Insight v2"])
 
+if importlib.util.find_spec("orjson") is not None:
+    import orjson
 
-def _next_or_end(iterator) -> Optional[dict[str, Any]]:
-    """在线程中安全获取下一条事件，避免 StopIteration 进入 Future。"""
-    try:
-        return next(iterator)
-    except StopIteration:
-        return None
+    # datetime 交给 default=str 处理，与 json.dumps 的输出格式保持一致
+    _ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+    def _dumps_sse_data(event: dict[str, Any]) -> str:
+        """序列化 SSE 事件（orjson，逐 token 事件的热路径）"""
+        return orjson.dumps(event, default=str, option=_ORJSON_OPTIONS).decode("utf-8")
+
+else:
+
+    def _dumps_sse_data(event: dict[str, Any]) -> str:
+        """序列化 SSE 事件（未安装 orjson 时回退到标准库）"""
+        return json.dumps(event, ensure_ascii=False, default=str)
+
+
+_STREAM_END = object()
+
+
+def _start_event_pump(
+    events: Iterator[dict[str, Any]],
+    queue: "asyncio.Queue[Any]",
+    stop: threading.Event,
+) -> threading.Thread:
+    """
+    在后台线程中驱动同步事件流，事件经 asyncio.Queue 交给 SSE 协程
+
+    生产端（图执行）不再等待逐条 to_thread 往返与客户端写出；
+    异常原样入队由消费端抛出，结束时入队 _STREAM_END。
+    """
+    loop = asyncio.get_running_loop()
+    # 线程侧先放入本地缓冲；事件循环尚未取走时不再重复唤醒
+    # （每次 call_soon_threadsafe 都要写一次唤醒管道）
+    pending: deque[Any] = deque()
+    wakeup_lock = threading.Lock()
+    wakeup_scheduled = False
+
+    def _drain() -> None:
+        nonlocal wakeup_scheduled
+        with wakeup_lock:
+            wakeup_scheduled = False
+        while pending:
+            queue.put_nowait(pending.popleft())
+
+    def _put(item: Any) -> None:
+        nonlocal wakeup_scheduled
+        pending.append(item)
+        with wakeup_lock:
+            if wakeup_scheduled:
+                return
+            wakeup_scheduled = True
+        try:
+            loop.call_soon_threadsafe(_drain)
+        except RuntimeError:
+            # 事件循环已关闭（客户端断开后服务回收），丢弃即可
+            pass
+
+    def _run() -> None:
+        try:
+            for event in events:
+                if stop.is_set():
+                    break
+                _put(event)
+        except Exception as e:
+            _put(e)
+        finally:
+            close = getattr(events, "close", None)
+            if stop.is_set() and callable(close):
+                try:
+                    close()
+                except Exception:
+                    pass
+            _put(_STREAM_END)
+
+    thread = threading.Thread(target=_run, name="sse-event-pump", daemon=True)
+    thread.start()
+    return thread
+
+
+def _overloaded_http_error() -> HTTPException:
+    """工作流准入已满：显式 429，让客户端退避重试而不是排队等待"""
+    return HTTPException(
+        status_code=429,
+        detail="服务繁忙，请稍后重试",
+        headers={"Retry-After": "1"},
+    )
 
 
 def _to_datetime(value: Any) -> Optional[datetime]:
@@ -234,7 +322,11 @@ async def stream_market_insight(http_request: Request, request: MarketInsightReq
     - agent_followup_end: 二次追问完成
     - orchestrator_end: 工作流完成（含 final_report / report_html_url）
     - error: 系统错误
+
+    准入已满时直接返回 429，不再建立 SSE 连接。
     """
+    if SESSION_ADMISSION.saturation_ratio >= 1:
+        raise _overloaded_http_error()
 
     async def event_generator():
         session_id = request.session_id or str(uuid.uuid4())
@@ -266,6 +358,8 @@ async def stream_market_insight(http_request: Request, request: MarketInsightReq
             profile=profile_dict,
             config=config_dict,
         )
+        pump_stop = threading.Event()
+        engine: Optional[MarketInsightGraphEngine] = None
 
         try:
             # 创建 Agent 工厂
@@ -294,33 +388,46 @@ async def stream_market_insight(http_request: Request, request: MarketInsightReq
                 "degrade_mode": request.degrade_mode,
             }
 
-            # 流式执行（将同步迭代放在线程中，避免阻塞事件循环）
-            stream_iter = iter(engine.stream(initial_state))
-            while True:
+            # 流式执行：同步迭代在后台线程中驱动，经队列批量取出后下发
+            queue: asyncio.Queue[Any] = asyncio.Queue()
+            _start_event_pump(iter(engine.stream(initial_state)), queue, pump_stop)
+            finished = False
+            while not finished:
                 if await http_request.is_disconnected():
                     logger.info(f"客户端断开连接，session={session_id}")
+                    break
+
+                batch = [await queue.get()]
+                while not queue.empty():
+                    batch.append(queue.get_nowait())
+
+                frames: list[bytes] = []
+                for event in batch:
+                    if event is _STREAM_END:
+                        finished = True
+                        break
+                    if isinstance(event, Exception):
+                        if frames:
+                            yield b"".join(frames)
+                        raise event
+
+                    # 落库（不阻塞 SSE）
                     try:
-                        stream_iter.close()
+                        sink.on_event(event)
                     except Exception:
                         pass
-                    break
 
-                event = await asyncio.to_thread(_next_or_end, stream_iter)
-                if event is None:
-                    break
-
-                # 落库（不阻塞 SSE）
-                try:
-                    sink.on_event(event)
-                except Exception:
-                    pass
+                    # 转换为 SSE 帧
+                    frames.append(
+                        ServerSentEvent(
+                            data=_dumps_sse_data(event),
+                            event=event.get("event", "message"),
+                        ).encode()
+                    )
 
-                # 转换为 SSE 格式
-                sse_data = json.dumps(event, ensure_ascii=False, default=str)
-                yield {
-                    "event": event.get("event", "message"),
-                    "data": sse_data,
-                }
+                # 同一批取出的事件拼成一次写出，减少逐帧 send
+                if frames:
+                    yield b"".join(frames)
 
                 # 让出控制权，避免阻塞
                 await asyncio.sleep(0)
@@ -332,6 +439,7 @@ async def stream_market_insight(http_request: Request, request: MarketInsightReq
                     {
                         "event": "error",
                         "error": str(e),
+                        "code": e.code,
                         "session_id": session_id,
                         "timestamp": datetime.now().isoformat(),
                     }
@@ -344,6 +452,7 @@ async def stream_market_insight(http_request: Request, request: MarketInsightReq
                     {
                         "event": "error",
                         "error": str(e),
+                        "code": e.code,
                         "session_id": session_id,
                         "timestamp": datetime.now().isoformat(),
                     },
@@ -377,6 +486,10 @@ async def stream_market_insight(http_request: Request, request: MarketInsightReq
             }
 
         finally:
+            # 通知后台线程停止拉取，并取消仍在读取模型流的节点（断开或异常退出时）
+            pump_stop.set()
+            if engine is not None:
+                engine.cancel()
             try:
                 sink.close()
             except Exception:
@@ -536,6 +649,8 @@ async def generate_market_insight(request: MarketInsightRequest):
         )
 
     except GraphExecutionError as e:
+        if e.code == "OVERLOADED":
+            raise _overloaded_http_error()
         logger.error(f"工作流执行失败: {e}")
         raise HTTPException(status_code=500, detail=str(e))
     except Exception as e:
@@ -801,9 +916,16 @@ async def list_history_sessions(
 
 @router.get("/report/{session_id}.html")
 async def get_html_report(session_id: str, download: bool = False):
-    """获取会话对应的 HTML 报告文件。"""
+    """获取会话对应的 HTML 报告文件（后台生成中返回 202，客户端稍后重试）。"""
     report_path = get_report_file_path(session_id)
 
+    if is_report_pending(session_id):
+        return JSONResponse(
+            status_code=202,
+            content={"detail": "HTML 报告生成中"},
+            headers={"Retry-After": "1"},
+        )
+
     if pg_is_configured():
         try:
             status_payload_raw = await get_workflow_status(session_id)
@@ -979,4 +1101,5 @@ async def health_check():
             "debate": True,
             "streaming": True,
         },
+        "saturation_ratio": round(SESSION_ADMISSION.saturation_ratio, 3),
     }
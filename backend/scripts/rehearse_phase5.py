@@ -192,10 +192,10 @@ def _poll_status_until_terminal(
     status_url: str,
     timeout_sec: float,
 ) -> tuple[int | None, dict[str, Any]]:
-    deadline = time.time() + max(15.0, timeout_sec)
+    deadline = time.monotonic() + max(15.0, timeout_sec)
     last_http: int | None = None
     last_payload: dict[str, Any] = {}
-    while time.time() <= deadline:
+    while time.monotonic() <= deadline:
         try:
             resp = client.get(status_url, timeout=30.0)
             last_http = resp.status_code
@@ -223,7 +223,7 @@ def run_one_round(
 ) -> dict[str, Any]:
     session_id = str(uuid.uuid4())
     scenario_name, payload = _scenario_payload(round_idx, session_id)
-    started = time.time()
+    started = time.monotonic()
 
     record: dict[str, Any] = {
         "round": round_idx + 1,
@@ -328,7 +328,7 @@ def run_one_round(
         record["error"] = str(e)
         record["ok"] = False
 
-    record["duration_ms"] = int((time.time() - started) * 1000)
+    record["duration_ms"] = int((time.monotonic() - started) * 1000)
     record["finished_at"] = _now_iso()
     return record
 
@@ -141,7 +141,7 @@ def run_one_sample(
     if force_debate_rounds is not None:
         payload["debate_rounds"] = force_debate_rounds
 
-    started = time.time()
+    started = time.monotonic()
     generate_url = f"{api_base}/api/v2/market-insight/generate"
     stream_url = f"{api_base}/api/v2/market-insight/stream"
     status_url = f"{api_base}/api/v2/market-insight/status/{session_id}"
@@ -180,8 +180,8 @@ def run_one_sample(
 
     # 2) 查询状态（允许异步落库延迟）
     final_status_payload: dict[str, Any] | None = None
-    poll_deadline = time.time() + max(15.0, status_poll_sec)
-    while time.time() < poll_deadline:
+    poll_deadline = time.monotonic() + max(15.0, status_poll_sec)
+    while time.monotonic() < poll_deadline:
         try:
             status_resp = client.get(status_url, timeout=20.0)
             record["status_http"] = status_resp.status_code
@@ -230,7 +230,7 @@ def run_one_sample(
     )
     record["ok"] = status_ok or event_ok
 
-    record["duration_ms"] = int((time.time() - started) * 1000)
+    record["duration_ms"] = int((time.monotonic() - started) * 1000)
     record["finished_at"] = _now_iso()
     return record
 
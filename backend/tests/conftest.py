@@ -0,0 +1,26 @@
+"""测试公共配置：离线环境下注入最小 Ark SDK 桩（与 p2_smoke.py 一致）。"""
+
+import sys
+import types
+from pathlib import Path
+
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+if "volcenginesdkarkruntime" not in sys.modules:
+    try:
+        import volcenginesdkarkruntime  # noqa: F401
+    except ImportError:
+        fake_ark_module = types.ModuleType("volcenginesdkarkruntime")
+        fake_ark_module.Ark = type("Ark", (), {})
+        fake_ark_module.AsyncArk = type("AsyncArk", (), {})
+        sys.modules["volcenginesdkarkruntime"] = fake_ark_module
+
+
+@pytest.fixture(autouse=True)
+def _isolated_reports_dir(tmp_path, monkeypatch):
+    """HTML 报告写到临时目录，避免测试产物落入仓库的 artifacts/reports。"""
+    reports_dir = tmp_path / "reports"
+    monkeypatch.setattr("utils.report_export.get_reports_dir", lambda: reports_dir)
+    return reports_dir
@@ -0,0 +1,82 @@
+"""BaseAgent.execute() 的可重入性：单次调用状态不挂在实例上。"""
+
+import threading
+import time
+
+from agents.base import EXECUTE_COALESCE_CHARS, AgentContext, AgentStatus, BaseAgent
+from core.ark_client import StreamEvent, StreamEventType
+
+
+class BarrierArkClient:
+    """记录每次调用的会话与合并阈值；等两个调用都进入后再输出。"""
+
+    def __init__(self, barrier: threading.Barrier):
+        self.barrier = barrier
+        self.calls: dict[str, int] = {}
+        self._lock = threading.Lock()
+
+    def create_response_stream_v2(self, *, messages, coalesce_chars=0, **kwargs):
+        session_id = messages[-1]["content"]
+        with self._lock:
+            self.calls[session_id] = coalesce_chars
+        self.barrier.wait(timeout=2)
+        time.sleep(0.01)
+        yield StreamEvent(type=StreamEventType.OUTPUT_DELTA, content=f"{session_id}-ok")
+
+
+class EchoAgent(BaseAgent):
+    name = "echo_agent"
+    use_websearch = False
+
+    def get_system_prompt(self, context):
+        return "system"
+
+    def get_user_prompt(self, context):
+        return context.session_id
+
+
+def _context(session_id: str) -> AgentContext:
+    return AgentContext(session_id=session_id, profile={})
+
+
+def test_concurrent_execute_on_one_instance_returns_each_own_output():
+    client = BarrierArkClient(threading.Barrier(2))
+    agent = EchoAgent(ark_client=client)
+    results = {}
+
+    def run(session_id: str) -> None:
+        results[session_id] = agent.execute(_context(session_id))
+
+    threads = [threading.Thread(target=run, args=(sid,)) for sid in ("s1", "s2")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert {sid: output.content for sid, output in results.items()} == {
+        "s1": "s1-ok",
+        "s2": "s2-ok",
+    }
+    assert all(output.status == AgentStatus.COMPLETED for output in results.values())
+    assert client.calls == {"s1": EXECUTE_COALESCE_CHARS, "s2": EXECUTE_COALESCE_CHARS}
+
+
+def test_execute_does_not_leak_coalescing_into_concurrent_stream():
+    client = BarrierArkClient(threading.Barrier(2))
+    agent = EchoAgent(ark_client=client)
+    results = {}
+
+    def run_execute() -> None:
+        results["batch"] = agent.execute(_context("batch")).content
+
+    def run_stream() -> None:
+        results["stream"] = "".join(agent.execute_stream(_context("stream")))
+
+    threads = [threading.Thread(target=run_execute), threading.Thread(target=run_stream)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert results == {"batch": "batch-ok", "stream": "stream-ok"}
+    assert client.calls == {"batch": EXECUTE_COALESCE_CHARS, "stream": 0}
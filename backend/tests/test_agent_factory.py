@@ -0,0 +1,101 @@
+"""Agent 工厂与 Worker 节点的会话隔离。"""
+
+import threading
+import time
+
+from agents.factory import create_agent
+from core.ark_client import StreamEvent, StreamEventType
+from core.config import AGENT_DEBATE_CHALLENGER, AGENT_TREND_SCOUT
+from core.graph_engine import MarketInsightGraphEngine, create_market_insight_engine
+
+
+class RecordingArkClient:
+    """记录每次调用的会话与联网开关；首个调用等到两个会话都进入后再返回。"""
+
+    def __init__(self, barrier: threading.Barrier):
+        self.barrier = barrier
+        self.calls: list[tuple[str, bool]] = []
+        self._lock = threading.Lock()
+
+    def create_response_stream_v2(self, *, messages, use_websearch, **kwargs):
+        session_id = messages[-1]["content"]
+        with self._lock:
+            self.calls.append((session_id, bool(use_websearch)))
+        try:
+            self.barrier.wait(timeout=2)
+        except threading.BrokenBarrierError:
+            pass
+        time.sleep(0.01)
+        yield StreamEvent(type=StreamEventType.OUTPUT_DELTA, content=f"{session_id}-ok")
+
+
+class SharedAgent:
+    """同一实例被所有会话共享（最坏情况下的自定义工厂）。"""
+
+    use_websearch = True
+    websearch_limit = 5
+    model = "fake-model"
+    thinking_mode = None
+
+    def __init__(self, name: str, ark_client: RecordingArkClient):
+        self.name = name
+        self.ark_client = ark_client
+
+    def get_system_prompt(self, context):
+        return f"system:{self.name}"
+
+    def get_user_prompt(self, context):
+        return context.session_id
+
+    def post_process(self, content, context):
+        return content
+
+
+def test_create_agent_returns_fresh_instances():
+    first = create_agent(AGENT_TREND_SCOUT, ark_client=object())
+    second = create_agent(AGENT_TREND_SCOUT, ark_client=first.ark_client)
+    assert first is not second
+
+    challenger = create_agent(AGENT_DEBATE_CHALLENGER, ark_client=first.ark_client)
+    challenger.set_challenge_context(target_agent="x", target_content="y")
+    other = create_agent(AGENT_DEBATE_CHALLENGER, ark_client=first.ark_client)
+    assert other._target_agent is None
+
+
+def test_concurrent_sessions_keep_their_own_websearch_flag():
+    workers = MarketInsightGraphEngine.WORKER_AGENTS
+    client = RecordingArkClient(threading.Barrier(2 * len(workers)))
+    shared = {name: SharedAgent(name, client) for name in workers}
+
+    def run(session_id: str, enable_websearch: bool, results: dict) -> None:
+        engine = create_market_insight_engine(
+            agent_factory=shared.__getitem__,
+            debate_rounds=0,
+            retry_max_attempts=1,
+            use_checkpointer=False,
+        )
+        results[session_id] = engine.invoke(
+            {
+                "session_id": session_id,
+                "user_profile": {"target_market": session_id},
+                "enable_websearch": enable_websearch,
+            }
+        )
+
+    results: dict = {}
+    threads = [
+        threading.Thread(target=run, args=("session-on", True, results)),
+        threading.Thread(target=run, args=("session-off", False, results)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert set(results) == {"session-on", "session-off"}
+    by_session: dict[str, set[bool]] = {}
+    for session_id, use_websearch in client.calls:
+        by_session.setdefault(session_id, set()).add(use_websearch)
+    assert by_session == {"session-on": {True}, "session-off": {False}}
+    # 会话决策不回写共享实例
+    assert all(agent.use_websearch is True for agent in shared.values())
@@ -0,0 +1,38 @@
+"""ArkClientWrapper._build_request_params：请求参数互不共享。"""
+
+from core.ark_client import ArkClientWrapper
+from core.config import ThinkingMode
+
+
+def _build(**kwargs) -> dict:
+    # 仅构建参数，不需要真实 SDK 客户端
+    client = ArkClientWrapper.__new__(ArkClientWrapper)
+    return client._build_request_params(
+        messages=[{"role": "user", "content": "hi"}],
+        model="fake-model",
+        use_websearch=True,
+        websearch_limit=5,
+        thinking_mode=ThinkingMode.ENABLED,
+        **kwargs,
+    )
+
+
+def test_nested_request_params_are_fresh_per_call():
+    first = _build()
+    first["tools"][0]["limit"] = 99
+    first["tools"].append({"type": "other"})
+    first["extra_body"]["thinking"]["type"] = "mutated"
+
+    second = _build()
+    assert second["tools"] == [{"type": "web_search", "limit": 5}]
+    assert second["extra_body"] == {"thinking": {"type": ThinkingMode.ENABLED.value}}
+    assert second["tools"] is not first["tools"]
+
+
+def test_caller_kwargs_override_base_params():
+    params = _build(tools=[], stream=False)
+    assert params["tools"] == []
+    assert params["stream"] is False
+    assert params["input"] == [
+        {"role": "user", "content": [{"type": "input_text", "text": "hi"}]}
+    ]
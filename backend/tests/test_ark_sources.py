@@ -0,0 +1,35 @@
+"""_ResponseStreamState.collect_sources：来源 URL 提取。"""
+
+from core.ark_client import _ResponseStreamState
+
+
+def _collect(payload) -> list[str]:
+    state = _ResponseStreamState()
+    state.collect_sources(payload)
+    return state.sources
+
+
+def test_url_fields_holding_a_single_url_are_registered_once():
+    assert _collect({"url": "https://a.com/x", "title": "see https://a.com/x"}) == [
+        "https://a.com/x"
+    ]
+
+
+def test_url_fields_with_prefixed_text_are_still_scanned():
+    assert _collect({"url": "来源:https://x.com/a"}) == ["https://x.com/a"]
+    assert _collect({"href": "ref=https://z.org/q"}) == ["https://z.org/q"]
+
+
+def test_nested_sources_keep_depth_first_order():
+    payload = {
+        "annotations": [
+            {"type": "url_citation", "url": "https://first.example/1"},
+            {"text": "更多见 https://second.example/2 与 https://first.example/1"},
+        ],
+        "source": "www.third.example/3",
+    }
+    assert _collect(payload) == [
+        "https://first.example/1",
+        "https://second.example/2",
+        "https://www.third.example/3",
+    ]
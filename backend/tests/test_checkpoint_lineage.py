@@ -0,0 +1,61 @@
+"""检查点链路：每个父检查点与挂起写入都落在已存储的检查点上。"""
+
+from langgraph.checkpoint.memory import MemorySaver
+
+from core.ark_client import StreamEvent, StreamEventType
+from core.graph_engine import MarketInsightGraphEngine
+
+
+class EchoArkClient:
+    def create_response_stream_v2(self, *, messages, **kwargs):
+        yield StreamEvent(type=StreamEventType.OUTPUT_DELTA, content="ok")
+
+
+class EchoAgent:
+    use_websearch = False
+    websearch_limit = 0
+    model = "fake-model"
+    thinking_mode = None
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ark_client = EchoArkClient()
+
+    def get_system_prompt(self, context):
+        return f"system:{self.name}"
+
+    def get_user_prompt(self, context):
+        return context.session_id
+
+    def post_process(self, content, context):
+        return content
+
+
+def test_checkpoint_parents_and_pending_writes_are_stored():
+    saver = MemorySaver()
+    engine = MarketInsightGraphEngine(
+        agent_factory=EchoAgent, debate_rounds=1, retry_max_attempts=1
+    )
+    engine.compile(checkpointer=saver)
+    session_id = "lineage-session"
+    engine.invoke({"session_id": session_id, "user_profile": {}, "enable_cache": False})
+
+    config = {"configurable": {"thread_id": session_id}}
+    history = list(engine._get_compiled_graph(1).get_state_history(config))
+    stored_ids = {
+        snapshot.config["configurable"]["checkpoint_id"] for snapshot in history
+    }
+    assert len(stored_ids) == len(history) > 1
+
+    roots = 0
+    for snapshot in history:
+        if snapshot.parent_config is None:
+            roots += 1
+        else:
+            assert snapshot.parent_config["configurable"]["checkpoint_id"] in stored_ids
+    assert roots == 1
+
+    write_keys = [key for key in saver.writes if key[0] == session_id]
+    assert write_keys
+    for _thread_id, _checkpoint_ns, checkpoint_id in write_keys:
+        assert checkpoint_id in stored_ids
@@ -0,0 +1,164 @@
+"""并发控制原语：AIMD 上限、滑动窗口、会话准入与红队熔断器。"""
+
+import pytest
+
+from core.concurrency import AdmissionGate, AIMDLimiter, SlidingWindowLimiter
+from core.exceptions import GraphExecutionError
+from core.graph_engine import CircuitBreaker
+
+
+def test_aimd_increases_only_after_healthy_streak():
+    limiter = AIMDLimiter(2, alpha=1, c_max=8, hysteresis=3)
+
+    assert limiter.on_success(100) is False
+    assert limiter.on_success(100) is False
+    assert limiter.current() == 2
+    assert limiter.on_success(100) is True
+    assert limiter.current() == 3
+
+
+def test_aimd_slow_sample_resets_healthy_streak():
+    limiter = AIMDLimiter(2, alpha=1, c_max=8, hysteresis=3, tolerance=1.5)
+
+    limiter.on_success(100)
+    limiter.on_success(100)
+    assert limiter.on_success(1000) is False  # 高于基线 × tolerance
+    limiter.on_success(100)
+    limiter.on_success(100)
+    assert limiter.current() == 2
+    assert limiter.on_success(100) is True
+    assert limiter.current() == 3
+
+
+def test_aimd_caps_at_c_max():
+    limiter = AIMDLimiter(4, alpha=1, c_max=4, hysteresis=1)
+
+    assert limiter.on_success(100) is False
+    assert limiter.current() == 4
+
+
+def test_aimd_decreases_once_per_cooldown():
+    limiter = AIMDLimiter(8, beta=0.5, c_max=8, cooldown_sec=5.0)
+
+    assert limiter.on_overload(now=100.0) is True
+    assert limiter.current() == 4
+    assert limiter.on_overload(now=101.0) is False  # 冷却期内
+    assert limiter.current() == 4
+    assert limiter.on_overload(now=105.0) is True
+    assert limiter.current() == 2
+    limiter.on_overload(now=110.0)
+    limiter.on_overload(now=115.0)
+    assert limiter.current() == 1  # 不低于 c_min
+
+
+def test_sliding_window_waits_until_oldest_entry_expires():
+    window = SlidingWindowLimiter(rpm_limit=2, window_sec=60.0)
+
+    assert window.wait_time(now=0.0) == 0.0
+    window.record(now=0.0)
+    window.record(now=10.0)
+    assert window.wait_time(now=20.0) == pytest.approx(40.0)
+    # 窗口边界上最早的一条过期
+    assert window.wait_time(now=60.0) == 0.0
+
+
+def test_sliding_window_tpm_and_empty_window():
+    window = SlidingWindowLimiter(tpm_limit=1000, window_sec=60.0)
+
+    # 窗口为空时即便单次预估超限也放行
+    assert window.wait_time(expected_tokens=5000, now=0.0) == 0.0
+    window.record(tokens=800, now=0.0)
+    assert window.wait_time(expected_tokens=100, now=1.0) == 0.0
+    assert window.wait_time(expected_tokens=300, now=1.0) == pytest.approx(59.0)
+    assert window.wait_time(expected_tokens=300, now=61.0) == 0.0
+
+
+def test_sliding_window_disabled_never_waits():
+    window = SlidingWindowLimiter()
+
+    window.record(tokens=10**6, now=0.0)
+    assert window.wait_time(expected_tokens=10**6, now=0.0) == 0.0
+
+
+def test_admission_gate_rejects_at_capacity():
+    gate = AdmissionGate(capacity=2, timeout_sec=0.0)
+
+    with gate.admit():
+        with gate.admit():
+            assert gate.active == 2
+            assert gate.saturation_ratio == 1.0
+            with pytest.raises(GraphExecutionError) as exc_info:
+                with gate.admit():
+                    pass
+            assert exc_info.value.code == "OVERLOADED"
+    assert gate.active == 0
+    with gate.admit():
+        assert gate.active == 1
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    fake = _Clock()
+    monkeypatch.setattr("core.graph_engine.time.monotonic", fake)
+    return fake
+
+
+def _opened_breaker() -> CircuitBreaker:
+    breaker = CircuitBreaker(open_error_pct=0.5, half_open_after_ms=1000, min_calls=2)
+    breaker.record(True)
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    return breaker
+
+
+def test_circuit_breaker_open_half_open_closed(clock):
+    breaker = _opened_breaker()
+
+    assert breaker.allow() is False
+    clock.now += 1.0
+    assert breaker.allow() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert breaker.allow() is False  # 同一时刻只放行一次探测
+    breaker.record(True)
+    assert breaker.state == CircuitBreaker.CLOSED
+    assert breaker.allow() is True
+
+
+def test_circuit_breaker_failed_probe_reopens(clock):
+    breaker = _opened_breaker()
+
+    clock.now += 1.0
+    assert breaker.allow() is True
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.allow() is False
+
+
+def test_circuit_breaker_stuck_probe_times_out(clock):
+    breaker = _opened_breaker()
+
+    clock.now += 1.0
+    assert breaker.allow() is True  # 探测未回报（如被取消）
+    clock.now += 0.5
+    assert breaker.allow() is False
+    clock.now += 0.5
+    assert breaker.allow() is True
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+
+
+def test_circuit_breaker_needs_min_calls(clock):
+    breaker = CircuitBreaker(open_error_pct=0.1, min_calls=4)
+
+    for _ in range(3):
+        breaker.record(False)
+    assert breaker.state == CircuitBreaker.CLOSED
+    breaker.record(False)
+    assert breaker.state == CircuitBreaker.OPEN
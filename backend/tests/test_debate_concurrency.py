@@ -0,0 +1,164 @@
+"""并发辩论交换：每个交换使用自己的 Agent 实例、联网开关与事件写入。"""
+
+import threading
+import time
+
+from agents.debate import ChallengerAgent
+from core.ark_client import StreamEvent, StreamEventType
+from core.config import AGENT_DEBATE_CHALLENGER, DEBATE_PEER_PAIRS, DEBATE_REDTEAM_TARGETS
+from core.graph_engine import create_market_insight_engine
+
+
+# 补足长度，使 Worker 报告达到红队审查的最小篇幅
+_PADDING = "。" * 200
+
+
+class EchoArkClient:
+    """把系统提示词与联网开关原样作为输出返回，便于回溯是哪个实例发起的调用。"""
+
+    def create_response_stream_v2(self, *, messages, use_websearch, **kwargs):
+        time.sleep(0.01)
+        content = f"{messages[0]['content']}|ws={bool(use_websearch)}|{_PADDING}"
+        yield StreamEvent(type=StreamEventType.OUTPUT_DELTA, content=content)
+
+
+class TaggedAgent:
+    """同一实例被一轮内的所有交换共享（最坏情况下的自定义工厂）。"""
+
+    use_websearch = True
+    websearch_limit = 5
+    model = "fake-model"
+    thinking_mode = None
+
+    def __init__(self, name: str, session_id: str):
+        self.name = name
+        self.session_id = session_id
+        self.ark_client = EchoArkClient()
+
+    def get_system_prompt(self, context):
+        return f"{self.session_id}:{self.name}:{id(self)}"
+
+    def get_user_prompt(self, context):
+        return context.session_id
+
+    def post_process(self, content, context):
+        return content
+
+
+class TaggedChallenger(ChallengerAgent):
+    """红队审查官；设置目标后让出线程，放大共享实例上的竞争窗口。"""
+
+    def __init__(self, session_id: str):
+        super().__init__(ark_client=EchoArkClient())
+        self.session_id = session_id
+
+    def set_challenge_context(self, target_agent, target_content):
+        super().set_challenge_context(target_agent, target_content)
+        time.sleep(0.02)
+
+    def get_system_prompt(self, context):
+        return f"{self.session_id}:{self.name}:{id(self)}:{self._target_agent}"
+
+
+def _shared_factory(session_id: str):
+    agents: dict = {}
+    lock = threading.Lock()
+
+    def factory(agent_name: str):
+        with lock:
+            if agent_name not in agents:
+                agents[agent_name] = (
+                    TaggedChallenger(session_id)
+                    if agent_name == AGENT_DEBATE_CHALLENGER
+                    else TaggedAgent(agent_name, session_id)
+                )
+            return agents[agent_name]
+
+    return factory, agents
+
+
+def _run_session(session_id: str, enable_websearch: bool, events: dict, agents: dict):
+    factory, shared = _shared_factory(session_id)
+    agents[session_id] = shared
+    engine = create_market_insight_engine(
+        agent_factory=factory,
+        debate_rounds=2,
+        retry_max_attempts=1,
+        use_checkpointer=False,
+    )
+    events[session_id] = list(
+        engine.stream(
+            {
+                "session_id": session_id,
+                "user_profile": {"target_market": session_id},
+                "enable_websearch": enable_websearch,
+                "enable_followup": True,
+                "enable_cache": False,
+            }
+        )
+    )
+
+
+def _parse(content: str) -> tuple[list[str], bool]:
+    prompt, _, rest = content.partition("|ws=")
+    return prompt.split(":"), rest.split("|", 1)[0] == "True"
+
+
+def test_concurrent_exchanges_use_their_own_agents_flags_and_writer():
+    events: dict = {}
+    agents: dict = {}
+    threads = [
+        threading.Thread(target=_run_session, args=("session-on", True, events, agents)),
+        threading.Thread(target=_run_session, args=("session-off", False, events, agents)),
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=30)
+
+    assert set(events) == {"session-on", "session-off"}
+    for session_id, enable_websearch in (("session-on", True), ("session-off", False)):
+        by_step: dict[tuple, str] = {}
+        for event in events[session_id]:
+            name = event.get("event")
+            if name in ("agent_challenge_end", "agent_respond_end", "agent_followup_end"):
+                key = (event["round_number"], event["from_agent"], event["to_agent"], name)
+                assert key not in by_step
+                by_step[key] = event["content"]
+
+        instances: dict[int, set[int]] = {1: set(), 2: set()}
+        matchups = [
+            (1, challenger, responder)
+            for a, b in DEBATE_PEER_PAIRS
+            for challenger, responder in ((a, b), (b, a))
+        ] + [(2, AGENT_DEBATE_CHALLENGER, target) for target in DEBATE_REDTEAM_TARGETS]
+
+        for round_number, challenger, responder in matchups:
+            challenge = by_step[(round_number, challenger, responder, "agent_challenge_end")]
+            response = by_step[(round_number, responder, challenger, "agent_respond_end")]
+            followup = by_step[(round_number, challenger, responder, "agent_followup_end")]
+
+            (c_session, c_name, c_id, *c_target), c_ws = _parse(challenge)
+            (r_session, r_name, r_id), r_ws = _parse(response)
+            (f_session, f_name, f_id, *f_target), f_ws = _parse(followup)
+
+            # 事件写入了本会话的流，内容来自本交换的 Agent
+            assert {c_session, r_session, f_session} == {session_id}
+            assert (c_name, r_name) == (challenger, responder)
+            if round_number == 2:
+                assert c_target == f_target == [responder]
+            # 追问沿用本交换的质疑方实例
+            assert (f_name, f_id) == (c_name, c_id)
+            # 红队审查官按配置不联网，其余调用跟随本会话的开关
+            assert c_ws == f_ws == (enable_websearch and round_number == 1)
+            assert r_ws == enable_websearch
+
+            for instance_id in (int(c_id), int(r_id)):
+                assert instance_id not in instances[round_number]
+                instances[round_number].add(instance_id)
+
+    # 工厂返回的共享实例本身未被改写联网开关
+    for shared in agents.values():
+        assert all(
+            agent.use_websearch is type(agent).use_websearch for agent in shared.values()
+        )
@@ -0,0 +1,115 @@
+"""图引擎红队审查路径：质疑结果缓存与无效目标跳过。"""
+
+import threading
+import uuid
+
+from agents.debate import ChallengerAgent
+from core.ark_client import StreamEvent, StreamEventType
+from core.config import AGENT_DEBATE_CHALLENGER, DEBATE_REDTEAM_TARGETS
+from core.graph_engine import create_market_insight_engine
+
+
+class CountingArkClient:
+    """Worker 调用返回固定长报告；记录红队质疑调用次数。"""
+
+    def __init__(self, report: str):
+        self.report = report
+        self.redteam_calls = 0
+        self._lock = threading.Lock()
+
+    def create_response_stream_v2(self, *, messages, **kwargs):
+        user_prompt = messages[-1]["content"]
+        if user_prompt.startswith("## 红队审查任务"):
+            with self._lock:
+                self.redteam_calls += 1
+            content = "红队质疑"
+        elif user_prompt.startswith("worker:"):
+            content = self.report
+        else:
+            content = "ok"
+        yield StreamEvent(type=StreamEventType.OUTPUT_DELTA, content=content)
+
+
+class ReportAgent:
+    use_websearch = False
+    websearch_limit = 0
+    model = "fake-model"
+    thinking_mode = None
+
+    def __init__(self, name: str, ark_client: CountingArkClient):
+        self.name = name
+        self.ark_client = ark_client
+
+    def get_system_prompt(self, context):
+        return f"system:{self.name}"
+
+    def get_user_prompt(self, context):
+        return f"worker:{self.name}"
+
+    def post_process(self, content, context):
+        return content
+
+
+def _run_redteam(client: CountingArkClient) -> list[dict]:
+    def factory(agent_name: str):
+        if agent_name == AGENT_DEBATE_CHALLENGER:
+            return ChallengerAgent(ark_client=client)
+        return ReportAgent(agent_name, client)
+
+    engine = create_market_insight_engine(
+        agent_factory=factory,
+        debate_rounds=2,
+        retry_max_attempts=1,
+        use_checkpointer=False,
+    )
+    return list(
+        engine.stream(
+            {
+                "session_id": str(uuid.uuid4()),
+                "user_profile": {},
+                "enable_followup": False,
+                "enable_cache": False,
+            }
+        )
+    )
+
+
+def test_redteam_challenges_reuse_the_challenge_cache():
+    report = f"市场报告 {uuid.uuid4()}\n" + "需求持续增长，渠道集中度较高。" * 30
+    client = CountingArkClient(report)
+
+    first = _run_redteam(client)
+    assert client.redteam_calls == len(DEBATE_REDTEAM_TARGETS)
+    assert not [e for e in first if e.get("cache") == "challenge"]
+
+    second = _run_redteam(client)
+    assert client.redteam_calls == len(DEBATE_REDTEAM_TARGETS)
+    hits = [e for e in second if e.get("event") == "cache_hit" and e.get("cache") == "challenge"]
+    assert len(hits) == len(DEBATE_REDTEAM_TARGETS)
+    challenges = [
+        e["content"]
+        for e in second
+        if e.get("event") == "agent_challenge_end" and e.get("round_number") == 2
+    ]
+    assert challenges == ["红队质疑"] * len(DEBATE_REDTEAM_TARGETS)
+
+
+def test_redteam_skips_targets_without_reviewable_content():
+    client = CountingArkClient("暂无足够数据，无法给出结论。")
+
+    events = _run_redteam(client)
+
+    assert client.redteam_calls == 0
+    challenges = [
+        e
+        for e in events
+        if e.get("event") == "agent_challenge_end" and e.get("round_number") == 2
+    ]
+    assert len(challenges) == len(DEBATE_REDTEAM_TARGETS)
+    assert all(e["skipped"] for e in challenges)
+    assert {e["content"] for e in challenges} == {ChallengerAgent.SKIPPED_REVIEW_CONTENT}
+    assert not [
+        e
+        for e in events
+        if e.get("event") == "agent_respond" and e.get("round_number") == 2
+    ]
@@ -0,0 +1,65 @@
+"""流式增量合并：思考片段全部先于正文片段下发。"""
+
+from core.ark_client import StreamEvent, StreamEventType
+from core.graph_engine import create_market_insight_engine
+
+_THINKING = ["想", "一", "想"]
+_OUTPUT_DELTAS = 400
+
+
+class ThinkingArkClient:
+    """先产出少量思考增量，再产出大量单字符正文增量。"""
+
+    def create_response_stream_v2(self, *, messages, **kwargs):
+        for piece in _THINKING:
+            yield StreamEvent(type=StreamEventType.THINKING_DELTA, content=piece)
+        for _ in range(_OUTPUT_DELTAS):
+            yield StreamEvent(type=StreamEventType.OUTPUT_DELTA, content="x")
+
+
+class ThinkingAgent:
+    use_websearch = False
+    websearch_limit = 0
+    model = "fake-model"
+    thinking_mode = None
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ark_client = ThinkingArkClient()
+
+    def get_system_prompt(self, context):
+        return f"system:{self.name}"
+
+    def get_user_prompt(self, context):
+        return context.session_id
+
+    def post_process(self, content, context):
+        return content
+
+
+def test_thinking_chunks_precede_output_chunks():
+    engine = create_market_insight_engine(
+        agent_factory=ThinkingAgent,
+        debate_rounds=0,
+        retry_max_attempts=1,
+        use_checkpointer=False,
+    )
+    events = list(
+        engine.stream(
+            {"session_id": "chunk-order", "user_profile": {}, "enable_cache": False}
+        )
+    )
+
+    by_agent: dict[str, list[tuple[str, str]]] = {}
+    for event in events:
+        if event.get("event") in ("agent_thinking", "agent_chunk") and event.get("content"):
+            by_agent.setdefault(event["agent"], []).append(
+                (event["event"], event["content"])
+            )
+
+    assert len(by_agent) >= 5  # 4 个 Worker + 综合分析师
+    for agent_name, chunks in by_agent.items():
+        kinds = [kind for kind, _ in chunks]
+        assert kinds == sorted(kinds, key=lambda kind: kind == "agent_chunk"), agent_name
+        assert "".join(c for k, c in chunks if k == "agent_thinking") == "".join(_THINKING)
+        assert "".join(c for k, c in chunks if k == "agent_chunk") == "x" * _OUTPUT_DELTAS
@@ -0,0 +1,57 @@
+"""同一 session_id 重复运行：综合节点每次都重新执行并下发最终报告。"""
+
+from core.ark_client import StreamEvent, StreamEventType
+from core.graph_engine import create_market_insight_engine
+
+
+class ProfileEchoArkClient:
+    """把用户提示词（含目标市场）原样作为输出返回。"""
+
+    def create_response_stream_v2(self, *, messages, **kwargs):
+        yield StreamEvent(type=StreamEventType.OUTPUT_DELTA, content=messages[-1]["content"])
+
+
+class ProfileAgent:
+    use_websearch = False
+    websearch_limit = 0
+    model = "fake-model"
+    thinking_mode = None
+
+    def __init__(self, name: str):
+        self.name = name
+        self.ark_client = ProfileEchoArkClient()
+
+    def get_system_prompt(self, context):
+        return f"system:{self.name}"
+
+    def get_user_prompt(self, context):
+        return f"{self.name}@{context.profile.target_market}"
+
+    def post_process(self, content, context):
+        return content
+
+
+def _final_event(target_market: str) -> dict:
+    engine = create_market_insight_engine(
+        agent_factory=ProfileAgent,
+        debate_rounds=0,
+        retry_max_attempts=1,
+        use_checkpointer=False,
+    )
+    events = list(
+        engine.stream(
+            {
+                "session_id": "same-session",
+                "user_profile": {"target_market": target_market},
+            }
+        )
+    )
+    return next(e for e in events if e.get("event") == "orchestrator_end")
+
+
+def test_same_session_rerun_emits_its_own_final_report():
+    first = _final_event("US")
+    second = _final_event("DE")
+
+    assert first["final_report"] == "synthesizer@US"
+    assert second["final_report"] == "synthesizer@DE"
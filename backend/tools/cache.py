@@ -54,7 +54,7 @@ class ToolCache:
         return hashlib.sha256(joined.encode("utf-8")).hexdigest()
 
     def get(self, key: str) -> Optional[dict[str, Any]]:
-        now = time.time()
+        now = time.monotonic()
         with self._lock:
             entry = self._data.get(key)
             if not entry:
@@ -66,7 +66,7 @@ class ToolCache:
             return copy.deepcopy(entry.value)
 
     def set(self, key: str, value: dict[str, Any]) -> None:
-        expire_at = time.time() + self.ttl_seconds
+        expire_at = time.monotonic() + self.ttl_seconds
         with self._lock:
             self._data[key] = CacheEntry(
                 value=copy.deepcopy(value), expire_at=expire_at
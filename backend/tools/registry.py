@@ -258,8 +258,4 @@ class ToolRegistry:
         raw = metadata.get("sources")
         if not isinstance(raw, list):
             return []
-        sources: list[str] = []
-        for item in raw:
-            if isinstance(item, str) and item not in sources:
-                sources.append(item)
-        return sources
+        return list(dict.fromkeys(item for item in raw if isinstance(item, str)))
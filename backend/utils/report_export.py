@@ -2,22 +2,36 @@
 HTML 报告导出工具
 
 将综合报告 Markdown 转换为完整 HTML 文档并落盘。
+工作流完成时通过 submit_html_report 后台写盘，不占用会话完成延迟。
 """
 
 from __future__ import annotations
 
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
 from html import escape
 from pathlib import Path
 import json
+import logging
 import re
+import threading
 from typing import Any, Optional
 
 from .markdown import convert_markdown_to_html
 
 
+logger = logging.getLogger(__name__)
+
 _SAFE_SESSION_RE = re.compile(r"[^a-zA-Z0-9_-]+")
 
+# 后台写盘线程数与最大排队数；排队已满时退回调用方线程同步写入（背压）
+_REPORT_WRITER_WORKERS = 2
+_REPORT_WRITER_MAX_PENDING = 32
+
+_report_writer: Optional[ThreadPoolExecutor] = None
+_pending_reports: dict[str, Future] = {}
+_pending_lock = threading.Lock()
+
 
 def _sanitize_session_id(session_id: str) -> str:
     """清理 session_id，避免非法文件名。"""
@@ -346,3 +360,62 @@ def write_html_report(
     )
     report_path.write_text(html_text, encoding="utf-8")
     return report_path
+
+
+def _get_report_writer() -> ThreadPoolExecutor:
+    global _report_writer
+    if _report_writer is None:
+        _report_writer = ThreadPoolExecutor(
+            max_workers=_REPORT_WRITER_WORKERS, thread_name_prefix="report-writer"
+        )
+    return _report_writer
+
+
+def _on_report_written(session_id: str, future: Future) -> None:
+    with _pending_lock:
+        if _pending_reports.get(session_id) is future:
+            del _pending_reports[session_id]
+    error = future.exception()
+    if error is not None:
+        logger.warning(f"HTML 报告后台生成失败 session={session_id}: {error}")
+
+
+def submit_html_report(
+    *,
+    session_id: str,
+    report_markdown: str,
+    profile: Optional[dict[str, Any]] = None,
+    chart_bundle: Optional[dict[str, Any]] = None,
+) -> Optional[Future]:
+    """
+    提交 HTML 报告到后台写盘，立即返回。
+
+    写盘期间 is_report_pending() 为 True，报告端点据此返回 202。
+
+    Returns:
+        Optional[Future]: 后台任务；排队已满、已同步写入时为 None
+    """
+    kwargs = {
+        "session_id": session_id,
+        "report_markdown": report_markdown,
+        "profile": profile,
+        "chart_bundle": chart_bundle,
+    }
+    with _pending_lock:
+        if len(_pending_reports) < _REPORT_WRITER_MAX_PENDING:
+            future = _get_report_writer().submit(lambda: write_html_report(**kwargs))
+            _pending_reports[session_id] = future
+        else:
+            future = None
+
+    if future is None:
+        write_html_report(**kwargs)
+        return None
+    future.add_done_callback(lambda f: _on_report_written(session_id, f))
+    return future
+
+
+def is_report_pending(session_id: str) -> bool:
+    """该会话的 HTML 报告是否仍在后台生成中。"""
+    with _pending_lock:
+        return session_id in _pending_reports